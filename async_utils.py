@@ -1,49 +1,453 @@
 """This unit contains functions for asynchronous processing"""
-from bs4 import BeautifulSoup
-from aiohttp import ClientSession
-from asyncio import gather, create_task
-from parse_classes.school_parse_task import ProfessionParseRequest
+import ssl
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor)
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+from urllib.parse import urlparse
+from aiohttp import (ClientResponseError, ClientSession, ClientTimeout,
+                     TCPConnector)
+from asyncio import (create_task, sleep, wait, gather, get_running_loop,
+                     Semaphore, Task, Condition, CancelledError,
+                     FIRST_COMPLETED)
+from constants import (
+    HTTP_CONNECTIONS_LIMIT, HTTP_CONNECTIONS_PER_HOST, HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT, HTTP_TOTAL_TIMEOUT, HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT)
+from create_loggers import logger
+from parse_classes.rate_limit import RateLimit
+from parse_classes.school_parse_task import ProfessionParseRequest, \
+    ProfessionParseResponse
 from parsers.base_parser import BaseParser
+from utils import (create_failed_response, is_deterministic_failure,
+                   get_time_left, get_wait_timeout)
+
+if TYPE_CHECKING:
+    from managers.http_cache_manager import HttpCacheManager
+    from managers.retry_scheduler import RetryScheduler
+    from managers.run_journal import RunJournal
 # ------------------------------------------------------------------------
 
 
+@dataclass
+class FetchContext:
+    """FetchContext class keeps objects shared by all async fetches of
+    a parsing run"""
+    session: ClientSession
+    http_cache: 'HttpCacheManager'
+    parse_executor: Executor
+    fetch_limit: Semaphore
+    journal: Optional['RunJournal'] = None
+    host_limiters: dict[str, 'HostLimiter'] = field(default_factory=dict)
+
+    def get_host_limiter(self, url: str,
+                         rate_limit: RateLimit) -> 'HostLimiter':
+        """This method returns the limiter of the url's host. Limiters are
+        kept between runs, so the learned concurrency is not lost
+        :param url: the url to be requested
+        :param rate_limit: a RateLimit instance of the school
+        :return: a HostLimiter instance
+        """
+        host = urlparse(url or '').netloc
+        limiter = self.host_limiters.get(host)
+        if limiter is None:
+            limiter = self.host_limiters[host] = HostLimiter(rate_limit)
+        else:
+            limiter.rate_limit = rate_limit
+
+        return limiter
+
+
+class HostLimiter:
+    """HostLimiter class limits requests to a single host by a token bucket
+    and an adaptive concurrency limit. The limit is decreased
+    multiplicatively on 429 and 5xx responses, network errors and latency
+    growth, and increased additively while responses are healthy"""
+    def __init__(self, rate_limit: RateLimit) -> None:
+        """Initialization of HostLimiter class
+        :param rate_limit: a RateLimit instance with the rate and the bounds
+        of the concurrency
+        """
+        self.rate_limit = rate_limit
+        self._limit = float(rate_limit.initial_concurrency)
+        self._in_flight = 0
+        self._tokens = float(rate_limit.burst)
+        self._refilled_at = monotonic()
+        self._blocked_until = 0.0
+        self._decreased_at = 0.0
+        self._latency: Optional[float] = None
+        self._base_latency: Optional[float] = None
+        self._counters = {'requests': 0, 'throttled': 0, 'errors': 0}
+        self._condition: Optional[Condition] = None
+
+    async def acquire(self) -> None:
+        """This method waits for a token and a free concurrency slot. The
+        slot is taken last, so a request cancelled while it waits does not
+        keep it"""
+        if self._condition is None:
+            self._condition = Condition()
+
+        delay = self._take_token()
+        while delay > 0:
+            await sleep(delay)
+            delay = self._take_token()
+
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+    async def release(self, error: Optional[BaseException],
+                      latency: float) -> None:
+        """This method frees the slot and adapts the concurrency limit by
+        the result of the request. A cancelled request only frees the slot
+        :param error: an exception raised by the request or None
+        :param latency: the duration of the request in seconds
+        """
+        if not isinstance(error, CancelledError):
+            self._adapt(error, latency)
+
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _adapt(self, error: Optional[Exception], latency: float) -> None:
+        """This secondary method adapts the concurrency limit by the result
+        of the request
+        :param error: an exception raised by the request or None
+        :param latency: the duration of the request in seconds
+        """
+        self._counters['requests'] += 1
+        if self._is_throttled(error):
+            self._counters['throttled'] += 1
+            self._decrease(error)
+
+        elif error is not None and not isinstance(error, ClientResponseError):
+            self._counters['errors'] += 1
+            self._decrease(error)
+
+        elif self._is_slow(latency):
+            self._decrease(None)
+
+        else:
+            self._limit = min(float(self.rate_limit.max_concurrency),
+                              self._limit + 1 / self._limit)
+
+    @property
+    def state(self) -> dict[str, Any]:
+        """This property returns the current state of the limiter for
+        monitoring
+        :return: a dictionary with the concurrency limit, requests in flight,
+        available tokens, the average latency and counters
+        """
+        return {
+            'limit': round(self._limit, 2),
+            'in_flight': self._in_flight,
+            'tokens': round(self._tokens, 2),
+            'latency': round(self._latency, 3) if self._latency else None,
+            'blocked_for': round(
+                max(0.0, self._blocked_until - monotonic()), 1),
+            **self._counters,
+        }
+
+    def _take_token(self) -> float:
+        """This secondary method takes a token from the bucket
+        :return: 0 if the token is taken or the amount of seconds to wait
+        """
+        now = monotonic()
+        rate = self.rate_limit.requests_per_second
+        self._tokens = min(float(self.rate_limit.burst),
+                           self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / rate
+
+    def _decrease(self, error: Optional[Exception]) -> None:
+        """This secondary method decreases the concurrency limit once per
+        latency period, so a burst of errors from the same congestion is
+        counted once. Retry-After header of the response is respected
+        :param error: an exception raised by the request or None
+        """
+        now = monotonic()
+        headers = getattr(error, 'headers', None) or {}
+        retry_after = headers.get('Retry-After')
+        if retry_after and str(retry_after).isdigit():
+            self._blocked_until = max(self._blocked_until,
+                                      now + int(retry_after))
+
+        if now - self._decreased_at < (self._latency or 1.0):
+            return
+
+        self._decreased_at = now
+        self._limit = max(float(self.rate_limit.min_concurrency),
+                          self._limit * self.rate_limit.decrease_factor)
+        logger.info(f'Concurrency limit is decreased to '
+                    f'{round(self._limit, 2)}, error: {error}')
+
+    def _is_slow(self, latency: float) -> bool:
+        """This secondary method updates the average latency and checks if
+        it grew in comparison with the lowest average latency of the host
+        :param latency: the duration of the request in seconds
+        :return: True if the host answers much slower than usual
+        """
+        self._latency = (latency if self._latency is None
+                         else self._latency * 0.8 + latency * 0.2)
+        if self._base_latency is None or self._latency < self._base_latency:
+            self._base_latency = self._latency
+
+        return (self._latency
+                > self._base_latency * self.rate_limit.latency_factor)
+
+    @staticmethod
+    def _is_throttled(error: Optional[Exception]) -> bool:
+        """This secondary method checks if the host asked to slow down
+        :param error: an exception raised by the request or None
+        :return: True for 429 and 5xx responses
+        """
+        status = getattr(error, 'status', None)
+        return isinstance(error, ClientResponseError) and (
+            status == 429 or status >= 500)
+
+
+def create_client_session() -> ClientSession:
+    """This function creates a ClientSession with a tuned connection pool.
+    The session is meant to be long-lived so keep-alive connections, TLS
+    settings and resolved DNS names are reused between schools and retries.
+    Every request is limited by the total, connect and read timeouts, so
+    a hung page cannot stall the run. It must be called inside a running
+    event loop
+    :return: a configured ClientSession instance
+    """
+    connector = TCPConnector(
+        limit=HTTP_CONNECTIONS_LIMIT,
+        limit_per_host=HTTP_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ssl=ssl.create_default_context(),
+        enable_cleanup_closed=True,
+    )
+    timeout = ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT,
+        sock_connect=HTTP_CONNECT_TIMEOUT,
+        sock_read=HTTP_READ_TIMEOUT,
+    )
+    return ClientSession(connector=connector, timeout=timeout)
+
+
+def create_parse_executor(executor_type: str, workers: int) -> Executor:
+    """This function creates a pool to parse html pages outside the event
+    loop
+    :param executor_type: 'process' to use a process pool or 'thread' to use
+    a thread pool
+    :param workers: the amount of workers in the pool
+    :return: an Executor instance
+    """
+    if executor_type == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def parse_html(parser: BaseParser,
+               parse_request: ProfessionParseRequest,
+               html: str):
+    """This function extracts data from a downloaded page by the parser's
+    static parsing. It is CPU-bound and runs in the parse executor
+    :param parser: an instance of class inherited from BaseParser
+    :param parse_request: a ProfessionParseRequest instance with tags
+    :param html: a string containing the html page
+    :return: a ProfessionParseResponse or ProfessionParseRequest instance
+    """
+    return parser.parse_static(parse_request, html)
+
+
+async def fetch_page(
+        url: str, session: ClientSession,
+        headers: dict) -> tuple[Optional[str], Mapping]:
+    """This async function downloads a single page
+    :param url: the url of the page
+    :param session: a ClientSession's instance of aiohttp package
+    :param headers: a dictionary with request headers
+    :return: a tuple containing the page or None if it was not modified and
+    the response headers
+    """
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            return None, response.headers
+
+        response.raise_for_status()
+        return await response.text(), response.headers
+
+
+async def fetch_limited(
+        url: str, context: FetchContext, limiter: HostLimiter,
+        headers: dict) -> tuple[Optional[str], Mapping]:
+    """This async function downloads a single page under the host limiter
+    and the global limit of concurrent fetches. The latency is measured
+    from taking the global limit, so waiting for it is not taken for
+    slowness of the host
+    :param url: the url of the page
+    :param context: a FetchContext instance shared by all fetches
+    :param limiter: a HostLimiter instance of the url's host
+    :param headers: a dictionary with request headers
+    :return: a tuple containing the page or None if it was not modified and
+    the response headers
+    """
+    start = monotonic()
+    error, is_acquired = None, False
+    try:
+        await limiter.acquire()
+        start, is_acquired = monotonic(), True
+        async with context.fetch_limit:
+            start = monotonic()
+            return await fetch_page(url, context.session, headers)
+
+    except (Exception, CancelledError) as e:
+        error = e
+        raise
+
+    finally:
+        if is_acquired:
+            await limiter.release(error, monotonic() - start)
+
+
 async def parse_url(parse_request: ProfessionParseRequest,
-                    session: ClientSession,
-                    parser: BaseParser):
-    """This async function serves to parse a single URL
+                    parser: BaseParser,
+                    context: FetchContext,
+                    rate_limit: RateLimit):
+    """This async function serves to parse a single URL. If the page was not
+    modified since the last run, the cached response is returned without
+    parsing the page
     :param parse_request: a ProfessionParseRequest instance with necessary
     parsing information such as url, tags, etc.
-    :param session: a ClientSession's instance of aiohttp package
     :param parser: an instance of class inherited from BaseParser for
     asynchronous parsing
+    :param context: a FetchContext instance with the session, the cache
+    and the parse executor
+    :param rate_limit: a RateLimit instance of the school
     :return: a dictionary filled with data parsing from the URL
     """
     url = getattr(parse_request, 'url', None)
+    http_cache = context.http_cache
+    limiter = context.get_host_limiter(url, rate_limit)
+
+    html, headers = await fetch_limited(
+        url, context, limiter, http_cache.get_headers(parse_request))
+
+    if html is None:
+        cached_response = http_cache.get_response(parse_request)
+        if cached_response:
+            logger.info(f'{url} is not modified, cached data is used')
+            return cached_response
 
-    async with session.get(url) as response:
-        result = await response.text()
-        sup = BeautifulSoup(result, 'html.parser')
-        parse_response = parser(parse_request, sup)
+        html, headers = await fetch_limited(url, context, limiter, {})
 
-        return parse_response
+    parse_response = await get_running_loop().run_in_executor(
+        context.parse_executor, parse_html, parser, parse_request, html)
+
+    if getattr(parse_response, 'price', None):
+        http_cache.save(parse_request, headers, parse_response)
+
+    return parse_response
 
 
 async def event_loop(
-        parse_tasks: list[ProfessionParseRequest],
-        parser: BaseParser):
-    """This function is an event loop for asynchronous parsing
-    :param parse_tasks: a list of ProfessionParseRequest instances with
-    necessary parsing information
+        scheduler: 'RetryScheduler',
+        parser: BaseParser,
+        context: FetchContext,
+        rate_limit: RateLimit,
+        deadline: Optional[float] = None
+) -> tuple[list[ProfessionParseResponse],
+           list[tuple[ProfessionParseRequest, ProfessionParseResponse]]]:
+    """This function is an event loop for asynchronous parsing. It takes
+    requests from the scheduler as soon as they are ready and returns failed
+    ones back to the scheduler. When the deadline is exceeded, outstanding
+    fetches are cancelled and the unfinished requests are returned as failed
+    with the timeout reason. Outstanding fetches are cancelled as well if
+    the loop itself is cancelled, e.g. by the timeout of the school
+    :param scheduler: a RetryScheduler instance containing
+    ProfessionParseRequest instances to parse
     :param parser: an instance of class inherited from BaseParser for
     asynchronous parsing
-    :return: a Coroutine
+    :param context: a FetchContext instance shared by all fetches
+    :param rate_limit: a RateLimit instance limiting requests to the hosts
+    of the school
+    :param deadline: a monotonic time to stop parsing or None to parse
+    until all the attempts are made
+    :return: a tuple of lists of parsed responses and tuples of failed
+    requests with their last failed responses. Requests failed with
+    deterministic errors are not retried
     """
-    tasks = []
-    async with ClientSession() as session:
-        for school in parse_tasks:
-            task = create_task(parse_url(school, session, parser))
-            tasks.append(task)
+    parsed, failed = [], []
+    in_flight: dict[Task, ProfessionParseRequest] = {}
+
+    try:
+        while scheduler or in_flight:
+            time_left = get_time_left(deadline)
+            if time_left is not None and time_left <= 0:
+                for task in in_flight:
+                    task.cancel()
+                await gather(*in_flight, return_exceptions=True)
+
+                unfinished = [*in_flight.values(), *scheduler.drain()]
+                logger.error(f'Deadline is exceeded, {len(unfinished)} '
+                             f'requests are not finished')
+                failed.extend(
+                    (parse_request, create_failed_response(
+                        parse_request, TimeoutError('Deadline is exceeded')))
+                    for parse_request in unfinished)
+                break
+
+            for parse_request in scheduler.pop_ready():
+                task = create_task(
+                    parse_url(parse_request, parser, context, rate_limit))
+                in_flight[task] = parse_request
+
+            if not in_flight:
+                await sleep(get_wait_timeout(
+                    scheduler.time_to_next(), deadline))
+                continue
+
+            finished, _ = await wait(
+                in_flight,
+                timeout=get_wait_timeout(scheduler.time_to_next(), deadline),
+                return_when=FIRST_COMPLETED)
+
+            for task in finished:
+                parse_request = in_flight.pop(task)
+                if task.exception():
+                    logger.error(f'Could not load {parse_request.url}, '
+                                 f'error: {task.exception()}')
+                    result = create_failed_response(
+                        parse_request, task.exception())
+                else:
+                    result = task.result()
+
+                if getattr(result, 'price', None):
+                    print(f'Task {result.url} finished')
+                    parsed.append(result)
+                    if context.journal is not None:
+                        context.journal.record(result)
+
+                elif (not is_deterministic_failure(result)
+                      and scheduler.retry(parse_request)):
+                    print(f'{parse_request.url} failed, one more attempt')
+
+                else:
+                    failed.append((parse_request, result))
 
-        finished_tasks = await gather(*tasks)
+    except CancelledError:
+        for task in in_flight:
+            task.cancel()
+        await gather(*in_flight, return_exceptions=True)
+        raise
 
-    return finished_tasks
+    return parsed, failed
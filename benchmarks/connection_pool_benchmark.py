@@ -0,0 +1,74 @@
+"""This benchmark compares the old way of fetching pages, a new ClientSession
+for every batch, with a single shared session created by
+create_client_session. A local aiohttp server is used as a stand-in for the
+school sites. Run it from the project root:
+python -m benchmarks.connection_pool_benchmark
+"""
+import asyncio
+from time import perf_counter
+from aiohttp import web, ClientSession
+import bootstrap  # noqa: F401 prepares the project modules
+from async_utils import create_client_session
+# ------------------------------------------------------------------------
+
+HOST, PORT = '127.0.0.1', 8791
+BATCHES = 20
+BATCH_SIZE = 50
+PAGE = '<html><body>' + '<div class="price">10 000 ₽</div>' * 200 + \
+       '</body></html>'
+
+
+async def handle_page(_: web.Request) -> web.Response:
+    """This handler returns a static course page"""
+    return web.Response(text=PAGE, content_type='text/html')
+
+
+async def fetch_batch(session: ClientSession, batch: int) -> None:
+    """This function fetches a single batch of pages concurrently
+    :param session: a ClientSession instance to fetch pages with
+    :param batch: the number of the batch used to build urls
+    """
+    async def fetch(index: int) -> None:
+        url = f'http://{HOST}:{PORT}/course/{batch}/{index}'
+        async with session.get(url) as response:
+            await response.text()
+
+    await asyncio.gather(*(fetch(index) for index in range(BATCH_SIZE)))
+
+
+async def session_per_batch() -> None:
+    """This function opens a new session for every batch"""
+    for batch in range(BATCHES):
+        async with ClientSession() as session:
+            await fetch_batch(session, batch)
+
+
+async def shared_session() -> None:
+    """This function uses a single tuned session for all the batches"""
+    async with create_client_session() as session:
+        for batch in range(BATCHES):
+            await fetch_batch(session, batch)
+
+
+async def main() -> None:
+    """This function starts the local server and runs both scenarios"""
+    app = web.Application()
+    app.router.add_get('/course/{batch}/{index}', handle_page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    try:
+        for name, scenario in (('session per batch', session_per_batch),
+                               ('shared session', shared_session)):
+            start = perf_counter()
+            await scenario()
+            elapsed = perf_counter() - start
+            print(f'{name:>20}: {BATCHES * BATCH_SIZE / elapsed:8.0f} req/s')
+
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+"""This benchmark compares the previous comparison of parsed snapshots, which
+sorted rows by professions and zipped them, with the comparison of columnar
+ResultsTable instances matching rows by the school, the profession and the
+course level. Run it from the project root:
+python -m benchmarks.diff_benchmark [rows]
+"""
+import copy
+import random
+import sys
+from time import perf_counter
+from typing import Callable
+import bootstrap  # noqa: F401 prepares the project modules
+from parse_classes.results_table import ResultsTable
+# ------------------------------------------------------------------------
+
+ROWS = 100000
+SCHOOLS = 5
+LEVELS = ('basic', 'middle', 'pro')
+CHANGED_SHARE = 0.05
+REMOVED_SHARE = 0.01
+REPEATS = 5
+
+
+def create_snapshots(rows: int) -> tuple[dict, dict]:
+    """This function creates two snapshots of parsed data. In the new one
+    a part of prices is changed, a part of rows is removed and the same
+    amount of new rows is added
+    :param rows: the amount of rows in a snapshot
+    :return: a tuple of the old and the new snapshots
+    """
+    random.seed(1)
+    old_data = {f'School_{index}': [] for index in range(SCHOOLS)}
+    for index in range(rows):
+        old_data[f'School_{index % SCHOOLS}'].append({
+            'profession': f'Profession_{index // len(LEVELS) // SCHOOLS}',
+            'course_level': LEVELS[index % len(LEVELS)],
+            'url': f'https://school.example/{index}',
+            'price': random.randint(1000, 9000), 'period': 12,
+        })
+
+    new_data = {}
+    for school_name, school_rows in old_data.items():
+        new_rows = new_data[school_name] = []
+        for row in school_rows:
+            if random.random() < REMOVED_SHARE:
+                row = dict(row, profession=f'New_{row["profession"]}')
+
+            elif random.random() < CHANGED_SHARE:
+                row = dict(row, price=row['price'] + 100)
+
+            new_rows.append(dict(row))
+        random.shuffle(new_rows)
+
+    return old_data, new_data
+
+
+def compare_by_sort(old_data: dict, new_data: dict) -> None:
+    """This function repeats the previous comparison
+    :param old_data: dictionary with previous parse data
+    :param new_data: dictionary with new parse data
+    """
+    for key in old_data:
+        old_data[key].sort(key=lambda x: x['profession'])
+        new_data[key].sort(key=lambda x: x['profession'])
+
+        for prof_old, prof_new in zip(old_data[key], new_data[key]):
+            try:
+                prof_new['price_change'] = (
+                    prof_new.get('price') - prof_old.get('price'))
+            except TypeError:
+                prof_new['price_change'] = 0
+
+            try:
+                prof_new['period_change'] = round(
+                    prof_new.get('period') - prof_old.get('period'), 2)
+            except TypeError:
+                prof_new['period_change'] = 0
+
+
+def measure(function: Callable, old_data: dict, new_data: dict) -> float:
+    """This function runs the previous comparison on copies of the snapshots
+    several times
+    :param function: a function comparing the snapshots
+    :param old_data: dictionary with previous parse data
+    :param new_data: dictionary with new parse data
+    :return: the best duration in milliseconds
+    """
+    durations = []
+    for _ in range(REPEATS):
+        old_copy, new_copy = copy.deepcopy(old_data), copy.deepcopy(new_data)
+        start = perf_counter()
+        function(old_copy, new_copy)
+        durations.append((perf_counter() - start) * 1000)
+
+    return min(durations)
+
+
+def compare_tables(old_table: ResultsTable, new_table: ResultsTable) -> float:
+    """This function runs the columnar comparison several times
+    :param old_table: a ResultsTable instance with previous results
+    :param new_table: a ResultsTable instance with new results
+    :return: the best duration in milliseconds
+    """
+    durations = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        new_table.compare(old_table)
+        durations.append((perf_counter() - start) * 1000)
+
+    return min(durations)
+
+
+def count_wrong_changes(old_data: dict, new_data: dict) -> int:
+    """This function counts rows which get wrong price changes by the
+    previous comparison
+    :param old_data: dictionary with previous parse data
+    :param new_data: dictionary with new parse data
+    :return: the amount of rows with wrong price changes
+    """
+    sorted_data = copy.deepcopy(new_data)
+    compare_by_sort(copy.deepcopy(old_data), sorted_data)
+    new_table = ResultsTable.from_json(new_data)
+    new_table.compare(ResultsTable.from_json(old_data))
+    expected = {row['url']: row['price_change']
+                for rows in new_table.to_json().values() for row in rows}
+
+    return sum(row.get('price_change', 0) != expected[row['url']]
+               for rows in sorted_data.values() for row in rows)
+
+
+def main() -> None:
+    """This function runs both comparisons on growing snapshots"""
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+
+    print(f'{"rows":>8} {"sort ms":>10} {"table ms":>10} {"us/row":>8} '
+          f'{"added":>8} {"removed":>8} {"changed":>8} {"sort wrong":>10}')
+    for rows in (max_rows // 10, max_rows // 2, max_rows):
+        old_data, new_data = create_snapshots(rows)
+        old_table = ResultsTable.from_json(old_data)
+        new_table = ResultsTable.from_json(new_data)
+        sort_time = measure(compare_by_sort, old_data, new_data)
+        table_time = compare_tables(old_table, new_table)
+        diff = new_table.compare(old_table)
+        wrong = count_wrong_changes(old_data, new_data)
+        print(f'{rows:>8} {sort_time:10.1f} {table_time:10.1f} '
+              f'{table_time * 1000 / rows:8.2f} {len(diff.added):>8} '
+              f'{len(diff.removed):>8} {len(diff.changed):>8} {wrong:>10}')
+
+
+if __name__ == '__main__':
+    main()
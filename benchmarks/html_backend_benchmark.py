@@ -0,0 +1,102 @@
+"""This benchmark compares BeautifulSoup backends and the targeted parsing
+by SoupStrainer on saved html pages. Pass a folder with saved course pages
+as the first argument, otherwise a synthetic landing page is used. Run it
+from the project root:
+python -m benchmarks.html_backend_benchmark [folder_with_html_files]
+"""
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Optional
+from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound
+import bootstrap  # noqa: F401 prepares the project modules
+from utils import build_soup_strainer
+# ------------------------------------------------------------------------
+
+BACKENDS = ('html.parser', 'lxml', 'html5lib')
+REPEATS = 10
+PRICE_TAGS = ['span', 'price']
+PERIOD_TAGS = ['div', 'period']
+
+
+def create_synthetic_page() -> str:
+    """This function creates a big landing page with a few price blocks
+    :return: a string containing the html page
+    """
+    block = ('<section class="review"><div class="author"><img src="a.png">'
+             '<p>Отличный курс, всем рекомендую</p></div>'
+             '<ul>' + '<li><a href="#">пункт программы</a></li>' * 10 +
+             '</ul></section>')
+    prices = ('<div class="tariff"><span class="price">4 990 ₽/мес</span>'
+              '<div class="period">12 месяцев</div></div>')
+    return ('<html><head><script>var a = 1;</script></head><body>' +
+            block * 400 + prices * 3 + block * 400 + '</body></html>')
+
+
+def load_pages(folder: Optional[str]) -> list[str]:
+    """This function loads saved html pages
+    :param folder: a path to the folder with html files or None
+    :return: a list of strings containing html pages
+    """
+    if not folder:
+        return [create_synthetic_page()]
+
+    pages = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith('.html'):
+            with open(os.path.join(folder, filename), encoding='utf-8') as f:
+                pages.append(f.read())
+
+    return pages
+
+
+def measure(pages: list[str], backend: str,
+            strainer: Optional[SoupStrainer]) -> tuple[float, float]:
+    """This function parses all the pages and finds prices in them
+    :param pages: a list of html pages
+    :param backend: the name of the BeautifulSoup backend
+    :param strainer: a SoupStrainer instance or None to build a full tree
+    :return: a tuple with average time per page in ms and peak memory per
+    page in MB
+    """
+    start = perf_counter()
+    for _ in range(REPEATS):
+        for page in pages:
+            soup = BeautifulSoup(page, backend, parse_only=strainer)
+            soup.find_all(*PRICE_TAGS)
+            soup.find(*PERIOD_TAGS)
+
+    elapsed = perf_counter() - start
+
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        soup = BeautifulSoup(page, backend, parse_only=strainer)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del soup
+
+    return elapsed * 1000 / (REPEATS * len(pages)), peak / 2 ** 20
+
+
+def main() -> None:
+    """This function runs the benchmark for all available backends"""
+    pages = load_pages(sys.argv[1] if len(sys.argv) > 1 else None)
+    strainer = build_soup_strainer([PRICE_TAGS, PERIOD_TAGS])
+
+    print(f'{"backend":>12} {"tree":>8} {"ms/page":>10} {"peak MB":>10}')
+    for backend in BACKENDS:
+        for tree, parse_only in (('full', None), ('strained', strainer)):
+            try:
+                per_page, peak = measure(pages, backend, parse_only)
+
+            except FeatureNotFound:
+                print(f'{backend:>12} is not installed')
+                break
+
+            print(f'{backend:>12} {tree:>8} {per_page:10.2f} {peak:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
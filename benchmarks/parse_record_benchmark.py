@@ -0,0 +1,115 @@
+"""This benchmark compares the processing of parsed rows by copying pydantic
+models with from_orm and by ParseRecord instances. It measures the time
+per row and the peak memory of the refactored rows. Run it from the project
+root:
+python -m benchmarks.parse_record_benchmark [rows]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable
+import bootstrap  # noqa: F401 prepares the project modules
+from constants import PRICE_TYPES, LEVELS, PERIODS
+from parse_classes.school_parse_task import (
+    ProfessionParseRequest, ProfessionParseResponse)
+from utils import (create_response, refactor_parse_responses,
+                   update_parsed_data)
+# ------------------------------------------------------------------------
+
+ROWS = 20000
+REPEATS = 3
+
+
+def create_requests(amount: int) -> list[ProfessionParseRequest]:
+    """This function creates parse requests as they come from the tag sheet
+    :param amount: the amount of requests
+    :return: a list of ProfessionParseRequest instances
+    """
+    return [ProfessionParseRequest(
+        profession=f'Profession_{index}',
+        url=f'https://school.example/course/{index}',
+        price_tags=['span', 'price'], period_tags=['div', 'period'],
+        middle_price='middle', pro_price='pro')
+        for index in range(amount)]
+
+
+def parse_with_models(
+        parse_requests: list[ProfessionParseRequest]) -> list:
+    """This function repeats the previous processing: every parser result and
+    every price tier is a copy of the validated model made by from_orm
+    :param parse_requests: a list of ProfessionParseRequest instances
+    :return: a list of ProfessionParseResponse instances
+    """
+    result = []
+    for parse_request in parse_requests:
+        row = ProfessionParseResponse.from_orm(parse_request)
+        row.price, row.period = '4 990 ₽/мес', '12 месяцев'
+        row.middle_price, row.pro_price = '6 990 ₽', '9 990 ₽'
+
+        for price_type in PRICE_TYPES:
+            price = getattr(row, price_type, '')
+            if price is not None:
+                new_row = ProfessionParseResponse.from_orm(row)
+                new_row.course_level = LEVELS[price_type]
+                new_row.price = price
+                period = getattr(new_row, PERIODS[price_type], None)
+                new_row.period = period if period else new_row.period
+                result.append(update_parsed_data(new_row))
+
+    return result
+
+
+def parse_with_records(
+        parse_requests: list[ProfessionParseRequest]) -> list:
+    """This function runs the current processing with ParseRecord instances
+    :param parse_requests: a list of ProfessionParseRequest instances
+    :return: a list of ProfessionParseResponse instances
+    """
+    rows = []
+    for parse_request in parse_requests:
+        row = create_response(parse_request)
+        row.price, row.period = '4 990 ₽/мес', '12 месяцев'
+        row.middle_price, row.pro_price = '6 990 ₽', '9 990 ₽'
+        rows.append(row)
+
+    return list(refactor_parse_responses(rows))
+
+
+def measure(function: Callable,
+            parse_requests: list[ProfessionParseRequest]
+            ) -> tuple[float, float]:
+    """This function runs the processing and measures it
+    :param function: a function processing the requests
+    :param parse_requests: a list of ProfessionParseRequest instances
+    :return: a tuple with the time per request in microseconds and the peak
+    memory in MB
+    """
+    start = perf_counter()
+    for _ in range(REPEATS):
+        function(parse_requests)
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+    result = function(parse_requests)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+
+    return (elapsed * 10 ** 6 / (REPEATS * len(parse_requests)),
+            peak / 2 ** 20)
+
+
+def main() -> None:
+    """This function runs the benchmark for both ways of processing"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    parse_requests = create_requests(rows)
+
+    print(f'{"processing":>12} {"us/row":>10} {"peak MB":>10}')
+    for name, function in (('from_orm', parse_with_models),
+                           ('records', parse_with_records)):
+        per_row, peak = measure(function, parse_requests)
+        print(f'{name:>12} {per_row:10.2f} {peak:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""This benchmark fills the price history with daily runs and measures the
+bulk ingest of a run, the price history of a course for the last days and
+the changes of the last week. Run it from the project root:
+python -m benchmarks.price_history_benchmark [courses] [days]
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Callable
+import bootstrap  # noqa: F401 prepares the project modules
+from managers import PriceHistoryManager
+from parse_classes.results_table import ResultsTable
+# ------------------------------------------------------------------------
+
+COURSES = 3000
+DAYS = 365
+SCHOOLS = 5
+LEVELS = ('basic', 'middle', 'pro')
+CHANGED_SHARE = 0.02
+REPEATS = 20
+
+
+def create_runs(courses: int, days: int) -> list[ResultsTable]:
+    """This function creates results of daily runs, a part of prices is
+    changed every day
+    :param courses: the amount of rows in a run
+    :param days: the amount of runs, the last one is today
+    :return: a list of ResultsTable instances from the oldest run
+    """
+    random.seed(1)
+    prices = [random.randint(1000, 9000) for _ in range(courses)]
+    runs = []
+    for day in range(days - 1, -1, -1):
+        updated_at = f'{date.today() - timedelta(days=day)} 12:00:00'
+        data = {f'School_{index}': [] for index in range(SCHOOLS)}
+        for index in range(courses):
+            if random.random() < CHANGED_SHARE:
+                prices[index] += random.choice((-500, 500))
+            data[f'School_{index % SCHOOLS}'].append({
+                'profession': f'Profession_{index // len(LEVELS) // SCHOOLS}',
+                'course_level': LEVELS[index % len(LEVELS)],
+                'url': f'https://school.example/{index}',
+                'price': prices[index], 'period': 12,
+                'updated_at': updated_at,
+            })
+        runs.append(ResultsTable.from_json(data))
+
+    return runs
+
+
+def measure(function: Callable) -> tuple[float, int]:
+    """This function runs a query several times
+    :param function: a function running the query
+    :return: a tuple with the best duration in milliseconds and the amount
+    of returned rows
+    """
+    durations = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        rows = function()
+        durations.append((perf_counter() - start) * 1000)
+
+    return min(durations), len(rows)
+
+
+def main() -> None:
+    """This function fills the history and runs the queries"""
+    courses = int(sys.argv[1]) if len(sys.argv) > 1 else COURSES
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DAYS
+    runs = create_runs(courses, days)
+
+    with tempfile.TemporaryDirectory() as directory:
+        history = PriceHistoryManager(
+            os.path.join(directory, 'price_history.db'))
+        durations = []
+        for results in runs:
+            start = perf_counter()
+            history.ingest(results)
+            durations.append((perf_counter() - start) * 1000)
+
+        print(f'{"operation":>16} {"ms":>10} {"rows":>8}')
+        print(f'{"ingest avg":>16} {sum(durations) / len(durations):10.2f} '
+              f'{courses:>8}')
+        for name, function in (
+                ('history 90d', lambda: history.get_price_history(
+                    'School_1', 'Profession_7', days=90)),
+                ('level 90d', lambda: history.get_price_history(
+                    'School_1', 'Profession_7', 'pro', days=90)),
+                ('changes 7d', lambda: history.get_changes(days=7))):
+            duration, rows = measure(function)
+            print(f'{name:>16} {duration:10.2f} {rows:>8}')
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
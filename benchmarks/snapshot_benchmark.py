@@ -0,0 +1,123 @@
+"""This benchmark keeps daily results as full JSON files, as they are saved
+to the result file, and as snapshots of ResultSnapshotManager. It measures
+the size on disk, the time of writing and the time of reading a day back.
+Run it from the project root:
+python -m benchmarks.snapshot_benchmark [rows] [days]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from time import perf_counter
+import bootstrap  # noqa: F401 prepares the project modules
+from managers import ResultSnapshotManager
+from utils import save_data_to_json, load_from_json
+# ------------------------------------------------------------------------
+
+ROWS = 3000
+DAYS = 365
+SCHOOLS = 5
+LEVELS = ('basic', 'middle', 'pro')
+CHANGED_SHARE = 0.02
+BATCH_SIZE = 10
+BASE_INTERVAL = 30
+
+
+def create_days(rows: int, days: int) -> list[tuple[str, dict]]:
+    """This function creates results of days. Rows are refreshed in batches
+    with their own update times, a part of prices is changed every day
+    :param rows: the amount of rows of a day
+    :param days: the amount of days
+    :return: a list of tuples of days and results from the oldest day
+    """
+    random.seed(1)
+    prices = [random.randint(1000, 9000) for _ in range(rows)]
+    result = []
+    for day_index in range(days):
+        day = date(2023, 1, 1) + timedelta(days=day_index)
+        changes = [0] * rows
+        for index in range(rows):
+            if random.random() < CHANGED_SHARE:
+                changes[index] = random.choice((-500, 500))
+                prices[index] += changes[index]
+
+        data = {f'School_{index}': [] for index in range(SCHOOLS)}
+        for index in range(rows):
+            minute = index // BATCH_SIZE
+            data[f'School_{index % SCHOOLS}'].append({
+                'profession': f'Профессия {index // len(LEVELS) // SCHOOLS}',
+                'url': f'https://school.example/course/{index}',
+                'price': prices[index], 'period': 12,
+                'price_change': changes[index], 'period_change': 0,
+                'total': prices[index] * 12,
+                'course_level': LEVELS[index % len(LEVELS)],
+                'updated_at': f'{day} {minute // 60:02}:{minute % 60:02}:00',
+            })
+        result.append((day.isoformat(), data))
+
+    return result
+
+
+def get_size(directory: str) -> int:
+    """This function calculates the size of files in the directory
+    :param directory: a string containing the path to the directory
+    :return: the size in bytes
+    """
+    return sum(os.path.getsize(os.path.join(directory, file_name))
+               for file_name in os.listdir(directory))
+
+
+def main() -> None:
+    """This function writes and reads the results of the days both ways"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DAYS
+    results = create_days(rows, days)
+    read_days = (results[-1][0], results[days // 2][0],
+                 results[(days // BASE_INTERVAL) * BASE_INTERVAL - 1][0])
+
+    with tempfile.TemporaryDirectory() as full_path, \
+            tempfile.TemporaryDirectory() as snapshots_path:
+        start = perf_counter()
+        for day, data in results:
+            save_data_to_json(data, os.path.join(full_path, f'{day}.json'))
+        full_write = perf_counter() - start
+
+        snapshots = ResultSnapshotManager(
+            snapshots_path, BASE_INTERVAL, days)
+        start = perf_counter()
+        for day, data in results:
+            snapshots.save(data, day)
+        snapshots_write = perf_counter() - start
+
+        full_size, snapshots_size = get_size(full_path), get_size(
+            snapshots_path)
+        print(f'{"storage":>10} {"MB":>8} {"write s":>8} {"ms/day":>8}')
+        for name, size, duration in (
+                ('full json', full_size, full_write),
+                ('snapshots', snapshots_size, snapshots_write)):
+            print(f'{name:>10} {size / 2 ** 20:8.2f} {duration:8.2f} '
+                  f'{duration * 1000 / days:8.2f}')
+        print(f'snapshots take {snapshots_size / full_size:.1%} of full json')
+
+        print(f'\n{"read day":>12} {"full ms":>8} {"rebuild ms":>10} '
+              f'{"equal":>6}')
+        snapshots = ResultSnapshotManager(
+            snapshots_path, BASE_INTERVAL, days)
+        expected = dict(results)
+        for day in read_days:
+            start = perf_counter()
+            load_from_json(os.path.join(full_path, f'{day}.json'))
+            full_read = perf_counter() - start
+
+            start = perf_counter()
+            data = snapshots.load(day)
+            rebuild = perf_counter() - start
+            equal = json.dumps(data) == json.dumps(expected[day])
+            print(f'{day:>12} {full_read * 1000:8.1f} {rebuild * 1000:10.1f} '
+                  f'{str(equal):>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""This unit prepares the project modules for the scripts which are not
+started by main.py, such as the tests and the benchmarks. It must be
+imported before other project modules. The log is written to the temporary
+directory unless LOG_PATH is set, so the log of the parser is not mixed
+with test runs"""
+import os
+import tempfile
+
+os.environ.setdefault(
+    'LOG_PATH', os.path.join(tempfile.gettempdir(), 'parser_logs.txt'))
+
+from constants import LOG_PATH  # noqa: E402
+
+os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+
+import managers  # noqa: E402,F401 initializes project modules in order
+# ------------------------------------------------------------------------
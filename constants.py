@@ -5,19 +5,99 @@ import os
 
 PARSE_DATA_PATH = os.path.join('data', 'parse_store')
 RESULT_PATH = os.path.join('data', 'results', 'result.json')
+SNAPSHOTS_PATH = os.path.join('data', 'results', 'snapshots')
+HTTP_CACHE_PATH = os.path.join('data', 'http_cache')
+QUEUE_PATH = os.environ.get(
+    'QUEUE_PATH', os.path.join('data', 'queue', 'work_queue.db'))
+REFRESH_STATE_PATH = os.path.join('data', 'results', 'refresh_state.json')
+JOURNAL_PATH = os.path.join('data', 'journal')
+PRICE_HISTORY_PATH = os.path.join('data', 'history', 'price_history.db')
 AUTH_FILE = os.path.join('auth_data', 'skyparser-b7b18db49e8d.json')
-LOG_PATH = os.path.join('log', 'parser_logs.txt')
+LOG_PATH = os.environ.get('LOG_PATH', os.path.join('log', 'parser_logs.txt'))
 BOT_PHRASES_PATH = os.path.join('data', 'telebot_data', 'bot_phrases.json')
 CHAT_IDS_PATH = os.path.join('data', 'telebot_data', 'chats.json')
 PROJECT_FOLDERS = [
-    PARSE_DATA_PATH, os.path.join('data', 'results'), 'log']
+    PARSE_DATA_PATH, os.path.join('data', 'results'), HTTP_CACHE_PATH,
+    os.path.dirname(QUEUE_PATH), JOURNAL_PATH,
+    os.path.dirname(PRICE_HISTORY_PATH), SNAPSHOTS_PATH,
+    os.path.dirname(LOG_PATH)]
 
 TIME_DELAY_24_H = 3600 * 24
 CHECK_UPDATES_DELAY_10M = 60 * 10
 
+REFRESH_DEFAULT_INTERVAL = TIME_DELAY_24_H
+REFRESH_MIN_INTERVAL = 3600 * 2
+REFRESH_MAX_INTERVAL = TIME_DELAY_24_H * 3
+REFRESH_BACKOFF = 1.5
+REFRESH_RETRY_DELAY = 3600
+REFRESH_BATCH_SIZE = 10
+REFRESH_TICK = 60
+REFRESH_FLUSH_INTERVAL = 3600
+TAGS_RELOAD_INTERVAL = 3600 * 6
+JOURNAL_MAX_AGE = TIME_DELAY_24_H
+REFRESH_RUN_ID = 'refresh_cycle'
+PARSE_STORE_MAX_VERSIONS = 100
+PRICE_HISTORY_DAYS = 90
+PRICE_CHANGES_DAYS = 7
+SNAPSHOT_BASE_INTERVAL = 30
+SNAPSHOT_MAX_DAYS = 365
+
 MULTY_THREAD_ATTEMPTS = 30
 ASYNC_ATTEMPTS = 10
 ATTEMPTS_GET_DRIVER = 2
+RUN_RETRY_BUDGET = 200
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 60
+RUN_DEADLINE = 3600 * 3
+SCHOOL_DEADLINE = 3600
+DEADLINE_GRACE = 30
+
+HTTP_CONNECTIONS_LIMIT = 100
+HTTP_CONNECTIONS_PER_HOST = 8
+HTTP_DNS_CACHE_TTL = 600
+HTTP_KEEPALIVE_TIMEOUT = 60
+HTTP_TOTAL_TIMEOUT = 60
+HTTP_CONNECT_TIMEOUT = 15
+HTTP_READ_TIMEOUT = 30
+FETCH_CONCURRENCY = 50
+PARSE_EXECUTOR_TYPE = 'process'
+PARSE_WORKERS = os.cpu_count() or 1
+HTML_PARSER_BACKEND = 'lxml'
+STATE_SCRIPT_TYPES = ('application/json', 'application/ld+json')
+STATE_SCRIPT_IDS = ('__NEXT_DATA__', '__NUXT_DATA__')
+TIERED_HTTP_ATTEMPTS = 2
+DETERMINISTIC_FAILURES = ('element_not_found', 'value_not_parseable')
+DETERMINISTIC_HTTP_STATUSES = ('400', '404', '410')
+
+SELENOID_URL = os.environ.get('SELENOID_URL', 'http://localhost:4444/wd/hub')
+SELENOID_LIMIT = int(os.environ.get('SELENOID_LIMIT', 10))
+WEBDRIVER_COMMAND_TIMEOUT = 120
+SYNC_MAX_IN_FLIGHT = SELENOID_LIMIT
+PAGE_READY_TIMEOUT = 15
+PAGE_READY_POLL = 0.2
+PAGE_READY_STATS_SIZE = 1000
+DRIVER_MAX_PAGES = 20
+HOST_BATCH_SIZE = 5
+BLOCKED_RESOURCE_PATTERNS = {
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.m3u8', '*.mp3', '*youtube.com/embed*',
+              '*player.vimeo.com*', '*kinescope.io*'],
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg'],
+    'stylesheet': ['*.css'],
+    'tracker': ['*google-analytics.com*', '*googletagmanager.com*',
+                '*mc.yandex.ru*', '*top-fwz1.mail.ru*',
+                '*connect.facebook.net*', '*vk.com/rtrg*',
+                '*doubleclick.net*', '*hotjar.com*'],
+    'widget': ['*jivosite.com*', '*carrotquest.io*', '*code.jivo.ru*',
+               '*widget.bitrix24*', '*cdn.envybox.io*', '*usedesk.ru*'],
+}
+
+PARSE_MODE = 'local'
+QUEUE_LEASE_TIMEOUT = 60 * 15
+QUEUE_MAX_DELIVERIES = 3
+QUEUE_LEASE_SIZE = 20
+QUEUE_POLL_DELAY = 5
+QUEUE_RUN_TIMEOUT = 3600 * 6
 
 
 TABLE_NAME = 'sky_parser'
@@ -51,6 +131,7 @@ REFACTOR_TAGS = PRICE_TAGS + (
     'total_tags',
     'period_tags',
     'url',
+    'refresh_interval',
 )
 
 PRICE_TYPES = ('price', 'middle_price', 'pro_price')
@@ -84,7 +165,9 @@ SERVICE_TAGS = ('price_tags',
                 'pro_price',
                 'middle_price',
                 'middle_period',
-                'pro_period')
+                'pro_period',
+                'failure_reason',
+                'failure_detail')
 
 INITIAL_PARSE_DATA = {
       "price": "",
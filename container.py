@@ -1,8 +1,20 @@
 import gspread
-from constants import AUTH_FILE, PARSE_DATA_PATH
-from managers import ParseStorageManager, ParseManager, GoogleTableManager
+from constants import (
+    AUTH_FILE, PARSE_DATA_PATH, SELENOID_URL, SELENOID_LIMIT, DRIVER_MAX_PAGES,
+    HTTP_CACHE_PATH, QUEUE_PATH, QUEUE_LEASE_TIMEOUT, QUEUE_MAX_DELIVERIES,
+    PARSE_MODE, REFRESH_STATE_PATH, REFRESH_DEFAULT_INTERVAL,
+    REFRESH_MIN_INTERVAL, REFRESH_MAX_INTERVAL, REFRESH_BACKOFF,
+    REFRESH_RETRY_DELAY, JOURNAL_PATH, JOURNAL_MAX_AGE,
+    WEBDRIVER_COMMAND_TIMEOUT, PARSE_STORE_MAX_VERSIONS, PRICE_HISTORY_PATH,
+    SNAPSHOTS_PATH, SNAPSHOT_BASE_INTERVAL, SNAPSHOT_MAX_DAYS)
+from managers import (ParseStorageManager, ParseManager, GoogleTableManager,
+                      DriverPoolManager, HttpCacheManager, WorkQueueManager,
+                      RefreshScheduler, RunJournal, PriceHistoryManager,
+                      ResultSnapshotManager)
 from parsers import (GBParser, NetologyParser, SkillFactoryParser,
                      SkillBoxParser, YandexPracticumParser)
+from parse_classes.browser_profile import BrowserProfile
+from parse_classes.rate_limit import RateLimit
 # ------------------------------------------------------------------------
 
 
@@ -16,13 +28,48 @@ parsers = {
 
 parse_mapper = {
     'GeekBrains': 'async',
-    'Netology': 'sync',
-    'SkillFactory': 'sync',
+    'Netology': 'tiered',
+    'SkillFactory': 'tiered',
     'SkillBox': 'async',
-    'YandexPracticum': 'sync',
+    'YandexPracticum': 'tiered',
 }
 
-parse_manager = ParseManager(parsers, parse_mapper)
+browser_profiles = {
+    'Netology': BrowserProfile(
+        name='netology_light', window_size='1920,1080',
+        blocked_resource_types=['font', 'media', 'tracker', 'widget']),
+    'SkillFactory': BrowserProfile(
+        name='skillfactory_light',
+        blocked_resource_types=['font', 'media', 'tracker', 'widget']),
+    'YandexPracticum': BrowserProfile(
+        name='yandex_light',
+        blocked_resource_types=['font', 'media', 'tracker'],
+        blocked_url_patterns=['*yastatic.net/s3/chat*']),
+}
+
+rate_limits = {
+    'GeekBrains': RateLimit(requests_per_second=2, burst=3,
+                            initial_concurrency=2, max_concurrency=4),
+    'SkillBox': RateLimit(requests_per_second=4, burst=4),
+}
+
+driver_pool = DriverPoolManager(
+    SELENOID_URL, SELENOID_LIMIT, DRIVER_MAX_PAGES, WEBDRIVER_COMMAND_TIMEOUT)
+http_cache = HttpCacheManager(HTTP_CACHE_PATH)
+journal = RunJournal(JOURNAL_PATH, JOURNAL_MAX_AGE)
+work_queue = WorkQueueManager(
+    QUEUE_PATH, QUEUE_LEASE_TIMEOUT, QUEUE_MAX_DELIVERIES)
+parse_manager = ParseManager(
+    parsers, parse_mapper, driver_pool, http_cache, browser_profiles,
+    rate_limits, journal, work_queue if PARSE_MODE == 'queue' else None)
 connection = gspread.service_account(AUTH_FILE)
-table_manager = GoogleTableManager(connection, parse_manager)
-storage_manager = ParseStorageManager(PARSE_DATA_PATH)
+price_history = PriceHistoryManager(PRICE_HISTORY_PATH)
+snapshots = ResultSnapshotManager(
+    SNAPSHOTS_PATH, SNAPSHOT_BASE_INTERVAL, SNAPSHOT_MAX_DAYS)
+table_manager = GoogleTableManager(
+    connection, parse_manager, price_history, snapshots)
+storage_manager = ParseStorageManager(
+    PARSE_DATA_PATH, PARSE_STORE_MAX_VERSIONS)
+refresh_scheduler = RefreshScheduler(
+    REFRESH_STATE_PATH, REFRESH_DEFAULT_INTERVAL, REFRESH_MIN_INTERVAL,
+    REFRESH_MAX_INTERVAL, REFRESH_BACKOFF, REFRESH_RETRY_DELAY)
@@ -1,35 +1,120 @@
 """This is a main file to start the parser"""
-from datetime import datetime
-from time import sleep
+import os
+from time import sleep, monotonic
+from typing import Optional
 from constants import (
-    RESULT_PATH, TIME_DELAY_24_H, TABLE_NAME, PARSE_TAGS_SHEET, PROJECT_FOLDERS,
+    TABLE_NAME, PARSE_TAGS_SHEET, PROJECT_FOLDERS, REFRESH_BATCH_SIZE,
+    REFRESH_TICK, REFRESH_FLUSH_INTERVAL, TAGS_RELOAD_INTERVAL, RESULT_PATH,
+    REFRESH_RUN_ID,
 )
-from container import table_manager, storage_manager
-from utils import load_from_json, create_folders
+from container import (
+    table_manager, storage_manager, parse_manager, work_queue,
+    refresh_scheduler, price_history, journal)
+from create_loggers import logger
+from utils import create_folders, load_from_json
 # ------------------------------------------------------------------------
 
 
+def reload_tags() -> None:
+    """This function loads parse tags from the table or the storage and
+    schedules their requests"""
+    table_manager.open_table(TABLE_NAME)
+    parse_data = table_manager.load_from_table(PARSE_TAGS_SHEET)
+
+    if not parse_data:
+        parse_data = storage_manager.load_from_storage()
+
+    if parse_data:
+        refresh_scheduler.sync(parse_data)
+        storage_manager.save_to_storage(parse_data)
+
+    table_manager.close_table()
+
+
+def flush_results(old_data: Optional[dict[str, list]] = None) -> bool:
+    """This function sends the latest responses to the JSON file and the
+    table, only refreshed rows are added to the history sheet. The refresh
+    cycle is finished when the state of the scheduler is saved, if publishing
+    fails the updates and the journal are kept for the next flush
+    :param old_data: a dictionary with previously published data to
+    calculate changes
+    :return: True if the results are published
+    """
+    table_manager.open_table(TABLE_NAME)
+    try:
+        published = table_manager.publish(
+            refresh_scheduler.get_results(), old_data,
+            refresh_scheduler.get_updates())
+    finally:
+        table_manager.close_table()
+
+    if published:
+        refresh_scheduler.clear_updates()
+        save_state()
+
+    return published
+
+
+def save_state() -> None:
+    """This function saves the state of the scheduler and removes the
+    journal of the refresh cycle, the responses parsed in the cycle are in
+    the state from now on"""
+    refresh_scheduler.save()
+    journal.finish(REFRESH_RUN_ID)
+
+
 def main() -> None:
-    """Main function with necessary logic"""
+    """Main function with necessary logic. Requests are refreshed by the
+    scheduler in small batches at a steady rate, the results are flushed
+    periodically. The results published before the start are used to
+    calculate changes of the first flush. Responses parsed after the last
+    successful flush are journaled, so requests refreshed again after a crash
+    or a stop with unpublished updates are restored from the journal"""
     create_folders(PROJECT_FOLDERS)
-    while True:
+    refresh_scheduler.load()
+    old_data = (load_from_json(RESULT_PATH) if os.path.exists(RESULT_PATH)
+                else None)
+    tags_loaded_at: Optional[float] = None
+    flushed_at = monotonic()
+    try:
+        while True:
 
-        start_time = datetime.now()
-        table_manager.open_table(TABLE_NAME)
-        parse_data = table_manager.load_from_table(PARSE_TAGS_SHEET)
+            start_time = monotonic()
+            try:
+                if (tags_loaded_at is None
+                        or start_time - tags_loaded_at > TAGS_RELOAD_INTERVAL):
+                    reload_tags()
+                    tags_loaded_at = start_time
 
-        if not parse_data:
-            parse_data = storage_manager.load_from_storage()
+                due_tasks = refresh_scheduler.pop_due(REFRESH_BATCH_SIZE)
+                if due_tasks:
+                    try:
+                        finished_tasks = parse_manager.parse_all(
+                            due_tasks, REFRESH_RUN_ID)
+                        refresh_scheduler.update(finished_tasks)
 
-        if parse_data:
-            old_data = load_from_json(RESULT_PATH)
-            table_manager.refresh(parse_data, old_data)
-            storage_manager.save_to_storage(parse_data)
+                    finally:
+                        refresh_scheduler.requeue_taken()
 
-        table_manager.close_table()
+                if (refresh_scheduler.has_updates
+                        and start_time - flushed_at > REFRESH_FLUSH_INTERVAL):
+                    if flush_results(old_data):
+                        old_data = None
+                    flushed_at = start_time
+
+            except Exception as e:
+                logger.error(f'There was an error in the refresh loop: {e}')
+
+            work_time = monotonic() - start_time
+            sleep(max(0.0, REFRESH_TICK - work_time))
 
-        work_time = (datetime.now() - start_time).seconds
-        sleep(TIME_DELAY_24_H - work_time)
+    finally:
+        parse_manager.close()
+        work_queue.close()
+        storage_manager.close()
+        price_history.close()
+        if not refresh_scheduler.has_updates:
+            save_state()
 
 
 if __name__ == '__main__':
@@ -1,12 +1,26 @@
+from .driver_pool_manager import DriverPoolManager
+from .http_cache_manager import HttpCacheManager
 from .logging_manager import LoggingManager
 from .parse_manager import ParseManager
 from .parse_storage_manager import ParseStorageManager
+from .price_history_manager import PriceHistoryManager
+from .refresh_scheduler import RefreshScheduler
+from .result_snapshot_manager import ResultSnapshotManager
+from .run_journal import RunJournal
 from .table_manager import GoogleTableManager
+from .work_queue_manager import WorkQueueManager
 # --------------------------------------------------------------------------
 
 __all__ = [
+    'DriverPoolManager',
+    'HttpCacheManager',
     'LoggingManager',
     'ParseManager',
     'ParseStorageManager',
+    'PriceHistoryManager',
+    'RefreshScheduler',
+    'ResultSnapshotManager',
+    'RunJournal',
     'GoogleTableManager',
+    'WorkQueueManager',
 ]
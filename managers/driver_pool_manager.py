@@ -0,0 +1,356 @@
+"""This unit contains DriverPoolManager class to keep warm selenium sessions
+and share them between synchronous parsers"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Lock
+from typing import Optional
+from selenium import webdriver
+from selenium.webdriver.chromium.remote_connection import \
+    ChromiumRemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+from constants import ATTEMPTS_GET_DRIVER, BLOCKED_RESOURCE_PATTERNS
+from create_loggers import logger
+from parse_classes.browser_profile import BrowserProfile
+# ------------------------------------------------------------------------
+
+
+class DriverPoolManager:
+    """DriverPoolManager class provides a bounded pool of Remote WebDriver
+    sessions. Parsers lease a session, use it and return it back to the pool
+    instead of starting a new browser for every url. Leased and idle sessions
+    together never exceed the limit, which can be lowered below the limit of
+    the hub when the hub is shared with other workers"""
+    def __init__(self, command_executor: str, max_sessions: int,
+                 max_pages: int, command_timeout: float) -> None:
+        """Initialization of DriverPoolManager class
+        :param command_executor: an url of the selenoid hub
+        :param max_sessions: the maximum amount of simultaneous sessions,
+        it should not exceed the selenoid's -limit option. It is the limit of
+        the hub shared by the workers using it
+        :param max_pages: the amount of pages after which a session will be
+        recycled
+        :param command_timeout: the maximum amount of seconds to wait for
+        a response of the selenoid hub to any command, so a hung browser
+        cannot block a thread forever
+        """
+        ChromiumRemoteConnection.set_timeout(command_timeout)
+        self._command_executor = command_executor
+        self._max_pages = max_pages
+        self._hub_limit = max_sessions
+        self._max_sessions = max_sessions
+        self._busy = 0
+        self._idle: deque[WebDriver] = deque()
+        self._pages: dict[int, int] = {}
+        self._hosts: dict[int, Optional[str]] = {}
+        self._profiles: dict[int, str] = {}
+        self._lock = Lock()
+        self._released = Condition(self._lock)
+
+    def lease(self, profile: BrowserProfile, host: Optional[str] = None,
+              timeout: Optional[float] = None) -> Optional[WebDriver]:
+        """This method returns a healthy session from the pool or creates a
+        new one if there are no idle sessions with the provided profile.
+        Sessions which visited the provided host are preferred to reuse their
+        cookies and cache. The method blocks while all the sessions are leased
+        :param profile: a BrowserProfile instance the session must have
+        :param host: a host of the pages to be visited by the session
+        :param timeout: the maximum amount of seconds to wait for a free
+        session or None to wait without a limit
+        :return: a WebDriver instance or None if the session cannot be created
+        :raise TimeoutError: if there is no free session within the timeout,
+        the session must not be released then
+        """
+        with self._released:
+            if not self._released.wait_for(
+                    lambda: self._busy < self._max_sessions, timeout):
+                raise TimeoutError(
+                    'No free selenium session within the timeout')
+            self._busy += 1
+
+        while True:
+            evicted = None
+            with self._lock:
+                driver = self._pop_idle(profile.name, host)
+                if driver is None and self._idle and (
+                        self._busy + len(self._idle) > self._max_sessions):
+                    evicted = self._idle.popleft()
+
+            if evicted is not None:
+                self._quit(evicted)
+
+            if driver is None:
+                return self._create_driver(profile)
+
+            if self._is_healthy(driver):
+                return driver
+
+            self._quit(driver)
+
+    def warm_up(self, amount: int, profile: BrowserProfile) -> int:
+        """This method creates missing sessions of the profile concurrently
+        so that parsers do not wait for browsers to start one by one. Idle
+        sessions of other profiles are quit if there is no room for the new
+        sessions within the limit
+        :param amount: the desired amount of idle sessions of the profile
+        :param profile: a BrowserProfile instance of the new sessions
+        :return: the amount of idle sessions of the profile in the pool
+        """
+        evicted, missing = [], 0
+        try:
+            with self._lock:
+                matching = self._count_idle(profile.name)
+                missing = max(min(amount - matching,
+                                  self._max_sessions - self._busy - matching),
+                              0)
+                self._busy += missing
+                evicted = self._pop_excess(profile.name)
+
+            for driver in evicted:
+                self._quit(driver)
+
+            if missing > 0:
+                with ThreadPoolExecutor(max_workers=missing) as executor:
+                    drivers = list(executor.map(
+                        lambda _: self._create_driver(profile),
+                        range(missing)))
+
+                with self._lock:
+                    self._idle.extend(driver for driver in drivers if driver)
+
+        finally:
+            with self._released:
+                self._busy -= missing
+                self._released.notify_all()
+
+        with self._lock:
+            return self._count_idle(profile.name)
+
+    def release(self, driver: Optional[WebDriver], is_failed: bool = False,
+                host: Optional[str] = None, pages: int = 1) -> None:
+        """This method returns a leased session to the pool. The session is
+        recycled if it failed or served too many pages, it is quit if it does
+        not fit into the lowered limit
+        :param driver: a WebDriver instance received from the lease method
+        :param is_failed: a boolean indicating that the parsing failed
+        :param host: a host of the pages visited by the session
+        :param pages: the amount of pages visited during the lease
+        """
+        try:
+            if driver is None:
+                return
+
+            with self._lock:
+                pages += self._pages.get(id(driver), 0)
+                self._pages[id(driver)] = pages
+                self._hosts[id(driver)] = host
+                is_expired = pages >= self._max_pages
+                is_excess = self._busy + len(self._idle) > self._max_sessions
+                if not is_failed and not is_expired and not is_excess:
+                    self._idle.append(driver)
+                    return
+
+            self._quit(driver)
+
+        finally:
+            with self._released:
+                self._busy -= 1
+                self._released.notify()
+
+    def set_max_sessions(self, max_sessions: int) -> None:
+        """This method changes the limit of the pool, e.g. to the share of
+        the hub given to the worker. Idle sessions over the new limit are
+        quit, leased ones are quit when they are released
+        :param max_sessions: the new maximum amount of simultaneous sessions
+        """
+        with self._released:
+            self._max_sessions = max_sessions
+            evicted = self._pop_excess()
+            self._released.notify_all()
+
+        for driver in evicted:
+            self._quit(driver)
+
+    @property
+    def hub_url(self) -> str:
+        """This property returns the url of the selenoid hub
+        :return: a string containing the url
+        """
+        return self._command_executor
+
+    @property
+    def hub_limit(self) -> int:
+        """This property returns the limit of sessions of the hub
+        :return: an integer
+        """
+        return self._hub_limit
+
+    @property
+    def max_sessions(self) -> int:
+        """This property returns the current limit of the pool
+        :return: an integer
+        """
+        return self._max_sessions
+
+    def close(self) -> None:
+        """This method quits all idle sessions of the pool"""
+        with self._lock:
+            drivers = list(self._idle)
+            self._idle.clear()
+
+        for driver in drivers:
+            self._quit(driver)
+
+    def _pop_excess(self, kept_profile: Optional[str] = None
+                    ) -> list[WebDriver]:
+        """This secondary method removes the oldest idle sessions which do
+        not fit into the limit. It must be called under the lock
+        :param kept_profile: the name of the BrowserProfile whose sessions
+        are not removed or None
+        :return: a list of removed WebDriver instances to quit
+        """
+        excess = self._busy + len(self._idle) - self._max_sessions
+        evicted = []
+        for driver in list(self._idle):
+            if excess <= 0:
+                break
+            if self._profiles.get(id(driver)) != kept_profile:
+                self._idle.remove(driver)
+                evicted.append(driver)
+                excess -= 1
+
+        return evicted
+
+    def _count_idle(self, profile_name: str) -> int:
+        """This secondary method counts idle sessions with the provided
+        profile. It must be called under the lock
+        :param profile_name: the name of the BrowserProfile of the sessions
+        :return: the amount of the sessions
+        """
+        return sum(self._profiles.get(id(driver)) == profile_name
+                   for driver in self._idle)
+
+    def _pop_idle(self, profile_name: str,
+                  host: Optional[str]) -> Optional[WebDriver]:
+        """This secondary method takes an idle session with the provided
+        profile, the last session which visited the host is preferred. It must
+        be called under the lock
+        :param profile_name: the name of the BrowserProfile of the session
+        :param host: a host of the pages to be visited or None
+        :return: a WebDriver instance or None if there are no such sessions
+        """
+        candidates = [driver for driver in self._idle
+                      if self._profiles.get(id(driver)) == profile_name]
+        if not candidates:
+            return None
+
+        driver = candidates[0]
+        for candidate in reversed(candidates):
+            if host and self._hosts.get(id(candidate)) == host:
+                driver = candidate
+                break
+
+        self._idle.remove(driver)
+        return driver
+
+    def _create_driver(self, profile: BrowserProfile) -> Optional[WebDriver]:
+        """This method initializes the sync selenium driver to parse sites with
+        JS or having another problems for standard asynchronous parsing
+        :param profile: a BrowserProfile instance with blocked resources and
+        page load settings
+        :return: a configured WebDriver instance
+        """
+        for _ in range(ATTEMPTS_GET_DRIVER):
+            try:
+                options = webdriver.ChromeOptions()
+                options.add_argument("--headless")
+                options.add_argument("--no-sandbox")
+                options.add_argument(
+                    f"--window-size={profile.window_size}")
+                options.add_argument("--disable-dev-shm-usage")
+                options.add_argument(
+                    "--disable-blink-features=AutomationControlled")
+                options.add_argument("--disable-setuid-sandbox")
+                options.page_load_strategy = profile.page_load_strategy
+
+                if profile.block_images:
+                    options.add_argument(
+                        "--blink-settings=imagesEnabled=false")
+                    options.add_experimental_option('prefs', {
+                        'profile.managed_default_content_settings.images': 2
+                    })
+
+                driver = webdriver.Remote(
+                    desired_capabilities=webdriver.DesiredCapabilities.CHROME,
+                    command_executor=ChromiumRemoteConnection(
+                        self._command_executor, 'goog', 'chrome'),
+                    options=options
+                )
+                driver.set_page_load_timeout(profile.page_load_timeout)
+                driver.set_script_timeout(profile.script_timeout)
+                self._block_urls(driver, profile)
+
+                with self._lock:
+                    self._pages[id(driver)] = 0
+                    self._profiles[id(driver)] = profile.name
+
+                return driver
+
+            except Exception as e:
+                logger.error(
+                    f'There was an error in the create_driver method: {e}')
+        return None
+
+    @staticmethod
+    def _block_urls(driver: WebDriver, profile: BrowserProfile) -> None:
+        """This method makes the browser skip requests to the urls and
+        resource types blocked by the profile
+        :param driver: a WebDriver instance to configure
+        :param profile: a BrowserProfile instance with blocked resources
+        """
+        patterns = list(profile.blocked_url_patterns)
+        for resource_type in profile.blocked_resource_types:
+            patterns.extend(BLOCKED_RESOURCE_PATTERNS.get(resource_type, []))
+
+        if not patterns:
+            return
+
+        try:
+            driver.execute('executeCdpCommand',
+                           {'cmd': 'Network.enable', 'params': {}})
+            driver.execute('executeCdpCommand',
+                           {'cmd': 'Network.setBlockedURLs',
+                            'params': {'urls': patterns}})
+
+        except Exception as e:
+            logger.error(f'Failed to block urls for the {profile.name} '
+                         f'profile, error: {e}')
+
+    @staticmethod
+    def _is_healthy(driver: WebDriver) -> bool:
+        """This method checks if the session is still alive
+        :param driver: a WebDriver instance to check
+        :return: True if the session responds, False otherwise
+        """
+        try:
+            _ = driver.current_url
+            return True
+
+        except Exception as e:
+            logger.error(f'Selenium session is broken, error: {e}')
+            return False
+
+    def _quit(self, driver: WebDriver) -> None:
+        """This method closes the provided session
+        :param driver: a WebDriver instance to close
+        """
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._hosts.pop(id(driver), None)
+            self._profiles.pop(id(driver), None)
+
+        try:
+            driver.stop_client()
+            driver.quit()
+
+        except Exception as e:
+            logger.error(f'Failed to quit selenium session, error: {e}')
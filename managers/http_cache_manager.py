@@ -0,0 +1,96 @@
+"""This file contains the HttpCacheManager class to keep http validators and
+last parse results on disk to make conditional requests"""
+import hashlib
+import os
+from typing import Optional
+from create_loggers import logger
+from parse_classes.school_parse_task import ProfessionParseRequest, \
+    ProfessionParseResponse
+from utils import save_data_to_json, load_from_json
+# --------------------------------------------------------------------------
+
+
+class HttpCacheManager:
+    """The HttpCacheManager class stores ETag and Last-Modified validators
+    of parsed pages together with the last parse response. It allows to skip
+    downloading and parsing pages which were not changed"""
+    def __init__(self, cache_path: str) -> None:
+        """Initialize the HttpCacheManager class
+        :param cache_path: a string containing the path to the cache
+        directory
+        """
+        self._cache_path = cache_path
+
+    def get_headers(self, parse_request: ProfessionParseRequest) -> dict:
+        """This method returns conditional request headers for the request
+        :param parse_request: a ProfessionParseRequest instance
+        :return: a dictionary with If-None-Match and If-Modified-Since headers
+        or an empty dictionary if the page was not cached
+        """
+        entry = self._load_entry(parse_request)
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def get_response(
+            self, parse_request: ProfessionParseRequest
+    ) -> Optional[ProfessionParseResponse]:
+        """This method returns the last parse response of the not modified
+        page
+        :param parse_request: a ProfessionParseRequest instance
+        :return: a ProfessionParseResponse instance or None if the page was
+        not cached
+        """
+        entry = self._load_entry(parse_request)
+        if not entry.get('response'):
+            return None
+
+        try:
+            return ProfessionParseResponse(**entry['response'])
+
+        except Exception as e:
+            logger.error(f'Broken cache entry for {parse_request.url}, '
+                         f'error: {e}')
+            return None
+
+    def save(self, parse_request: ProfessionParseRequest,
+             headers: dict, parse_response: ProfessionParseResponse) -> None:
+        """This method saves validators and the response of the parsed page
+        :param parse_request: a ProfessionParseRequest instance
+        :param headers: a dictionary-like object with response headers
+        :param parse_response: a ProfessionParseResponse instance to reuse
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        entry = {'url': parse_request.url,
+                 'etag': etag,
+                 'last_modified': last_modified,
+                 'response': parse_response.dict()}
+        save_data_to_json(entry, self._get_file_path(parse_request))
+
+    def _load_entry(self, parse_request: ProfessionParseRequest) -> dict:
+        """This secondary method loads the cache entry of the request
+        :param parse_request: a ProfessionParseRequest instance
+        :return: a dictionary with the cache entry or an empty dictionary
+        """
+        file_path = self._get_file_path(parse_request)
+        if not os.path.exists(file_path):
+            return {}
+
+        return load_from_json(file_path)
+
+    def _get_file_path(self, parse_request: ProfessionParseRequest) -> str:
+        """This secondary method returns the path of the cache file. The key
+        includes the tags as well, so changed tags invalidate the entry
+        :param parse_request: a ProfessionParseRequest instance
+        :return: a string containing the file path
+        """
+        key = hashlib.sha1(parse_request.json().encode('utf-8')).hexdigest()
+        return os.path.join(self._cache_path, f'{key}.json')
@@ -1,15 +1,36 @@
 """This unit contains ParseManager class to rule parsing processes"""
-from asyncio import run
-from typing import Any, Union, Iterator
-from selenium import webdriver
-from selenium.webdriver.chrome.webdriver import WebDriver
-from async_utils import event_loop
-from constants import MULTY_THREAD_ATTEMPTS, ASYNC_ATTEMPTS, ATTEMPTS_GET_DRIVER
+from collections import Counter
+from asyncio import new_event_loop, gather, to_thread, wait_for, Semaphore
+from math import ceil
+from threading import Lock
+from time import sleep, perf_counter, monotonic
+from typing import Any, Union, Iterator, Optional
+from urllib.parse import urlparse
+from aiohttp import ClientSession
+from async_utils import (
+    event_loop, create_client_session, create_parse_executor, FetchContext)
+from constants import (
+    MULTY_THREAD_ATTEMPTS, ASYNC_ATTEMPTS, SYNC_MAX_IN_FLIGHT,
+    RUN_RETRY_BUDGET, RETRY_BASE_DELAY, RETRY_MAX_DELAY, FETCH_CONCURRENCY,
+    PARSE_EXECUTOR_TYPE, PARSE_WORKERS, TIERED_HTTP_ATTEMPTS, HOST_BATCH_SIZE,
+    QUEUE_LEASE_SIZE, QUEUE_POLL_DELAY, QUEUE_RUN_TIMEOUT,
+    QUEUE_LEASE_TIMEOUT, RUN_DEADLINE, SCHOOL_DEADLINE, DEADLINE_GRACE)
+from managers.driver_pool_manager import DriverPoolManager
+from managers.http_cache_manager import HttpCacheManager
+from managers.retry_scheduler import RetryScheduler, RetryBudget
+from managers.run_journal import RunJournal
+from managers.work_queue_manager import WorkQueueManager
+from parse_classes.browser_profile import BrowserProfile
+from parse_classes.rate_limit import RateLimit
 from parse_classes.school_parse_task import SchoolParseTask, \
     ProfessionParseRequest, ProfessionParseResponse
 from parsers.base_parser import BaseParser
-from utils import refactor_parse_responses
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from utils import (refactor_parse_responses, create_failed_response,
+                   is_deterministic_failure, get_time_left, get_wait_timeout,
+                   create_response, create_timestamp)
+from selenium.common.exceptions import WebDriverException
+from concurrent.futures import (
+    ThreadPoolExecutor, Future, wait, FIRST_COMPLETED)
 from create_loggers import logger
 # ------------------------------------------------------------------------
 
@@ -18,27 +39,244 @@ class ParseManager:
     """ParseManager class serves to manage asynchronous and synchronous
     parsing using provided parsers"""
     def __init__(self, parsers: dict[str, Any], parse_mapper: dict[str,
-                 str]) -> None:
+                 str], driver_pool: DriverPoolManager,
+                 http_cache: HttpCacheManager,
+                 browser_profiles: dict[str, BrowserProfile],
+                 rate_limits: dict[str, RateLimit],
+                 journal: RunJournal,
+                 work_queue: Optional[WorkQueueManager] = None) -> None:
         """Initialization of ParseManager class
         :param parsers: Dictionary of parsers
         :param parse_mapper: Dictionary of site names with parse regimes -
-        async or sync
+        async, sync or tiered
+        :param driver_pool: a DriverPoolManager instance providing selenium
+        sessions for sync parsing
+        :param http_cache: a HttpCacheManager instance to make conditional
+        requests during async parsing
+        :param browser_profiles: Dictionary of site names with BrowserProfile
+        instances, the default profile is used for the rest of the sites
+        :param rate_limits: Dictionary of site names with RateLimit instances
+        for http requests, the default limit is used for the rest of the sites
+        :param journal: a RunJournal instance to resume interrupted runs
+        :param work_queue: a WorkQueueManager instance to share requests with
+        worker processes on this host or None to parse everything in this
+        process
         """
         self._parsers = parsers
         self._parser_mapper = parse_mapper
+        self._driver_pool = driver_pool
+        self._http_cache = http_cache
+        self._browser_profiles = browser_profiles
+        self._rate_limits = rate_limits
+        self._journal = journal
+        self._work_queue = work_queue
+        self._retry_budget = RetryBudget(RUN_RETRY_BUDGET)
+        self._loop = new_event_loop()
+        self._session: Optional[ClientSession] = None
+        self._fetch_context: Optional[FetchContext] = None
+        self._parse_executor = create_parse_executor(
+            PARSE_EXECUTOR_TYPE, PARSE_WORKERS)
+        self._sync_executor = ThreadPoolExecutor(
+            max_workers=SYNC_MAX_IN_FLIGHT)
+        self._sync_in_flight = 0
+        self._sync_schools = 0
+        self._sync_lock = Lock()
+        self._tier_stats: dict[str, dict[str, int]] = {}
+        self._browser_runs: dict[str, dict[str, Any]] = {}
+        self._failures: dict[str, list[dict[str, Any]]] = {}
+        self._updated_at: Optional[str] = None
         self._parser_type = {'async': self._async_parser,
-                             'sync': self._multi_thread_parser}
+                             'sync': self._sync_parser,
+                             'tiered': self._tiered_parser}
 
     def parse_all(
-            self, parse_data: list[SchoolParseTask]) -> list[SchoolParseTask]:
+            self, parse_data: list[SchoolParseTask],
+            run_id: Optional[str] = None) -> list[SchoolParseTask]:
         """This is a main method to start parsing by using provided parse
-        data with urls and tags
+        data with urls and tags. Parsed responses are journaled to resume the
+        run after a restart. In the queue mode the queue keeps completed
+        responses instead, only the leased requests are parsed again
         :param parse_data: A list of SchoolParseTask instances with having
         parse request class with urls and tags necessary to parse data from
         sites
+        :param run_id: a string containing the id of a run made of several
+        calls, e.g. the refresh cycle, its journal is kept until the caller
+        finishes it, or None to journal only this call
         :return: A SchoolParseTask instances filled with
         ProfessionParseResponse instances containing data extracted from sites
         """
+        self._retry_budget = RetryBudget(RUN_RETRY_BUDGET)
+        self._tier_stats = {}
+        self._browser_runs = {}
+        self._failures = {}
+        self._updated_at = create_timestamp()
+
+        if self._work_queue is not None:
+            parse_data = self._parse_all_distributed(parse_data)
+            self._log_failure_summary()
+            self._log_rate_limit_state()
+            return parse_data
+
+        try:
+            restored_responses = self._journal.start(parse_data, run_id)
+            parse_data = self._loop.run_until_complete(
+                self._parse_all_schools(parse_data, restored_responses,
+                                        monotonic() + RUN_DEADLINE))
+            if run_id is None:
+                self._journal.finish()
+            self._log_failure_summary()
+            self._log_rate_limit_state()
+            return parse_data
+
+        finally:
+            self._journal.close()
+
+    def process_queue(self, work_queue: WorkQueueManager,
+                      worker_id: str) -> int:
+        """This method leases a batch of requests from the work queue, parses
+        them and pushes the responses back. It is called by workers in a loop.
+        The selenium pool is limited by the share of the hub given to the
+        worker, a worker without sessions does not lease requests. The run
+        journal is not used, responses are kept in the queue and requests of
+        a crashed worker are redelivered when the lease expires
+        :param work_queue: a WorkQueueManager instance with queued requests
+        :param worker_id: a string identifying the worker
+        :return: the amount of processed requests
+        """
+        sessions = work_queue.claim_sessions(
+            worker_id, self._driver_pool.hub_url, self._driver_pool.hub_limit)
+        self._driver_pool.set_max_sessions(sessions)
+        if not sessions:
+            return 0
+
+        queue_tasks = work_queue.lease(worker_id, QUEUE_LEASE_SIZE)
+        if not queue_tasks:
+            return 0
+
+        self._retry_budget = RetryBudget(RUN_RETRY_BUDGET)
+        school_tasks: dict[str, SchoolParseTask] = {}
+        for queue_task in queue_tasks:
+            school_tasks.setdefault(
+                queue_task.school_name,
+                SchoolParseTask(school_name=queue_task.school_name)
+            ).parse_requests.append(queue_task.parse_request)
+
+        deadline = monotonic() + min(RUN_DEADLINE, QUEUE_LEASE_TIMEOUT)
+        results = self._loop.run_until_complete(self._parse_schools(
+            list(school_tasks.values()), deadline=deadline))
+        responses = {(response.url, response.profession): response
+                     for _, result in results for response in result}
+
+        for queue_task in queue_tasks:
+            parse_request = queue_task.parse_request
+            parse_response = responses.get(
+                (parse_request.url, parse_request.profession))
+            work_queue.complete(
+                queue_task.task_id,
+                parse_response or create_response(parse_request))
+
+        logger.info(f'{worker_id} processed {len(queue_tasks)} queued '
+                    f'requests')
+        return len(queue_tasks)
+
+    def _parse_all_distributed(
+            self, parse_data: list[SchoolParseTask]) -> list[SchoolParseTask]:
+        """This method puts the requests to the work queue and waits while
+        workers parse them. The manager works as one more worker meanwhile
+        and shares its hub with the workers using the same one. Responses are
+        merged by schools in the same way as in local parsing
+        :param parse_data: A list of SchoolParseTask instances with parse
+        requests
+        :return: A list of SchoolParseTask instances filled with
+        ProfessionParseResponse instances
+        """
+        school_tasks = [task for task in parse_data
+                        if self._parser_mapper.get(task.school_name)]
+        run_id = self._work_queue.put(school_tasks)
+        worker_id = f'coordinator-{run_id}'
+        deadline = monotonic() + QUEUE_RUN_TIMEOUT
+
+        try:
+            while not self._work_queue.is_finished(run_id):
+                if monotonic() > deadline:
+                    logger.error(f'The run {run_id} is not finished in '
+                                 f'{QUEUE_RUN_TIMEOUT} seconds')
+                    break
+
+                if not self.process_queue(self._work_queue, worker_id):
+                    sleep(QUEUE_POLL_DELAY)
+
+        finally:
+            self._work_queue.leave(worker_id)
+            self._driver_pool.set_max_sessions(self._driver_pool.hub_limit)
+
+        responses = self._work_queue.get_responses(run_id)
+        self._work_queue.delete_run(run_id)
+
+        for school_index, task in enumerate(school_tasks):
+            result = [
+                responses.get((school_index, position))
+                or create_failed_response(parse_request, TimeoutError(
+                    'The queued request is not finished'))
+                for position, parse_request in enumerate(task.parse_requests)
+            ]
+            self._add_failures(task.school_name, result)
+            task.parse_responses.extend(
+                refactor_parse_responses(result, self._updated_at))
+
+        return parse_data
+
+    async def _parse_all_schools(
+            self, parse_data: list[SchoolParseTask],
+            restored_responses: dict,
+            deadline: float) -> list[SchoolParseTask]:
+        """This method parses all the schools concurrently in a single event
+        loop and fills the tasks with the responses
+        :param parse_data: A list of SchoolParseTask instances with parse
+        requests
+        :param restored_responses: a dictionary of ProfessionParseResponse
+        instances restored from the journal of the interrupted run
+        :param deadline: a monotonic time to stop parsing the run
+        :return: A list of SchoolParseTask instances filled with
+        ProfessionParseResponse instances
+        """
+        results = await self._parse_schools(
+            parse_data, restored_responses, deadline)
+        for task, result in results:
+            self._add_failures(task.school_name, result)
+            task.parse_responses.extend(
+                refactor_parse_responses(result, self._updated_at))
+
+        return parse_data
+
+    async def _parse_schools(
+            self, parse_data: list[SchoolParseTask],
+            restored_responses: Optional[dict] = None,
+            deadline: Optional[float] = None
+    ) -> list[tuple[SchoolParseTask, list[ProfessionParseResponse]]]:
+        """This method parses all the schools concurrently in a single event
+        loop. Asynchronous parsers run natively and synchronous ones are
+        offloaded to threads. Every school is limited by its own deadline and
+        the deadline of the run, requests unfinished by the deadline get
+        responses with the timeout reason
+        :param parse_data: A list of SchoolParseTask instances with parse
+        requests
+        :param restored_responses: a dictionary of ProfessionParseResponse
+        instances by urls and professions which are not parsed again
+        :param deadline: a monotonic time to stop parsing or None to use only
+        the deadlines of schools
+        :return: A list of tuples containing SchoolParseTask instances and
+        their raw ProfessionParseResponse instances
+        """
+        restored_responses = restored_responses or {}
+        if self._session is None or self._session.closed:
+            self._session = create_client_session()
+            self._fetch_context = FetchContext(
+                self._session, self._http_cache, self._parse_executor,
+                Semaphore(FETCH_CONCURRENCY), self._journal)
+
+        school_tasks = []
+        parse_coroutines = []
         for task in parse_data:
             parser_type = self._parser_mapper.get(task.school_name)
 
@@ -47,92 +285,356 @@ class ParseManager:
                     'ParseManager cannot find parser type for the data')
                 continue
 
-            result = self._parser_type[parser_type](
-                task.parse_requests, self._parsers[task.school_name])
+            restored, pending = [], []
+            for parse_request in task.parse_requests:
+                parse_response = restored_responses.get(
+                    (parse_request.url, parse_request.profession))
+                if parse_response:
+                    restored.append(parse_response)
+                else:
+                    pending.append(parse_request)
 
-            task.parse_responses.extend(refactor_parse_responses(result))
+            school_tasks.append((task, restored, pending))
+            if pending:
+                school_deadline = monotonic() + SCHOOL_DEADLINE
+                if deadline is not None:
+                    school_deadline = min(school_deadline, deadline)
 
-        return parse_data
+                parse_coroutines.append(wait_for(
+                    self._parser_type[parser_type](
+                        task.school_name, pending,
+                        self._parsers[task.school_name], school_deadline),
+                    max(get_time_left(school_deadline), 0) + DEADLINE_GRACE))
+
+        results = iter(
+            await gather(*parse_coroutines, return_exceptions=True))
+
+        school_results = []
+        for task, restored, pending in school_tasks:
+            result = next(results) if pending else []
+            if isinstance(result, Exception):
+                logger.error(f'Failed to parse {task.school_name}, error: '
+                             f'{result or type(result).__name__}')
+                result = [create_failed_response(item, result)
+                          for item in pending]
+
+            school_results.append((task, restored + result))
+
+        return school_results
+
+    def _add_failures(self, school_name: str,
+                      parse_responses: list[ProfessionParseResponse]) -> None:
+        """This secondary method adds failed responses of the school to the
+        failure summary of the run. Deterministic failures such as broken
+        selectors are flagged to be fixed on the tag sheet
+        :param school_name: the name of the parsed school
+        :param parse_responses: a list of ProfessionParseResponse instances
+        """
+        for parse_response in parse_responses:
+            if getattr(parse_response, 'price', None):
+                continue
+
+            failure = {
+                'url': parse_response.url,
+                'profession': parse_response.profession,
+                'reason': getattr(parse_response, 'failure_reason', None),
+                'detail': getattr(parse_response, 'failure_detail', None),
+                'deterministic': is_deterministic_failure(parse_response),
+            }
+            self._failures.setdefault(school_name, []).append(failure)
+
+            if failure['deterministic']:
+                logger.error(f'{school_name}: {parse_response.url} needs '
+                             f'new tags, {failure["reason"]}: '
+                             f'{failure["detail"]}')
+
+    def _log_failure_summary(self) -> None:
+        """This secondary method logs the amount of failures of the run by
+        their reasons"""
+        failures = [failure for school_failures in self._failures.values()
+                    for failure in school_failures]
+        if not failures:
+            return
 
-    def _async_parser(
+        reasons = Counter(failure['reason'] for failure in failures)
+        deterministic = [failure['url'] for failure in failures
+                         if failure['deterministic']]
+        logger.error(f'Run summary: {len(failures)} requests failed '
+                     f'{dict(reasons)}, deterministic failures are not '
+                     f'retried: {deterministic}')
+
+    def _log_rate_limit_state(self) -> None:
+        """This secondary method logs the state of the host limiters after
+        the run"""
+        for host, state in self.rate_limit_state.items():
+            logger.info(f'Rate limit of {host}: {state}')
+
+    @property
+    def rate_limit_state(self) -> dict[str, dict[str, Any]]:
+        """This property returns the current state of the request limiters
+        by hosts: the adaptive concurrency limit, requests in flight,
+        available tokens, the average latency and counters of throttled and
+        failed requests
+        :return: a dictionary with states by hosts
+        """
+        if self._fetch_context is None:
+            return {}
+
+        return {host: limiter.state for host, limiter
+                in self._fetch_context.host_limiters.items()}
+
+    @property
+    def failure_summary(self) -> dict[str, list[dict[str, Any]]]:
+        """This property returns the requests failed during the last run by
+        school names with their failure reasons
+        :return: a dictionary with lists of failures
+        """
+        return self._failures
+
+    async def _async_parser(
             self,
+            school_name: str,
             parse_requests: list[ProfessionParseRequest],
-            parser: BaseParser) -> list[ProfessionParseResponse]:
+            parser: BaseParser,
+            deadline: float) -> list[ProfessionParseResponse]:
         """This method serves as main asynchronous parser
+        :param school_name: the name of the school to parse
         :param parse_requests: list of ProfessionParseRequest instances with
         parse tags and urls
         :param parser: an instance of BaseParser for asynchronous parsing
         using BeautifulSoup package
+        :param deadline: a monotonic time to stop parsing the school
         :return: a list of ProfessionParseResponse instances filled with data
         received from sites or a list of empty instances instead
         """
         try:
-            total_parsed = []
-            for _ in range(ASYNC_ATTEMPTS):
-                result = run(event_loop(parse_requests, parser))
-                parsed, unparsed = self._sort_parsed_unparsed(result)
-                total_parsed.extend(parsed)
+            scheduler = self._create_scheduler(parse_requests, ASYNC_ATTEMPTS)
+            total_parsed, unparsed = await event_loop(
+                scheduler, parser, self._fetch_context,
+                self._rate_limits.get(school_name, RateLimit()), deadline)
 
-                if not unparsed:
-                    print('Asynch batch parsed successfully')
-                    return total_parsed
+            if not unparsed:
+                print('Asynch batch parsed successfully')
+                return total_parsed
 
-                parse_requests = unparsed
-
-            logger.error(f'Failed to parse {unparsed} attempts run out')
-            total_parsed.extend([
-                ProfessionParseResponse.from_orm(item)
-                for item in unparsed
-            ])
+            logger.error(f'Failed to parse '
+                         f'{[item.url for item, _ in unparsed]}')
+            total_parsed.extend(
+                parse_response for _, parse_response in unparsed)
 
             return total_parsed
 
         except Exception as e:
             print(f'There is an error during async parsing: {e}')
-            return [
-                ProfessionParseResponse().from_orm(item)
-                for item in parse_requests
-            ]
+            return [create_failed_response(item, e) for item in parse_requests]
+
+    async def _tiered_parser(
+            self,
+            school_name: str,
+            parse_requests: list[ProfessionParseRequest],
+            parser: BaseParser,
+            deadline: float) -> list[ProfessionParseResponse]:
+        """This method tries to parse pages downloaded by plain http requests
+        first and sends to the browser only the requests which could not be
+        parsed that way
+        :param school_name: the name of the school to parse
+        :param parse_requests: list of ProfessionParseRequest instances
+        with tags and urls to parse
+        :param parser: an instance of BaseParser supporting both static and
+        selenium parsing
+        :param deadline: a monotonic time to stop parsing the school
+        :return: a list of ProfessionParseResponse instances
+        """
+        try:
+            scheduler = self._create_scheduler(
+                parse_requests, TIERED_HTTP_ATTEMPTS)
+            parsed, unparsed = await event_loop(
+                scheduler, parser, self._fetch_context,
+                self._rate_limits.get(school_name, RateLimit()), deadline)
+
+        except Exception as e:
+            logger.error(f'There is an error during http parsing of '
+                         f'{school_name}: {e}')
+            parsed, unparsed = [], [(item, create_failed_response(item, e))
+                                    for item in parse_requests]
+
+        stats = self._tier_stats.setdefault(
+            school_name, {'http_hits': 0, 'browser_fallbacks': 0})
+        stats['http_hits'] += len(parsed)
+        stats['browser_fallbacks'] += len(unparsed)
+        logger.info(f'{school_name}: {len(parsed)} pages parsed by http, '
+                    f'{len(unparsed)} pages sent to the browser')
+
+        if unparsed:
+            parsed.extend(await self._sync_parser(
+                school_name, [item for item, _ in unparsed], parser,
+                deadline))
+
+        return parsed
+
+    async def _sync_parser(
+            self,
+            school_name: str,
+            parse_requests: list[ProfessionParseRequest],
+            parser: BaseParser,
+            deadline: float) -> list[ProfessionParseResponse]:
+        """This method runs the multithread parser in a separate thread to
+        not block the event loop
+        :param school_name: the name of the school to parse
+        :param parse_requests: list of ProfessionParseRequest instances
+        with tags and urls to parse
+        :param parser: an instance of BaseParser for multithread
+        parsing using selenium package
+        :param deadline: a monotonic time to stop parsing the school
+        :return: a list of ProfessionParseResponse instances
+        """
+        return await to_thread(
+            self._multi_thread_parser, school_name, parse_requests, parser,
+            deadline)
 
     def _multi_thread_parser(
             self,
+            school_name: str,
             parse_requests: list[ProfessionParseRequest],
-            parser: BaseParser) -> list[ProfessionParseResponse]:
-        """This method serves as main multithread parser
+            parser: BaseParser,
+            deadline: float) -> list[ProfessionParseResponse]:
+        """This method serves as main multithread parser. Requests are taken
+        from the scheduler as soon as they are ready, failed requests are
+        returned to the scheduler to be retried with backoff. Schools parsed
+        concurrently share the executor and the limit of batches in flight,
+        so they do not overcommit the sessions of the pool. When the
+        deadline is exceeded, batches which are not started are cancelled
+        and the unfinished requests get responses with the timeout reason
+        :param school_name: the name of the school to parse
         :param parse_requests: list of ProfessionParseRequest instances
         with tags and urls to parse
         :param parser: an instance of BaseParser for multithread
         parsing using selenium package
+        :param deadline: a monotonic time to stop parsing the school
         :return: a list of ProfessionParseResponse instances filled with data
         received from provided sites or an empty instances otherwise
         """
         result = []
-        for attempt in range(MULTY_THREAD_ATTEMPTS):
+        unparsed = []
+        start = perf_counter()
+        profile = self._browser_profiles.get(school_name, BrowserProfile())
+        scheduler = self._create_scheduler(
+            parse_requests, MULTY_THREAD_ATTEMPTS)
+        with self._sync_lock:
+            self._sync_schools += 1
+            share = max(self._get_max_in_flight() // self._sync_schools, 1)
+        self._driver_pool.warm_up(min(len(parse_requests), share), profile)
+
+        in_flight: dict[Future, list[ProfessionParseRequest]] = {}
+        try:
+            while scheduler or in_flight:
+                if get_time_left(deadline) <= 0:
+                    unfinished = [*scheduler.drain(), *(
+                        task for batch in in_flight.values()
+                        for task in batch)]
+                    logger.error(f'{school_name}: deadline is exceeded, '
+                                 f'{len(unfinished)} requests are not '
+                                 f'finished')
+                    unparsed.extend(
+                        create_failed_response(task, TimeoutError(
+                            'Deadline is exceeded')) for task in unfinished)
+                    break
+
+                with self._sync_lock:
+                    free_sessions = (self._get_max_in_flight()
+                                     - self._sync_in_flight)
+                    if free_sessions <= 0 and not in_flight:
+                        free_sessions = 1
+
+                    ready = scheduler.pop_ready(
+                        max(free_sessions, 0) * HOST_BATCH_SIZE)
+                    batches = self._group_by_host(ready, free_sessions)
+                    self._sync_in_flight += len(batches)
 
-            with ThreadPoolExecutor() as executor:
-                tasks = []
-                for task in parse_requests:
-                    print(f'{task.url} in process')
-                    driver = self._init_sync_driver()
+                for batch in batches:
+                    print(f'{[task.url for task in batch]} in process')
+                    future = self._sync_executor.submit(
+                        self._parse_host_batch, parser, batch, profile,
+                        deadline)
+                    future.add_done_callback(self._finish_sync_batch)
+                    in_flight[future] = batch
 
-                    tasks.append(executor.submit(parser, task, driver))
+                if not in_flight:
+                    sleep(get_wait_timeout(scheduler.time_to_next(), deadline))
+                    continue
 
-                finished = as_completed(tasks)
-                parsed, unparsed = self._sort_parsed_unparsed(finished)
+                finished, _ = wait(
+                    in_flight,
+                    timeout=get_wait_timeout(
+                        scheduler.time_to_next() if free_sessions > 0
+                        else None, deadline),
+                    return_when=FIRST_COMPLETED)
 
-                result.extend(parsed)
-                if not unparsed:
-                    return result
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    for task, task_result in zip(batch, future.result()):
+                        parsed, failed = self._sort_parsed_unparsed(
+                            [task_result])
+                        result.extend(parsed)
+                        for parse_response in parsed:
+                            self._journal.record(parse_response)
 
-            parse_requests = unparsed
+                        if failed and (is_deterministic_failure(task_result)
+                                       or not scheduler.retry(task)):
+                            unparsed.append(task_result)
 
-        logger.error(f'Error during sync parsing, 30 attempts are run out')
-        result.extend([
-                ProfessionParseResponse.from_orm(item)
-                for item in unparsed
-            ])
+        finally:
+            for future in in_flight:
+                future.cancel()
+            with self._sync_lock:
+                self._sync_schools -= 1
+
+        self._browser_runs[school_name] = {
+            'profile': profile.dict(),
+            'pages': len(parse_requests),
+            'duration': round(perf_counter() - start, 3),
+            'readiness': getattr(parser, 'readiness_stats', None),
+        }
+        logger.info(f'{school_name} browser run: '
+                    f'{self._browser_runs[school_name]}')
+
+        if unparsed:
+            logger.error(f'Error during sync parsing, failed to parse '
+                         f'{[task.url for task in unparsed]}')
+            result.extend(unparsed)
         return result
 
+    def _get_max_in_flight(self) -> int:
+        """This secondary method returns the limit of batches in flight
+        shared by the schools, it follows the limit of the selenium pool
+        :return: an integer
+        """
+        return min(SYNC_MAX_IN_FLIGHT, self._driver_pool.max_sessions)
+
+    def _finish_sync_batch(self, future: Future) -> None:
+        """This secondary method frees the place of a finished or cancelled
+        batch in the limit of batches in flight shared by the schools
+        :param future: a Future instance of the batch
+        """
+        with self._sync_lock:
+            self._sync_in_flight -= 1
+
+    def _create_scheduler(
+            self, parse_requests: list[ProfessionParseRequest],
+            max_attempts: int) -> RetryScheduler:
+        """This secondary method creates a RetryScheduler filled with the
+        provided requests and sharing the retry budget of the current run
+        :param parse_requests: list of ProfessionParseRequest instances
+        :param max_attempts: the maximum amount of attempts for a single url
+        :return: a RetryScheduler instance
+        """
+        scheduler = RetryScheduler(
+            max_attempts, self._retry_budget, RETRY_BASE_DELAY,
+            RETRY_MAX_DELAY)
+        scheduler.schedule(parse_requests)
+
+        return scheduler
+
     @staticmethod
     def _sort_parsed_unparsed(
             data: Union[Iterator[Future], list[ProfessionParseResponse],
@@ -156,34 +658,119 @@ class ParseManager:
 
         return parsed, unparsed
 
+    @property
+    def tier_stats(self) -> dict[str, dict[str, int]]:
+        """This property returns the amount of pages parsed by plain http
+        requests and sent to the browser for every tiered school during the
+        last run
+        :return: a dictionary with statistics by school names
+        """
+        return self._tier_stats
+
+    @property
+    def browser_runs(self) -> dict[str, dict[str, Any]]:
+        """This property returns the browser profile used for every school
+        parsed by selenium during the last run together with page load and
+        readiness statistics to compare profiles between runs
+        :return: a dictionary with the runs by school names
+        """
+        return self._browser_runs
+
     @staticmethod
-    def _init_sync_driver() -> WebDriver | None:
-        """This method initializes the sync selenium driver to parse sites with
-        JS or having another problems for standard asynchronous parsing
-        :return: a configured WebDriver instance
-        """
-
-        for _ in range(ATTEMPTS_GET_DRIVER):
-            try:
-                options = webdriver.ChromeOptions()
-                options.add_argument("--headless")
-                options.add_argument("--no-sandbox")
-                options.add_argument("--window-size=640x480")
-                options.add_argument("--disable-dev-shm-usage")
-                options.add_argument(
-                    "--disable-blink-features=AutomationControlled")
-                options.add_argument("--blink-settings=imagesEnabled=false")
-                options.add_argument("--disable-setuid-sandbox")
-
-                driver = webdriver.Remote(
-                    desired_capabilities=webdriver.DesiredCapabilities.CHROME,
-                    command_executor='http://localhost:4444/wd/hub',
-                    options=options
-                )
-
-                return driver
-
-            except Exception as e:
-                logger.error(
-                    f'There was an error in the init_sync_driver function: {e}')
-        return None
+    def _group_by_host(
+            parse_requests: list[ProfessionParseRequest],
+            sessions: int) -> list[list[ProfessionParseRequest]]:
+        """This method groups requests by the host of their urls. Each group is
+        split into batches to be parsed one by one in a single session, the
+        batches are balanced to keep all available sessions busy
+        :param parse_requests: list of ProfessionParseRequest instances
+        :param sessions: the amount of sessions available for the requests
+        :return: a list of batches of ProfessionParseRequest instances
+        """
+        if not parse_requests:
+            return []
+
+        batch_size = min(
+            HOST_BATCH_SIZE, ceil(len(parse_requests) / max(sessions, 1)))
+        groups: dict[str, list[ProfessionParseRequest]] = {}
+        for parse_request in parse_requests:
+            host = urlparse(parse_request.url or '').netloc
+            groups.setdefault(host, []).append(parse_request)
+
+        return [group[index:index + batch_size]
+                for group in groups.values()
+                for index in range(0, len(group), batch_size)]
+
+    def _parse_host_batch(
+            self, parser: BaseParser,
+            parse_requests: list[ProfessionParseRequest],
+            profile: BrowserProfile, deadline: Optional[float] = None
+    ) -> list[Union[ProfessionParseResponse, ProfessionParseRequest]]:
+        """This method leases a selenium session from the pool and parses the
+        requests of a single host one after another in that session. If
+        a page fails, the session is recycled and a fresh one is leased for
+        the rest of the batch. The deadline is checked before every page, the
+        rest of the batch gets responses with the timeout reason after it
+        :param parser: an instance of BaseParser for multithread parsing
+        using selenium package
+        :param parse_requests: a list of ProfessionParseRequest instances
+        having urls of the same host
+        :param profile: a BrowserProfile instance of the leased session
+        :param deadline: a monotonic time to stop parsing or None
+        :return: a list of ProfessionParseResponse instances for parsed
+        requests and ProfessionParseRequest instances for failed ones
+        """
+        host = urlparse(parse_requests[0].url or '').netloc
+        results = []
+        driver = None
+        is_leased = False
+        pages = 0
+
+        try:
+            for parse_request in parse_requests:
+                time_left = get_time_left(deadline)
+                if time_left is not None and time_left <= 0:
+                    raise TimeoutError('Deadline is exceeded')
+
+                if not is_leased:
+                    driver = self._driver_pool.lease(profile, host, time_left)
+                    is_leased, pages = True, 0
+
+                if driver is None:
+                    result = create_failed_response(
+                        parse_request, WebDriverException(
+                            'Selenium session is not available'))
+                else:
+                    result = parser(parse_request, driver)
+                    pages += 1
+                results.append(result)
+
+                if not getattr(result, 'price', None):
+                    is_leased = False
+                    self._driver_pool.release(driver, True, host, pages)
+
+            return results
+
+        except TimeoutError as e:
+            results.extend(create_failed_response(parse_request, e)
+                           for parse_request in parse_requests[len(results):])
+            return results
+
+        finally:
+            if is_leased:
+                self._driver_pool.release(
+                    driver, len(results) < len(parse_requests), host, pages)
+
+    def close(self) -> None:
+        """This method releases resources held by the manager such as
+        selenium sessions, the http session, the parse pool and the event
+        loop"""
+        self._driver_pool.close()
+
+        if self._session is not None and not self._session.closed:
+            self._loop.run_until_complete(self._session.close())
+
+        self._parse_executor.shutdown()
+        self._sync_executor.shutdown(cancel_futures=True)
+        self._loop.run_until_complete(self._loop.shutdown_default_executor())
+        self._loop.close()
@@ -1,69 +1,221 @@
 """This file contains the ParseStoreManager class created to save and
 download parse data in the storage for reservation"""
+import hashlib
+import json
 import os
-from typing import Optional
+import sqlite3
+from threading import RLock
+from time import time
+from typing import Any, Optional
 from create_loggers import logger
 from parse_classes.school_parse_task import SchoolParseTask
-from utils import (save_data_to_json, load_from_json,
-                   convert_json_to_parse_tasks, convert_parse_tasks_to_json)
+from utils import (load_from_json, convert_json_to_parse_tasks,
+                   convert_parse_tasks_to_json)
 # --------------------------------------------------------------------------
 
 
 class ParseStorageManager:
     """The ParseStorageManager class provides a mechanism for storing and
-    downloading parse data"""
-    def __init__(self, storage_path: str) -> None:
+    downloading parse data. Versions of the parse data are kept in the SQLite
+    database: the content of a version is stored once by its hash, so saving
+    the same tags again does not copy them, and every version is written in
+    a single transaction. The latest version and any previous one are read
+    by the primary key. The save files of the previous storage are imported
+    on the first start"""
+    DB_NAME = 'snapshots.db'
+
+    def __init__(self, storage_path: str, max_versions: int) -> None:
         """Initialize the ParseStorageManager class
         :param storage_path: a string containing the path to the storage
         directory
+        :param max_versions: the maximum amount of versions to keep
         """
-        self._current_file_version: int = 0
         self._storage_path: str = storage_path
+        self._max_versions = max_versions
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = RLock()
 
-    def save_to_storage(
-            self, parse_data: list[SchoolParseTask],
-            max_files: int = 10) -> None:
-        """This method is called to save the parse data to the storage
+    def save_to_storage(self, parse_data: list[SchoolParseTask]
+                        ) -> Optional[int]:
+        """This method is called to save the parse data to the storage. A new
+        version is not created if the data equals the latest version
         :param parse_data: a list of SchoolParseTask instances
-        :param max_files: the maximum amount of files to store
+        :return: the id of the latest version or None if it is not saved
         """
-        result = convert_parse_tasks_to_json(parse_data)
-        if self._current_file_version > max_files - 1:
-            self._current_file_version = 0
+        try:
+            return self._save(convert_parse_tasks_to_json(parse_data))
 
-        file_path = os.path.join(
-            self._storage_path, f'save{self._current_file_version}.json')
-        save_data_to_json(result, file_path)
-        self._current_file_version += 1
+        except Exception as e:
+            logger.error(f'Failed to save data to {self._storage_path}, '
+                         f'error {e}')
+            return None
 
     def load_from_storage(
             self, version: int = None) -> Optional[list[SchoolParseTask]]:
         """This method is called to load the parse data from the storage in
         case of the data was removed from the Google Sheet or the sheet is
-        unavailable
-        :param version: the version of the file to load
-        :return: a list of SchoolParseTask instances or None if the file
+        unavailable. If the latest version is broken, the previous valid one
+        is loaded
+        :param version: the id of the version to load or None to load the
+        latest one
+        :return: a list of SchoolParseTask instances or None if the version
         cannot be loaded
         """
         try:
-            all_files = next(os.walk(self._storage_path))[2]
-            if self._current_file_version < len(all_files):
-                self._current_file_version = len(all_files) - 1
+            with self._lock:
+                connection = self._get_connection()
+                if version is not None:
+                    rows = connection.execute(
+                        'SELECT v.id, v.hash, c.data FROM versions v JOIN '
+                        'contents c ON c.hash = v.hash WHERE v.id = ?',
+                        (version,)).fetchall()
+                else:
+                    rows = connection.execute(
+                        'SELECT v.id, v.hash, c.data FROM versions v JOIN '
+                        'contents c ON c.hash = v.hash ORDER BY v.id DESC')
 
-            if version is None or type(version) is not int:
-                version = self._current_file_version
-
-            while version >= self._current_file_version:
-                parse_file = os.path.join(
-                    self._storage_path, f'save{version}.json')
-                parse_data = load_from_json(parse_file)
-
-                if parse_data:
-                    return convert_json_to_parse_tasks(parse_data)
-                version -= 1
+                for version_id, content_hash, data in rows:
+                    parse_data = self._decode(version_id, content_hash, data)
+                    if parse_data:
+                        return convert_json_to_parse_tasks(parse_data)
 
         except Exception as e:
             logger.error(f'Failed to load data from {self._storage_path}, '
                          f'error {e}')
 
         return None
+
+    def get_versions(self) -> list[dict[str, Any]]:
+        """This method returns the saved versions from the latest one
+        :return: a list of dictionaries with ids, hashes, creation times and
+        the amount of requests of the versions
+        """
+        with self._lock:
+            rows = self._get_connection().execute(
+                'SELECT id, hash, created_at, requests FROM versions '
+                'ORDER BY id DESC').fetchall()
+
+        return [{'id': version_id, 'hash': content_hash,
+                 'created_at': created_at, 'requests': requests}
+                for version_id, content_hash, created_at, requests in rows]
+
+    def close(self) -> None:
+        """This method closes the database connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _save(self, data: dict[str, list[dict]],
+              created_at: Optional[float] = None) -> int:
+        """This secondary method writes the data as a new version in
+        a single transaction and removes the versions over the limit
+        :param data: a dictionary with parse requests by school names
+        :param created_at: the timestamp of the version or None to use the
+        current time
+        :return: the id of the latest version
+        """
+        content = json.dumps(data, ensure_ascii=False, sort_keys=True,
+                             separators=(',', ':'))
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        requests = sum(len(rows) for rows in data.values())
+
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                latest = connection.execute(
+                    'SELECT id, hash FROM versions ORDER BY id DESC LIMIT 1'
+                ).fetchone()
+                if latest and latest[1] == content_hash:
+                    return latest[0]
+
+                connection.execute(
+                    'INSERT OR IGNORE INTO contents (hash, data) '
+                    'VALUES (?, ?)', (content_hash, content))
+                version_id = connection.execute(
+                    'INSERT INTO versions (hash, created_at, requests) '
+                    'VALUES (?, ?, ?)',
+                    (content_hash, created_at or time(), requests)).lastrowid
+                self._remove_old_versions(connection)
+
+        logger.info(f'Parse data is saved as the version {version_id}, '
+                    f'{requests} requests')
+        return version_id
+
+    def _remove_old_versions(self, connection: sqlite3.Connection) -> None:
+        """This secondary method removes the versions over the limit and the
+        contents which are not used by any version
+        :param connection: a Connection instance inside a transaction
+        """
+        connection.execute(
+            'DELETE FROM versions WHERE id NOT IN (SELECT id FROM versions '
+            'ORDER BY id DESC LIMIT ?)', (self._max_versions,))
+        connection.execute(
+            'DELETE FROM contents WHERE hash NOT IN '
+            '(SELECT DISTINCT hash FROM versions)')
+
+    @staticmethod
+    def _decode(version_id: int, content_hash: str,
+                data: str) -> Optional[dict[str, list[dict]]]:
+        """This secondary method checks the hash of the version content and
+        decodes it
+        :param version_id: the id of the version
+        :param content_hash: the hash saved with the version
+        :param data: a string containing the JSON content
+        :return: a dictionary with parse requests by school names or None if
+        the content is broken
+        """
+        if hashlib.sha256(data.encode('utf-8')).hexdigest() != content_hash:
+            logger.error(f'The version {version_id} of parse data is broken')
+            return None
+
+        return json.loads(data)
+
+    def _import_save_files(self) -> None:
+        """This secondary method imports save files of the previous storage
+        in the order they were written and removes them"""
+        file_names = sorted(
+            (file_name for file_name in os.listdir(self._storage_path)
+             if file_name.startswith('save') and file_name.endswith('.json')),
+            key=lambda file_name: os.path.getmtime(
+                os.path.join(self._storage_path, file_name)))
+
+        for file_name in file_names:
+            file_path = os.path.join(self._storage_path, file_name)
+            data = load_from_json(file_path)
+            if data:
+                self._save(data, os.path.getmtime(file_path))
+            os.remove(file_path)
+
+        if file_names:
+            logger.info(f'{len(file_names)} save files are imported to '
+                        f'the storage')
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """This secondary method opens the database on the first use,
+        creates its tables and imports the save files of the previous storage
+        :return: a Connection instance
+        """
+        if self._connection is None:
+            os.makedirs(self._storage_path, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self._storage_path, self.DB_NAME),
+                timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=FULL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS contents ('
+                'hash TEXT PRIMARY KEY, '
+                'data TEXT NOT NULL)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS versions ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'hash TEXT NOT NULL REFERENCES contents (hash), '
+                'created_at REAL NOT NULL, '
+                'requests INTEGER NOT NULL)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS versions_hash '
+                'ON versions (hash)')
+            self._import_save_files()
+
+        return self._connection
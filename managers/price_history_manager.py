@@ -0,0 +1,206 @@
+"""This file contains the PriceHistoryManager class to keep the history of
+prices in the SQLite database"""
+import sqlite3
+from datetime import date, timedelta
+from threading import Lock
+from typing import Any, Optional
+from constants import PRICE_HISTORY_DAYS, PRICE_CHANGES_DAYS
+from create_loggers import logger
+from parse_classes.results_table import ResultsTable
+# --------------------------------------------------------------------------
+
+
+class PriceHistoryManager:
+    """The PriceHistoryManager class keeps a price observation of every
+    course per day. Courses are identified by the school, the profession and
+    the course level, observations are clustered by the course and the day,
+    so the history of a course is read by a single range scan of the primary
+    key. Changes against the previous observation are calculated on ingest
+    and indexed by the day. The history sheet is a mirror of this store"""
+    def __init__(self, db_path: str) -> None:
+        """Initialize the PriceHistoryManager class
+        :param db_path: a string containing the path to the database file
+        """
+        self._db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def ingest(self, results: ResultsTable) -> int:
+        """This method adds the results of a run to the history in a single
+        transaction. The day of a row is taken from its update time, a row
+        observed again on the same day replaces the previous observation.
+        Rows without a price are failed or empty parses, they are skipped
+        :param results: a ResultsTable instance
+        :return: the amount of ingested rows
+        """
+        today = date.today().isoformat()
+        rows = [(school, profession, course_level, url,
+                 updated_at[:10] if updated_at else today, updated_at,
+                 price, period, total)
+                for school, profession, course_level, url, updated_at,
+                price, period, total in results.to_history_rows()
+                if price is not None]
+        if not rows:
+            return 0
+
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT INTO courses (school, profession, course_level, '
+                    'url) VALUES (?, ?, ?, ?) ON CONFLICT (school, '
+                    'profession, course_level) DO UPDATE SET url = '
+                    'excluded.url', [row[:4] for row in rows])
+                course_ids = {
+                    (school, profession, course_level): course_id
+                    for course_id, school, profession, course_level
+                    in connection.execute(
+                        'SELECT id, school, profession, course_level '
+                        'FROM courses')}
+                connection.executemany(
+                    'INSERT OR REPLACE INTO prices (course_id, day, '
+                    'updated_at, price, period, total) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(course_ids[row[:3]], *row[4:]) for row in rows])
+                self._update_changes(
+                    connection, sorted({row[4] for row in rows}))
+
+        logger.info(f'{len(rows)} rows are added to the price history')
+        return len(rows)
+
+    def get_price_history(
+            self, school: str, profession: str,
+            course_level: Optional[str] = None,
+            days: int = PRICE_HISTORY_DAYS) -> list[dict[str, Any]]:
+        """This method returns the observations of a profession for the last
+        days
+        :param school: the name of the school
+        :param profession: the name of the profession
+        :param course_level: the course level or None for all the levels
+        :param days: the amount of days to look back
+        :return: a list of dictionaries ordered by the course level and
+        the day
+        """
+        query = ('SELECT c.course_level, p.day, p.price, p.period, p.total, '
+                 'p.price_change, p.period_change, c.url FROM courses c '
+                 'JOIN prices p ON p.course_id = c.id WHERE c.school = ? '
+                 'AND c.profession = ? AND p.day >= ?')
+        parameters = [school, profession, self._get_start_day(days)]
+        if course_level is not None:
+            query += ' AND c.course_level = ?'
+            parameters.append(course_level)
+
+        with self._lock:
+            rows = self._get_connection().execute(
+                query + ' ORDER BY c.course_level, p.day',
+                parameters).fetchall()
+
+        return [self._create_row(row, ('course_level', 'day', 'price',
+                                       'period', 'total', 'price_change',
+                                       'period_change', 'url'))
+                for row in rows]
+
+    def get_changes(
+            self, days: int = PRICE_CHANGES_DAYS) -> list[dict[str, Any]]:
+        """This method returns the observations of the last days which
+        changed the price or the period of a course
+        :param days: the amount of days to look back
+        :return: a list of dictionaries ordered by the day
+        """
+        with self._lock:
+            rows = self._get_connection().execute(
+                'SELECT p.day, c.school, c.profession, c.course_level, '
+                'p.price, p.period, p.price_change, p.period_change, c.url '
+                'FROM prices p JOIN courses c '
+                'ON c.id = p.course_id WHERE p.day >= ? AND '
+                '(p.price_change != 0 OR p.period_change != 0) '
+                'ORDER BY p.day, c.school, c.profession, c.course_level',
+                (self._get_start_day(days),)).fetchall()
+
+        return [self._create_row(row, ('day', 'school', 'profession',
+                                       'course_level', 'price', 'period',
+                                       'price_change', 'period_change',
+                                       'url'))
+                for row in rows]
+
+    def close(self) -> None:
+        """This method closes the database connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @staticmethod
+    def _update_changes(connection: sqlite3.Connection,
+                        days: list[str]) -> None:
+        """This secondary method calculates changes of the observations of
+        the days against the previous observations of the same courses
+        having a price
+        :param connection: a Connection instance inside a transaction
+        :param days: a list of days in the ISO format
+        """
+        connection.executemany(
+            'UPDATE prices SET (price_change, period_change) = ('
+            'SELECT prices.price - previous.price, '
+            'round(prices.period - previous.period, 2) '
+            'FROM prices previous WHERE previous.course_id = '
+            'prices.course_id AND previous.day < prices.day '
+            'AND previous.price IS NOT NULL '
+            'ORDER BY previous.day DESC LIMIT 1) WHERE day = ?',
+            [(day,) for day in days])
+
+    @staticmethod
+    def _get_start_day(days: int) -> str:
+        """This secondary method calculates the first day of a period
+        :param days: the amount of days in the period
+        :return: a string containing the day in the ISO format
+        """
+        return (date.today() - timedelta(days=days)).isoformat()
+
+    @staticmethod
+    def _create_row(row: tuple, columns: tuple[str, ...]) -> dict[str, Any]:
+        """This secondary method converts a row of the database into a
+        dictionary, integer numbers are returned as integers
+        :param row: a tuple of values
+        :param columns: names of the columns
+        :return: a dictionary
+        """
+        return {column: int(value) if isinstance(value, float)
+                and value.is_integer() else value
+                for column, value in zip(columns, row)}
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """This secondary method opens the database on the first use and
+        creates the tables of the history
+        :return: a Connection instance
+        """
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self._db_path, timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS courses ('
+                'id INTEGER PRIMARY KEY, '
+                'school TEXT NOT NULL, '
+                'profession TEXT NOT NULL, '
+                'course_level TEXT NOT NULL, '
+                'url TEXT, '
+                'UNIQUE (school, profession, course_level))')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS prices ('
+                'course_id INTEGER NOT NULL REFERENCES courses (id), '
+                'day TEXT NOT NULL, '
+                'updated_at TEXT, '
+                'price REAL, '
+                'period REAL, '
+                'total REAL, '
+                'price_change REAL, '
+                'period_change REAL, '
+                'PRIMARY KEY (course_id, day)) WITHOUT ROWID')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS prices_day ON prices (day)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS prices_changes ON prices (day) '
+                'WHERE price_change != 0 OR period_change != 0')
+
+        return self._connection
@@ -0,0 +1,306 @@
+"""This unit contains RefreshScheduler class to refresh every parse request
+with its own interval instead of parsing everything once a day"""
+import heapq
+import os
+from itertools import count
+from random import uniform
+from time import time
+from typing import Optional
+from create_loggers import logger
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest, ProfessionParseResponse
+from utils import save_data_to_json, load_from_json
+# ------------------------------------------------------------------------
+
+
+class RefreshScheduler:
+    """RefreshScheduler class keeps a priority queue of parse requests ordered
+    by the time they have to be refreshed. The interval of a request is taken
+    from the tag sheet or learned from its price changes: it is halved when
+    the price changes and grows while the price stays the same. The latest
+    responses of all requests are kept to publish them at once"""
+    def __init__(self, state_path: str, default_interval: float,
+                 min_interval: float, max_interval: float,
+                 backoff: float, retry_delay: float) -> None:
+        """Initialization of RefreshScheduler class
+        :param state_path: a path of the JSON file to keep intervals and
+        responses between restarts
+        :param default_interval: the initial interval in seconds
+        :param min_interval: the lower limit of a learned interval in seconds
+        :param max_interval: the upper limit of a learned interval in seconds
+        :param backoff: the multiplier of the interval if the price was not
+        changed
+        :param retry_delay: a delay in seconds before the next attempt of
+        a failed request
+        """
+        self._state_path = state_path
+        self._default_interval = default_interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._retry_delay = retry_delay
+        self._queue: list[tuple[float, int, tuple[str, str, str]]] = []
+        self._entries: dict[tuple[str, str, str], dict] = {}
+        self._saved: dict[tuple[str, str, str], dict] = {}
+        self._updated: set[tuple[str, str, str]] = set()
+        self._taken: set[tuple[str, str, str]] = set()
+        self._order = count()
+
+    def sync(self, parse_data: list[SchoolParseTask]) -> None:
+        """This method updates the scheduled requests by the parse data
+        loaded from the tag sheet. New requests are ready to be parsed
+        immediately, removed ones are dropped from the queue
+        :param parse_data: a list of SchoolParseTask instances
+        """
+        entries = {}
+        now = time()
+        for task in parse_data:
+            for parse_request in task.parse_requests:
+                key = self._get_key(task.school_name, parse_request)
+                entry = (self._entries.get(key) or self._saved.pop(key, None)
+                         or {'interval': self._default_interval, 'due': now,
+                             'responses': []})
+                entry['request'] = parse_request
+                entries[key] = entry
+
+        self._entries = entries
+        self._queue = []
+        self._taken = set()
+        for key, entry in entries.items():
+            configured = self._get_configured_interval(entry['request'])
+            if configured:
+                entry['due'] = min(entry['due'], now + configured)
+            self._push(key, entry['due'])
+
+        logger.info(f'{len(entries)} requests are scheduled for refresh')
+
+    def pop_due(self, limit: int) -> list[SchoolParseTask]:
+        """This method takes the requests which must be refreshed. They stay
+        taken until they are updated or scheduled again by the requeue_taken
+        method
+        :param limit: the maximum amount of requests to take
+        :return: a list of SchoolParseTask instances with the requests grouped
+        by schools
+        """
+        now = time()
+        tasks: dict[str, SchoolParseTask] = {}
+        taken = 0
+        while self._queue and self._queue[0][0] <= now and taken < limit:
+            due, _, key = heapq.heappop(self._queue)
+            entry = self._entries.get(key)
+            if entry is None or entry['due'] != due:
+                continue
+
+            tasks.setdefault(key[0], SchoolParseTask(school_name=key[0]))
+            tasks[key[0]].parse_requests.append(entry['request'])
+            self._taken.add(key)
+            taken += 1
+
+        return list(tasks.values())
+
+    def update(self, parse_data: list[SchoolParseTask]) -> None:
+        """This method saves new responses of the parsed requests and
+        schedules their next refresh
+        :param parse_data: a list of SchoolParseTask instances filled with
+        ProfessionParseResponse instances
+        """
+        now = time()
+        for task in parse_data:
+            responses: dict[tuple[str, str, str], list] = {}
+            for parse_response in task.parse_responses:
+                key = self._get_key(task.school_name, parse_response)
+                responses.setdefault(key, []).append(parse_response)
+
+            for parse_request in task.parse_requests:
+                key = self._get_key(task.school_name, parse_request)
+                entry = self._entries.get(key)
+                self._taken.discard(key)
+                if entry is not None:
+                    self._update_entry(
+                        key, entry, responses.get(key, []), now)
+
+    def requeue_taken(self) -> None:
+        """This method schedules the taken requests which were not updated
+        again after the retry delay, e.g. if the parsing failed or their
+        school was not parsed"""
+        due = time() + self._retry_delay
+        for key in self._taken:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['due'] = due
+                self._push(key, due)
+
+        if self._taken:
+            logger.error(f'{len(self._taken)} requests were not refreshed, '
+                         f'they are scheduled again')
+        self._taken = set()
+
+    def get_results(self) -> list[SchoolParseTask]:
+        """This method returns the latest responses of all the requests
+        :return: a list of SchoolParseTask instances filled with
+        ProfessionParseResponse instances
+        """
+        return self._collect(self._entries)
+
+    def get_updates(self) -> list[SchoolParseTask]:
+        """This method returns the responses refreshed since the updates
+        were cleared
+        :return: a list of SchoolParseTask instances filled with
+        ProfessionParseResponse instances
+        """
+        updated = {key: self._entries[key] for key in self._entries
+                   if key in self._updated}
+
+        return self._collect(updated)
+
+    def clear_updates(self) -> None:
+        """This method forgets the refreshed responses after they are
+        published"""
+        self._updated = set()
+
+    @property
+    def has_updates(self) -> bool:
+        """This property shows if there are responses to publish
+        :return: True if some requests were refreshed since the last
+        publishing
+        """
+        return bool(self._updated)
+
+    def save(self) -> None:
+        """This method saves intervals, due times and responses of the
+        requests to keep them between restarts"""
+        data = [{'school_name': key[0], 'url': key[1], 'profession': key[2],
+                 'interval': entry['interval'], 'due': entry['due'],
+                 'responses': [response.dict()
+                               for response in entry['responses']]}
+                for key, entry in self._entries.items()]
+        save_data_to_json(data, self._state_path)
+
+    def load(self) -> None:
+        """This method loads the state saved by the previous start. It must
+        be called before the first sync"""
+        if not os.path.exists(self._state_path):
+            return
+
+        for row in load_from_json(self._state_path) or []:
+            try:
+                key = (row['school_name'], row['url'], row['profession'])
+                self._saved[key] = {
+                    'interval': row['interval'], 'due': row['due'],
+                    'responses': [ProfessionParseResponse(**response)
+                                  for response in row['responses']]}
+
+            except Exception as e:
+                logger.error(f'Broken refresh state row {row}, error: {e}')
+
+    def _update_entry(self, key: tuple[str, str, str], entry: dict,
+                      responses: list[ProfessionParseResponse],
+                      now: float) -> None:
+        """This secondary method keeps the new responses of the request and
+        adapts its interval
+        :param key: the key of the request
+        :param entry: a dictionary with the state of the request
+        :param responses: a list of new ProfessionParseResponse instances
+        :param now: the current timestamp
+        """
+        if not any(getattr(row, 'price', None) for row in responses):
+            logger.error(f'{key[1]} was not refreshed, the previous data '
+                         f'is kept')
+            entry['due'] = now + self._retry_delay
+            self._push(key, entry['due'])
+            return
+
+        is_changed = self._set_changes(entry['responses'], responses)
+        configured = self._get_configured_interval(entry['request'])
+
+        if configured:
+            entry['interval'] = configured
+        elif is_changed:
+            entry['interval'] = max(
+                self._min_interval, entry['interval'] / 2)
+        else:
+            entry['interval'] = min(
+                self._max_interval, entry['interval'] * self._backoff)
+
+        entry['responses'] = responses
+        entry['due'] = now + entry['interval'] * uniform(0.9, 1.1)
+        self._push(key, entry['due'])
+        self._updated.add(key)
+
+    @staticmethod
+    def _set_changes(old_responses: list[ProfessionParseResponse],
+                     new_responses: list[ProfessionParseResponse]) -> bool:
+        """This secondary method calculates price and period changes of the
+        new responses in comparison with the previous ones of the same course
+        level
+        :param old_responses: a list of the previous ProfessionParseResponse
+        instances
+        :param new_responses: a list of the new ProfessionParseResponse
+        instances
+        :return: True if any price was changed
+        """
+        old_rows = {row.course_level: row for row in old_responses}
+        is_changed = False
+        for row in new_responses:
+            old_row = old_rows.get(row.course_level)
+            if old_row is None:
+                continue
+
+            try:
+                row.price_change = row.price - old_row.price
+            except TypeError:
+                row.price_change = 0
+
+            try:
+                row.period_change = round(row.period - old_row.period, 2)
+            except TypeError:
+                row.period_change = 0
+
+            is_changed = is_changed or row.price != old_row.price
+
+        return is_changed
+
+    @staticmethod
+    def _collect(entries: dict) -> list[SchoolParseTask]:
+        """This secondary method groups responses of the entries by schools
+        :param entries: a dictionary with states of the requests
+        :return: a list of SchoolParseTask instances
+        """
+        tasks: dict[str, SchoolParseTask] = {}
+        for key, entry in entries.items():
+            task = tasks.setdefault(
+                key[0], SchoolParseTask(school_name=key[0]))
+            task.parse_requests.append(entry['request'])
+            task.parse_responses.extend(entry['responses'])
+
+        return list(tasks.values())
+
+    @staticmethod
+    def _get_configured_interval(
+            parse_request: ProfessionParseRequest) -> Optional[float]:
+        """This secondary method returns the interval set on the tag sheet
+        :param parse_request: a ProfessionParseRequest instance
+        :return: the interval in seconds or None if it is not set
+        """
+        try:
+            return float(parse_request.refresh_interval) * 3600 or None
+
+        except (TypeError, ValueError):
+            return None
+
+    def _push(self, key: tuple[str, str, str], due: float) -> None:
+        """This secondary method adds the request to the queue
+        :param key: the key of the request
+        :param due: the timestamp when the request must be refreshed
+        """
+        heapq.heappush(self._queue, (due, next(self._order), key))
+
+    @staticmethod
+    def _get_key(school_name: str, row) -> tuple[str, str, str]:
+        """This secondary method returns the key of the request or response
+        :param school_name: the name of the school
+        :param row: a ProfessionParseRequest or ProfessionParseResponse
+        instance
+        :return: a tuple of the school name, the url and the profession
+        """
+        return school_name, row.url, row.profession
@@ -0,0 +1,285 @@
+"""This file contains the ResultSnapshotManager class to keep daily parse
+results as full bases and deltas"""
+import gzip
+import json
+import os
+from datetime import date, timedelta
+from itertools import repeat
+from threading import Lock
+from typing import Any, Optional
+from create_loggers import logger
+# --------------------------------------------------------------------------
+
+
+class ResultSnapshotManager:
+    """The ResultSnapshotManager class keeps a snapshot of the results of
+    every day. A full base is written periodically, other days are deltas
+    against the previous day: rows of a school are addressed by positions,
+    only changed fields are written and update times are run-length encoded.
+    A day is rebuilt from its base by applying the deltas in order. Files are
+    compressed and replaced atomically"""
+    BASE_SUFFIX = '.base.json.gz'
+    DELTA_SUFFIX = '.delta.json.gz'
+
+    def __init__(self, snapshots_path: str, base_interval: int,
+                 max_days: int) -> None:
+        """Initialize the ResultSnapshotManager class
+        :param snapshots_path: a string containing the path to the directory
+        with snapshots
+        :param base_interval: the maximum amount of days between full bases
+        :param max_days: the amount of days to keep snapshots
+        """
+        self._snapshots_path = snapshots_path
+        self._base_interval = base_interval
+        self._max_days = max_days
+        self._cache: dict[str, dict[str, list[dict]]] = {}
+        self._lock = Lock()
+
+    def save(self, data: dict[str, list[dict]],
+             day: Optional[str] = None) -> None:
+        """This method saves the results as the snapshot of the day. A delta
+        is written if there is a recent base and the delta is smaller than
+        the half of the results, the snapshot of the same day is replaced
+        :param data: a dictionary with lists of rows by school names, it must
+        not be changed after saving
+        :param day: the day in the ISO format or None for today
+        """
+        day = day or date.today().isoformat()
+        try:
+            with self._lock:
+                files = self._get_files()
+                if files and day < max(files):
+                    logger.error(f'The snapshot of {day} is older than the '
+                                 f'latest one, it is not saved')
+                    return
+
+                previous_days = [file_day for file_day in files
+                                 if file_day < day]
+                delta, cache = None, {day: data}
+                if self._is_delta_allowed(day, files, previous_days):
+                    previous_day = previous_days[-1]
+                    old_data = cache[previous_day] = self._load(
+                        previous_day, files)
+                    delta = self._create_delta(previous_day, old_data, data)
+
+                self._write(day, data if delta is None else delta,
+                            self.BASE_SUFFIX if delta is None
+                            else self.DELTA_SUFFIX)
+                self._cache = cache
+                self._remove_old(day)
+
+        except Exception as e:
+            logger.error(f'Failed to save the snapshot of {day}, error {e}')
+
+    def load(self, day: Optional[str] = None
+             ) -> Optional[dict[str, list[dict]]]:
+        """This method rebuilds the results of the day
+        :param day: the day in the ISO format or None for the latest day, if
+        there is no snapshot of the day the previous one is used
+        :return: a dictionary with lists of rows by school names or None if
+        there are no snapshots
+        """
+        try:
+            with self._lock:
+                files = self._get_files()
+                days = [file_day for file_day in files
+                        if day is None or file_day <= day]
+                if days:
+                    return self._load(days[-1], files)
+
+        except Exception as e:
+            logger.error(f'Failed to load the snapshot of {day}, error {e}')
+
+        return None
+
+    def get_days(self) -> list[str]:
+        """This method returns the days having snapshots
+        :return: a list of days in the ISO format from the oldest one
+        """
+        with self._lock:
+            return list(self._get_files())
+
+    def _is_delta_allowed(self, day: str, files: dict[str, str],
+                          previous_days: list[str]) -> bool:
+        """This secondary method checks if the snapshot of the day can be
+        a delta
+        :param day: the day in the ISO format
+        :param files: a dictionary with suffixes of snapshot files by days
+        :param previous_days: a list of days before the day
+        :return: True if there is a base within the base interval
+        """
+        bases = [file_day for file_day in previous_days
+                 if files[file_day] == self.BASE_SUFFIX]
+        return bool(bases) and (
+            date.fromisoformat(day) - date.fromisoformat(bases[-1])
+        ).days < self._base_interval
+
+    def _load(self, day: str,
+              files: dict[str, str]) -> dict[str, list[dict]]:
+        """This secondary method rebuilds the results of the day from its
+        base and deltas
+        :param day: the day in the ISO format
+        :param files: a dictionary with suffixes of snapshot files by days
+        :return: a dictionary with lists of rows by school names
+        """
+        if day in self._cache:
+            return self._cache[day]
+
+        days = [file_day for file_day in files if file_day <= day]
+        first = max(file_day for file_day in days
+                    if files[file_day] == self.BASE_SUFFIX)
+
+        data = self._read(first, self.BASE_SUFFIX)
+        for file_day in days[days.index(first) + 1:]:
+            data = self._apply_delta(data, self._read(
+                file_day, self.DELTA_SUFFIX))
+
+        return data
+
+    @staticmethod
+    def _create_delta(previous_day: str, old_data: dict[str, list[dict]],
+                      new_data: dict[str, list[dict]]
+                      ) -> Optional[dict[str, Any]]:
+        """This secondary method creates a delta between the results of
+        two days. A school with added, removed or moved rows is written
+        completely, a row with added or removed fields is replaced
+        :param previous_day: the day of the old results in the ISO format
+        :param old_data: a dictionary with the results of the previous day
+        :param new_data: a dictionary with the results of the day
+        :return: a dictionary with the delta or None if the delta changes
+        more than the half of the rows
+        """
+        delta = {'previous': previous_day, 'schools': list(new_data),
+                 'rows': {}, 'changes': {}, 'replaced': {}, 'stamps': {}}
+        changed = 0
+        for school_name, new_rows in new_data.items():
+            old_rows = old_data.get(school_name)
+            if old_rows is None or [
+                (row.get('profession'), row.get('course_level'))
+                for row in old_rows
+            ] != [(row.get('profession'), row.get('course_level'))
+                  for row in new_rows]:
+                delta['rows'][school_name] = new_rows
+                changed += len(new_rows)
+                continue
+
+            changes, replaced, stamps = {}, {}, []
+            for index, (old_row, new_row) in enumerate(
+                    zip(old_rows, new_rows)):
+                stamp = new_row.get('updated_at')
+                if stamps and stamps[-1][0] == stamp:
+                    stamps[-1][1] += 1
+                else:
+                    stamps.append([stamp, 1])
+
+                if old_row.keys() != new_row.keys():
+                    replaced[index] = new_row
+                    continue
+
+                fields = {field: value for field, value in new_row.items()
+                          if field != 'updated_at'
+                          and old_row[field] != value}
+                if fields:
+                    changes[index] = fields
+
+            changed += len(changes) + len(replaced)
+            delta['stamps'][school_name] = stamps
+            if changes:
+                delta['changes'][school_name] = changes
+            if replaced:
+                delta['replaced'][school_name] = replaced
+
+        total = sum(len(rows) for rows in new_data.values())
+        return None if changed * 2 > total else delta
+
+    @staticmethod
+    def _apply_delta(data: dict[str, list[dict]],
+                     delta: dict[str, Any]) -> dict[str, list[dict]]:
+        """This secondary method applies a delta to the results of the
+        previous day
+        :param data: a dictionary with the results of the previous day, it
+        is changed in place
+        :param delta: a dictionary with the delta
+        :return: a dictionary with the results of the day
+        """
+        result = {}
+        for school_name in delta['schools']:
+            if school_name in delta['rows']:
+                result[school_name] = delta['rows'][school_name]
+                continue
+
+            rows = result[school_name] = data[school_name]
+            for index, row in delta['replaced'].get(school_name, {}).items():
+                rows[int(index)] = row
+            for index, fields in delta['changes'].get(
+                    school_name, {}).items():
+                rows[int(index)].update(fields)
+
+            stamps = (stamp for stamp, count in delta['stamps'][school_name]
+                      for stamp in repeat(stamp, count))
+            for row, stamp in zip(rows, stamps):
+                if 'updated_at' in row:
+                    row['updated_at'] = stamp
+
+        return result
+
+    def _get_files(self) -> dict[str, str]:
+        """This secondary method finds snapshot files
+        :return: a dictionary with suffixes of snapshot files by days from
+        the oldest one
+        """
+        files = {}
+        for file_name in os.listdir(self._snapshots_path):
+            for suffix in (self.BASE_SUFFIX, self.DELTA_SUFFIX):
+                if file_name.endswith(suffix):
+                    files[file_name[:-len(suffix)]] = suffix
+
+        return dict(sorted(files.items()))
+
+    def _read(self, day: str, suffix: str) -> dict[str, Any]:
+        """This secondary method reads a snapshot file
+        :param day: the day in the ISO format
+        :param suffix: the suffix of the file
+        :return: a dictionary with the content of the file
+        """
+        with gzip.open(os.path.join(self._snapshots_path, day + suffix),
+                       'rt', encoding='utf-8') as fin:
+            return json.load(fin)
+
+    def _write(self, day: str, content: dict[str, Any], suffix: str) -> None:
+        """This secondary method writes a snapshot file through a temporary
+        file and removes another snapshot file of the same day
+        :param day: the day in the ISO format
+        :param content: a dictionary with the content of the file
+        :param suffix: the suffix of the file
+        """
+        file_path = os.path.join(self._snapshots_path, day + suffix)
+        with gzip.open(f'{file_path}.tmp', 'wt', encoding='utf-8',
+                       compresslevel=6) as fout:
+            json.dump(content, fout, ensure_ascii=False,
+                      separators=(',', ':'))
+        os.replace(f'{file_path}.tmp', file_path)
+
+        for other_suffix in (self.BASE_SUFFIX, self.DELTA_SUFFIX):
+            other_path = os.path.join(self._snapshots_path, day + other_suffix)
+            if other_suffix != suffix and os.path.exists(other_path):
+                os.remove(other_path)
+
+    def _remove_old(self, day: str) -> None:
+        """This secondary method removes snapshots older than the limit of
+        days. The base needed to rebuild the oldest kept day is kept
+        :param day: the latest day in the ISO format
+        """
+        files = self._get_files()
+        cutoff = (date.fromisoformat(day)
+                  - timedelta(days=self._max_days)).isoformat()
+        bases = [file_day for file_day, suffix in files.items()
+                 if suffix == self.BASE_SUFFIX and file_day <= cutoff]
+        if not bases:
+            return
+
+        for file_day, suffix in files.items():
+            if file_day < bases[-1]:
+                os.remove(os.path.join(self._snapshots_path,
+                                       file_day + suffix))
+                self._cache.pop(file_day, None)
@@ -0,0 +1,158 @@
+"""This unit contains RetryScheduler and RetryBudget classes to schedule
+parse requests and their retries with exponential backoff"""
+import heapq
+from itertools import count
+from random import uniform
+from threading import Lock
+from time import monotonic
+from typing import Optional
+from parse_classes.school_parse_task import ProfessionParseRequest
+# ------------------------------------------------------------------------
+
+
+class RetryBudget:
+    """RetryBudget class limits the total amount of retries during a single
+    parsing run. It can be shared between several schedulers"""
+    def __init__(self, max_retries: int) -> None:
+        """Initialization of RetryBudget class
+        :param max_retries: the maximum amount of retries for the whole run
+        """
+        self._retries_left = max_retries
+        self._lock = Lock()
+
+    def spend(self) -> bool:
+        """This method takes a single retry from the budget
+        :return: True if the retry is allowed, False if the budget is over
+        """
+        with self._lock:
+            if self._retries_left <= 0:
+                return False
+
+            self._retries_left -= 1
+            return True
+
+    @property
+    def retries_left(self) -> int:
+        """This property returns the amount of the remaining retries
+        :return: an integer
+        """
+        return self._retries_left
+
+
+class RetryScheduler:
+    """RetryScheduler class keeps a queue of parse requests ordered by the
+    time they are ready to be parsed. Failed requests are returned to the
+    queue with exponential backoff and jitter, so they are interleaved with
+    fresh requests instead of re-running the whole batch"""
+    def __init__(self, max_attempts: int, budget: RetryBudget,
+                 base_delay: float, max_delay: float) -> None:
+        """Initialization of RetryScheduler class
+        :param max_attempts: the maximum amount of attempts for a single url
+        :param budget: a RetryBudget instance limiting retries for the run
+        :param base_delay: a delay in seconds before the first retry
+        :param max_delay: the upper limit of the delay in seconds
+        """
+        self._max_attempts = max_attempts
+        self._budget = budget
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._queue: list[tuple[float, int, ProfessionParseRequest]] = []
+        self._attempts: dict[tuple[str, str], int] = {}
+        self._order = count()
+
+    def schedule(self, parse_requests: list[ProfessionParseRequest]) -> None:
+        """This method adds fresh requests ready to be parsed immediately
+        :param parse_requests: a list of ProfessionParseRequest instances
+        """
+        now = monotonic()
+        for parse_request in parse_requests:
+            self._push(parse_request, now)
+
+    def retry(self, parse_request: ProfessionParseRequest) -> bool:
+        """This method returns a failed request to the queue if the url and
+        the run still have attempts
+        :param parse_request: a ProfessionParseRequest instance to retry
+        :return: True if the request was scheduled, False if it is given up
+        """
+        attempts = self.attempts(parse_request)
+        if attempts >= self._max_attempts or not self._budget.spend():
+            return False
+
+        self._push(parse_request, monotonic() + self._get_delay(attempts))
+        return True
+
+    def pop_ready(
+            self, limit: Optional[int] = None
+    ) -> list[ProfessionParseRequest]:
+        """This method takes requests which are ready to be parsed from the
+        queue and counts an attempt for each of them
+        :param limit: the maximum amount of requests to take
+        :return: a list of ProfessionParseRequest instances
+        """
+        now = monotonic()
+        ready = []
+        while self._queue and self._queue[0][0] <= now:
+            if limit is not None and len(ready) >= limit:
+                break
+
+            parse_request = heapq.heappop(self._queue)[2]
+            key = self._get_key(parse_request)
+            self._attempts[key] = self._attempts.get(key, 0) + 1
+            ready.append(parse_request)
+
+        return ready
+
+    def time_to_next(self) -> Optional[float]:
+        """This method calculates how long to wait for the next request
+        :return: seconds to wait or None if the queue is empty
+        """
+        if not self._queue:
+            return None
+
+        return max(self._queue[0][0] - monotonic(), 0)
+
+    def drain(self) -> list[ProfessionParseRequest]:
+        """This method removes all the requests waiting in the queue. It is
+        used when the deadline of the run is exceeded
+        :return: a list of ProfessionParseRequest instances
+        """
+        drained = [item[2] for item in sorted(self._queue)]
+        self._queue = []
+
+        return drained
+
+    def attempts(self, parse_request: ProfessionParseRequest) -> int:
+        """This method returns the amount of attempts made for the request
+        :param parse_request: a ProfessionParseRequest instance
+        :return: an integer
+        """
+        return self._attempts.get(self._get_key(parse_request), 0)
+
+    def __len__(self) -> int:
+        """This method returns the amount of requests waiting in the queue"""
+        return len(self._queue)
+
+    def _push(self, parse_request: ProfessionParseRequest,
+              ready_at: float) -> None:
+        """This secondary method adds a request to the queue
+        :param parse_request: a ProfessionParseRequest instance
+        :param ready_at: a monotonic time when the request can be parsed
+        """
+        heapq.heappush(
+            self._queue, (ready_at, next(self._order), parse_request))
+
+    def _get_delay(self, attempts: int) -> float:
+        """This secondary method calculates a backoff delay with jitter
+        :param attempts: the amount of attempts already made
+        :return: a delay in seconds
+        """
+        delay = min(self._base_delay * 2 ** (attempts - 1), self._max_delay)
+        return uniform(delay / 2, delay)
+
+    @staticmethod
+    def _get_key(parse_request: ProfessionParseRequest) -> tuple[str, str]:
+        """This secondary method returns a key identifying the request
+        :param parse_request: a ProfessionParseRequest instance
+        :return: a tuple containing url and profession
+        """
+        return parse_request.url, parse_request.profession
@@ -0,0 +1,171 @@
+"""This unit contains RunJournal class to keep parsed responses of a run on
+disk and resume the run after a restart"""
+import hashlib
+import os
+from threading import Lock
+from time import time
+from typing import Optional, TextIO
+from create_loggers import logger
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseResponse
+# ------------------------------------------------------------------------
+
+
+class RunJournal:
+    """RunJournal class appends every parsed response of the current run to
+    a JSONL file named by the run id. The id is calculated from the parse
+    requests or given by the caller, e.g. the refresh cycle, which is made of
+    many small runs. A run interrupted by a restart gets the same id and
+    skips the responses which are already in its journal, every journaled
+    response is restored once after a restart. The journal is removed when
+    the run is finished"""
+    def __init__(self, journal_path: str, max_age: float) -> None:
+        """Initialization of RunJournal class
+        :param journal_path: a path of the directory with journal files
+        :param max_age: the age of a journal in seconds after which it is not
+        used to resume a run
+        """
+        self._journal_path = journal_path
+        self._max_age = max_age
+        self._file: Optional[TextIO] = None
+        self._run_id: Optional[str] = None
+        self._restored: dict[
+            str, dict[tuple[str, str], ProfessionParseResponse]] = {}
+        self._lock = Lock()
+
+    def start(self, parse_data: list[SchoolParseTask],
+              run_id: Optional[str] = None
+              ) -> dict[tuple[str, str], ProfessionParseResponse]:
+        """This method opens the journal of the run. The journal is read on
+        the first start of the run after a restart, its responses are
+        returned for the requests of the parse data only once
+        :param parse_data: a list of SchoolParseTask instances of the run
+        :param run_id: a string containing the id of the run or None to
+        calculate it from the requests
+        :return: a dictionary of ProfessionParseResponse instances parsed
+        before the restart by urls and professions
+        """
+        self.close()
+        self._remove_stale()
+        self._run_id = run_id or self._get_run_id(parse_data)
+        file_path = self._get_file_path(self._run_id)
+        if self._run_id not in self._restored:
+            self._restored[self._run_id] = self._load(file_path)
+
+        restored = self._restored[self._run_id]
+        done = {key: restored.pop(key) for key in (
+            (parse_request.url, parse_request.profession)
+            for task in parse_data for parse_request in task.parse_requests)
+            if key in restored}
+
+        with self._lock:
+            self._file = open(file_path, 'a', encoding='utf-8')
+
+        if done:
+            logger.info(f'The run {self._run_id} is resumed, {len(done)} '
+                        f'responses are restored from the journal')
+        return done
+
+    def record(self, parse_response: ProfessionParseResponse) -> None:
+        """This method appends the parsed response to the journal of the
+        current run. It does nothing if no run is started
+        :param parse_response: a ProfessionParseResponse instance
+        """
+        line = f'{parse_response.json()}\n'
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self._file.flush()
+
+    def finish(self, run_id: Optional[str] = None) -> None:
+        """This method closes and removes the journal of the finished run
+        :param run_id: a string containing the id of the run or None for the
+        current run
+        """
+        run_id = run_id or self._run_id
+        if run_id == self._run_id:
+            self.close()
+
+        self._restored.pop(run_id, None)
+        if run_id is not None and os.path.exists(
+                self._get_file_path(run_id)):
+            try:
+                os.remove(self._get_file_path(run_id))
+
+            except OSError as e:
+                logger.error(f'Failed to remove the journal of the run '
+                             f'{run_id}, error: {e}')
+
+    def close(self) -> None:
+        """This method closes the journal file keeping it on disk"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+            self._run_id = None
+
+    @property
+    def run_id(self) -> Optional[str]:
+        """This property returns the id of the current run
+        :return: a string or None if no run is started
+        """
+        return self._run_id
+
+    @staticmethod
+    def _load(file_path: str
+              ) -> dict[tuple[str, str], ProfessionParseResponse]:
+        """This secondary method reads responses from the journal. A broken
+        last line written during a crash is skipped
+        :param file_path: a path of the journal file
+        :return: a dictionary of ProfessionParseResponse instances by urls
+        and professions
+        """
+        done = {}
+        if not os.path.exists(file_path):
+            return done
+
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    parse_response = ProfessionParseResponse.parse_raw(line)
+
+                except Exception as e:
+                    logger.error(f'Broken journal line is skipped: {e}')
+                    continue
+
+                done[(parse_response.url,
+                      parse_response.profession)] = parse_response
+
+        return done
+
+    def _remove_stale(self) -> None:
+        """This secondary method removes journals of runs which were not
+        finished for too long"""
+        now = time()
+        for file_name in os.listdir(self._journal_path):
+            file_path = os.path.join(self._journal_path, file_name)
+            if now - os.path.getmtime(file_path) > self._max_age:
+                logger.info(f'Stale journal {file_name} is removed')
+                os.remove(file_path)
+
+    def _get_file_path(self, run_id: str) -> str:
+        """This secondary method returns the path of the journal file
+        :param run_id: a string containing the id of the run
+        :return: a string containing the file path
+        """
+        return os.path.join(self._journal_path, f'{run_id}.jsonl')
+
+    @staticmethod
+    def _get_run_id(parse_data: list[SchoolParseTask]) -> str:
+        """This secondary method calculates the id of the run from its
+        requests
+        :param parse_data: a list of SchoolParseTask instances
+        :return: a string containing the id
+        """
+        run_hash = hashlib.sha1()
+        for task in parse_data:
+            run_hash.update(f'{task.school_name}\n'.encode('utf-8'))
+            for parse_request in task.parse_requests:
+                run_hash.update(parse_request.json().encode('utf-8'))
+
+        return run_hash.hexdigest()
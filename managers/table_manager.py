@@ -1,17 +1,18 @@
 """This file contains GoogleTableManager to send parsed data to
 Google Sheets"""
-from typing import Any, Optional
+from typing import Optional
 from gspread import Client, Spreadsheet
 from constants import (
     RESULT_PATH, TITLES, HISTORY_SHEET, RESULT_SHEET,
     INITIAL_PARSE_DATA, PRICE_LEVELS)
 from create_loggers import logger
 from managers.parse_manager import ParseManager
+from managers.price_history_manager import PriceHistoryManager
+from managers.result_snapshot_manager import ResultSnapshotManager
+from parse_classes.results_table import ResultsTable
 from parse_classes.school_parse_task import (
     SchoolParseTask, ProfessionParseRequest)
-from utils import (compare_data, save_data_to_json,
-                   convert_parse_tasks_to_json,
-                   refactor_parse_tags)
+from utils import save_data_to_json, refactor_parse_tags
 # ------------------------------------------------------------------------
 
 
@@ -19,15 +20,23 @@ class GoogleTableManager:
     """GoogleTableManager class provides all necessary logic to send parsed
     data to the Google sheets"""
     def __init__(
-            self, connection: Client, parse_manager: ParseManager) -> None:
+            self, connection: Client, parse_manager: ParseManager,
+            price_history: Optional[PriceHistoryManager] = None,
+            snapshots: Optional[ResultSnapshotManager] = None) -> None:
         """Initialization of the GoogleTableManager class
         :param connection: a Client instance to get access to the
         Google Sheets
         :param parse_manager: a ParseManager instance
+        :param price_history: a PriceHistoryManager instance keeping the
+        history, the history sheet is its mirror
+        :param snapshots: a ResultSnapshotManager instance keeping results of
+        every day
         """
         self._connection = connection
         self._table: Optional[Spreadsheet] = None
         self._parse_manager = parse_manager
+        self._price_history = price_history
+        self._snapshots = snapshots
 
     def open_table(self, table_name: str) -> None:
         """This method serves to open a table by provided name
@@ -50,41 +59,60 @@ class GoogleTableManager:
         try:
             finished_tasks = self._parse_manager.parse_all(
                 parse_data)
-            new_parse_data = convert_parse_tasks_to_json(finished_tasks, False)
-            if old_data:
-                new_parse_data = compare_data(old_data, new_parse_data)
-            save_data_to_json(new_parse_data, RESULT_PATH)
-
-            records = [TITLES]
-            for key in new_parse_data:
-                for row in new_parse_data[key]:
-                    row['school'] = key
-                    row_list = self._create_row(row)
-                    records.append(row_list)
-
-            self._table.worksheet(RESULT_SHEET).update(records)
-            records[0] = []
-            self._table.worksheet(HISTORY_SHEET).append_rows(records)
-            logger.info(f'Table refreshed successfully')
+            self.publish(finished_tasks, old_data)
 
         except Exception as e:
             logger.error(
                 f'There was an error while refreshing the table: {e}')
 
-    @staticmethod
-    def _create_row(data: dict[str, Any]) -> list:
-        """This secondary method serves to generate a row for Google Sheets
-        in the certain order
-        :param data: a dictionary with parsed data to create the row
-        :return: a list containing the parsed data in the certain order
+    def publish(self, finished_tasks: list[SchoolParseTask],
+                old_data: dict[str, list] = None,
+                history_tasks: list[SchoolParseTask] = None) -> bool:
+        """This method saves parsed data to the JSON file and sends it to
+        the Google Sheets
+        :param finished_tasks: a list of SchoolParseTask instances filled
+        with ProfessionParseResponse instances
+        :param old_data: a dictionary with previously parsed data to
+        calculate changes
+        :param history_tasks: a list of SchoolParseTask instances to be added
+        to the price history and the history sheet, all the finished tasks
+        are added by default
+        :return: True if the results are published, False if publishing
+        failed and has to be repeated
         """
-        row = [data['school'], data['profession'], data['course_level'],
-               data['price'], data['period'], data['total'],
-               data['price_change'], data['period_change'],
-               data['url'], data['updated_at']
-               ]
+        try:
+            results = ResultsTable.from_tasks(finished_tasks)
+            results.fill_totals()
+            if old_data:
+                diff = results.compare(ResultsTable.from_json(old_data))
+                logger.info(
+                    f'Parsed data is compared: {len(diff.added)} rows added, '
+                    f'{len(diff.removed)} removed, {len(diff.changed)} '
+                    f'changed, {diff.unchanged} unchanged')
+            result_data = results.to_json()
+            save_data_to_json(result_data, RESULT_PATH)
+            if self._snapshots is not None:
+                self._snapshots.save(result_data)
+            logger.info(f'Results by schools: {results.summarize()}')
+
+            history = results
+            if history_tasks is not None:
+                history = ResultsTable.from_tasks(history_tasks)
+                history.fill_totals()
+            if self._price_history is not None:
+                self._price_history.ingest(history)
+
+            self._table.worksheet(RESULT_SHEET).update(
+                [TITLES, *results.to_sheet_rows()])
+            self._table.worksheet(HISTORY_SHEET).append_rows(
+                [[], *history.to_sheet_rows()])
+            logger.info(f'Table refreshed successfully')
+            return True
 
-        return row
+        except Exception as e:
+            logger.error(
+                f'There was an error while refreshing the table: {e}')
+            return False
 
     def load_from_table(
             self, table_name: str) -> Optional[list[SchoolParseTask]]:
@@ -123,7 +151,7 @@ class GoogleTableManager:
         for row in refactor_parse_tags(data):
             new_row = [row['school'], row['profession'], row['tags_type'],
                        ]
-            if row['tags_type'] == 'url':
+            if row['tags_type'] in ('url', 'refresh_interval'):
                 new_row.append(row['price_tags'])
             else:
                 new_row.extend(row['price_tags'])
@@ -155,7 +183,7 @@ class GoogleTableManager:
                                         school_data):
                     tag_type, tags = prof_data[2], prof_data[3:]
 
-                    if tag_type != 'url':
+                    if tag_type not in ('url', 'refresh_interval'):
                         if tag_type != 'additional_price_tags':
                             current_profession[PRICE_LEVELS[tag_type]] = ''
                         current_profession.setdefault(tag_type, []).extend(tags)
@@ -0,0 +1,255 @@
+"""This file contains the WorkQueueManager class to share parse requests
+between worker processes through the SQLite database"""
+import sqlite3
+import uuid
+from threading import Lock
+from time import time
+from typing import Optional
+from create_loggers import logger
+from parse_classes.queue_task import QueueTask
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest, ProfessionParseResponse
+# --------------------------------------------------------------------------
+
+
+class WorkQueueManager:
+    """The WorkQueueManager class provides a work queue of parse requests.
+    The coordinator puts requests of a run to the queue, worker processes
+    lease them, parse and push responses back. Leases expire, so requests of
+    a crashed worker are delivered again. Workers using the same selenoid
+    hub share its sessions through the queue. The database is used in the
+    WAL mode, which needs shared memory of a single host, so the queue must
+    be on a local disk and workers must run on the same host, browsers are
+    added by hubs on other nodes"""
+    def __init__(self, db_path: str, lease_timeout: int,
+                 max_deliveries: int) -> None:
+        """Initialize the WorkQueueManager class
+        :param db_path: a string containing the path to the database file
+        :param lease_timeout: the amount of seconds a worker owns a leased
+        request, after that the request is delivered to another worker
+        :param max_deliveries: the maximum amount of deliveries of a single
+        request, after that the request is marked as failed
+        """
+        self._db_path = db_path
+        self._lease_timeout = lease_timeout
+        self._max_deliveries = max_deliveries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def put(self, parse_data: list[SchoolParseTask]) -> str:
+        """This method puts all the requests of the parse data to the queue
+        :param parse_data: a list of SchoolParseTask instances
+        :return: a string containing the id of the new run
+        """
+        run_id = uuid.uuid4().hex
+        rows = [
+            (run_id, school_index, position, task.school_name,
+             parse_request.json())
+            for school_index, task in enumerate(parse_data)
+            for position, parse_request in enumerate(task.parse_requests)
+        ]
+
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany(
+                    'INSERT INTO tasks (run_id, school_index, position, '
+                    'school_name, request) VALUES (?, ?, ?, ?, ?)', rows)
+
+        logger.info(f'{len(rows)} requests of the run {run_id} are queued')
+        return run_id
+
+    def lease(self, worker_id: str, limit: int) -> list[QueueTask]:
+        """This method leases pending requests and requests with expired
+        leases to the worker
+        :param worker_id: a string identifying the worker
+        :param limit: the maximum amount of requests to lease
+        :return: a list of QueueTask instances
+        """
+        now = time()
+        with self._lock:
+            connection = self._get_connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._expire_leases(connection, now)
+                rows = connection.execute(
+                    "SELECT id, run_id, school_name, request FROM tasks "
+                    "WHERE status = 'pending' OR (status = 'leased' AND "
+                    "lease_until < ?) ORDER BY id LIMIT ?",
+                    (now, limit)).fetchall()
+                connection.executemany(
+                    "UPDATE tasks SET status = 'leased', worker = ?, "
+                    "lease_until = ?, deliveries = deliveries + 1 "
+                    "WHERE id = ?",
+                    [(worker_id, now + self._lease_timeout, row[0])
+                     for row in rows])
+                connection.commit()
+
+            except Exception:
+                connection.rollback()
+                raise
+
+        return [QueueTask(task_id=task_id, run_id=run_id,
+                          school_name=school_name,
+                          parse_request=ProfessionParseRequest.parse_raw(
+                              request))
+                for task_id, run_id, school_name, request in rows]
+
+    def complete(self, task_id: int,
+                 parse_response: ProfessionParseResponse) -> None:
+        """This method saves the response of the leased request. The first
+        response wins if the request was delivered several times
+        :param task_id: the id of the QueueTask
+        :param parse_response: a ProfessionParseResponse instance
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    "UPDATE tasks SET status = 'done', response = ? "
+                    "WHERE id = ? AND status != 'done'",
+                    (parse_response.json(), task_id))
+
+    def is_finished(self, run_id: str) -> bool:
+        """This method checks if all the requests of the run are done or
+        failed
+        :param run_id: a string containing the id of the run
+        :return: True if there are no pending or leased requests
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                self._expire_leases(connection, time())
+                pending, = connection.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE run_id = ? AND "
+                    "status IN ('pending', 'leased')", (run_id,)).fetchone()
+
+        return not pending
+
+    def get_responses(
+            self, run_id: str
+    ) -> dict[tuple[int, int], ProfessionParseResponse]:
+        """This method returns responses of the run
+        :param run_id: a string containing the id of the run
+        :return: a dictionary of ProfessionParseResponse instances by the
+        index of the school and the position of the request in the school
+        """
+        with self._lock:
+            rows = self._get_connection().execute(
+                "SELECT school_index, position, response FROM tasks "
+                "WHERE run_id = ? AND status = 'done'", (run_id,)).fetchall()
+
+        return {(school_index, position):
+                ProfessionParseResponse.parse_raw(response)
+                for school_index, position, response in rows}
+
+    def delete_run(self, run_id: str) -> None:
+        """This method removes all the requests of the finished run
+        :param run_id: a string containing the id of the run
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'DELETE FROM tasks WHERE run_id = ?', (run_id,))
+
+    def claim_sessions(self, worker_id: str, hub_url: str,
+                       hub_limit: int) -> int:
+        """This method marks the worker as alive and calculates its share of
+        the sessions of the hub. The limit of the hub is divided between its
+        alive workers, workers which are not seen for two lease timeouts are
+        forgotten
+        :param worker_id: a string identifying the worker
+        :param hub_url: the url of the selenoid hub used by the worker
+        :param hub_limit: the amount of sessions of the hub
+        :return: the amount of sessions the worker may keep, 0 if the hub
+        has more workers than sessions
+        """
+        now = time()
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'DELETE FROM workers WHERE seen_at < ?',
+                    (now - 2 * self._lease_timeout,))
+                connection.execute(
+                    'INSERT INTO workers (worker_id, hub_url, seen_at) '
+                    'VALUES (?, ?, ?) ON CONFLICT (worker_id) DO UPDATE SET '
+                    'hub_url = excluded.hub_url, seen_at = excluded.seen_at',
+                    (worker_id, hub_url, now))
+                worker_ids = [row[0] for row in connection.execute(
+                    'SELECT worker_id FROM workers WHERE hub_url = ? '
+                    'ORDER BY worker_id', (hub_url,))]
+
+        index = worker_ids.index(worker_id)
+        return (hub_limit // len(worker_ids)
+                + (index < hub_limit % len(worker_ids)))
+
+    def leave(self, worker_id: str) -> None:
+        """This method removes the stopped worker, so its sessions are
+        shared between the rest of the workers of the hub
+        :param worker_id: a string identifying the worker
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute(
+                    'DELETE FROM workers WHERE worker_id = ?', (worker_id,))
+
+    def close(self) -> None:
+        """This method closes the database connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _expire_leases(self, connection: sqlite3.Connection,
+                       now: float) -> None:
+        """This secondary method marks requests as failed if their last lease
+        expired and they cannot be delivered any more
+        :param connection: a Connection instance inside a transaction
+        :param now: the current timestamp
+        """
+        cursor = connection.execute(
+            "UPDATE tasks SET status = 'failed' WHERE status = 'leased' AND "
+            "lease_until < ? AND deliveries >= ?",
+            (now, self._max_deliveries))
+
+        if cursor.rowcount:
+            logger.error(f'{cursor.rowcount} queued requests failed, '
+                         f'deliveries are run out')
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """This secondary method opens the database on the first use and
+        creates the tables of the queue and the workers
+        :return: a Connection instance
+        """
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self._db_path, timeout=30, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "run_id TEXT NOT NULL, "
+                "school_index INTEGER NOT NULL, "
+                "position INTEGER NOT NULL, "
+                "school_name TEXT NOT NULL, "
+                "request TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'pending', "
+                "worker TEXT, "
+                "lease_until REAL, "
+                "deliveries INTEGER NOT NULL DEFAULT 0, "
+                "response TEXT)")
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS tasks_status '
+                'ON tasks (status, id)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS tasks_run ON tasks (run_id)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS workers ('
+                'worker_id TEXT PRIMARY KEY, '
+                'hub_url TEXT NOT NULL, '
+                'seen_at REAL NOT NULL)')
+
+        return self._connection
@@ -0,0 +1,17 @@
+"""This file contains a class representing settings of the browser used for
+selenium parsing"""
+from pydantic import BaseModel
+# ----------------------------------------------------------------------------
+
+
+class BrowserProfile(BaseModel):
+    """The BrowserProfile class represents resources blocked by the browser,
+    its window size and page load settings"""
+    name: str = 'default'
+    window_size: str = '640,480'
+    page_load_strategy: str = 'eager'
+    page_load_timeout: int = 30
+    script_timeout: int = 30
+    block_images: bool = True
+    blocked_resource_types: list[str] = []
+    blocked_url_patterns: list[str] = []
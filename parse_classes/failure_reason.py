@@ -0,0 +1,18 @@
+"""This file contains an enumeration of reasons why a page was not parsed"""
+from enum import Enum
+# ----------------------------------------------------------------------------
+
+
+class FailureReason(str, Enum):
+    """The FailureReason class represents the reason of a failed parsing"""
+    NETWORK_ERROR = 'network_error'
+    TIMEOUT = 'timeout'
+    HTTP_STATUS = 'http_status'
+    ELEMENT_NOT_FOUND = 'element_not_found'
+    VALUE_NOT_PARSEABLE = 'value_not_parseable'
+    UNKNOWN = 'unknown'
+
+
+class ElementNotFoundError(LookupError):
+    """The ElementNotFoundError exception is raised by parsers when the page
+    is loaded but it has no elements found by the tags"""
@@ -0,0 +1,20 @@
+"""This file contains a class representing the difference between two
+snapshots of parsed data"""
+from dataclasses import dataclass, field
+# ----------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class ParseDataDiff:
+    """The ParseDataDiff class keeps rows of the new snapshot which were
+    added or changed and rows of the old snapshot which were removed together
+    with their school names. Rows are matched by the school, the profession
+    and the course level"""
+    added: list[tuple[str, dict]] = field(default_factory=list)
+    removed: list[tuple[str, dict]] = field(default_factory=list)
+    changed: list[tuple[str, dict]] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        """This method shows if there is any difference"""
+        return bool(self.added or self.removed or self.changed)
@@ -0,0 +1,55 @@
+"""This file contains a lightweight record of a parsed row used for internal
+processing of responses"""
+from dataclasses import dataclass, fields
+from typing import Union, Optional
+from pydantic import BaseModel
+from parse_classes.school_parse_task import ProfessionParseResponse
+# ----------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class ParseRecord:
+    """The ParseRecord class has the fields of ProfessionParseResponse
+    without validation and per-instance dictionaries. Responses are converted
+    into records once, processed as records and converted back only when they
+    leave the pipeline"""
+    profession: Optional[str] = None
+    url: Optional[str] = None
+    middle_price: Union[int, str, None] = None
+    pro_price: Union[int, str, None] = None
+    price: Union[int, str, float, None] = ''
+    period: Union[float, int, str, None] = ''
+    middle_period: Union[float, int, str, None] = None
+    pro_period: Union[float, int, str, None] = None
+    price_change: int = 0
+    period_change: int = 0
+    total: Union[int, str, float, None] = ''
+    course_level: Optional[str] = None
+    updated_at: Optional[str] = None
+    failure_reason: Optional[str] = None
+    failure_detail: Optional[str] = None
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> 'ParseRecord':
+        """This method copies the fields of an already validated model
+        :param model: a ProfessionParseResponse or ProfessionParseRequest
+        instance
+        :return: a ParseRecord instance
+        """
+        values = model.__dict__
+        return cls(**{name: values[name] for name in RECORD_FIELDS
+                      if name in values})
+
+    def to_response(self) -> ProfessionParseResponse:
+        """This method converts the record into a ProfessionParseResponse
+        instance without validating the fields again. All the fields are set,
+        so the instances share a single set of field names
+        :return: a ProfessionParseResponse instance
+        """
+        return ProfessionParseResponse.construct(
+            RECORD_FIELDS_SET,
+            **{name: getattr(self, name) for name in RECORD_FIELDS})
+
+
+RECORD_FIELDS = tuple(field.name for field in fields(ParseRecord))
+RECORD_FIELDS_SET = set(RECORD_FIELDS)
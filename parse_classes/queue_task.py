@@ -0,0 +1,14 @@
+"""This file contains a class representing a parse request leased from the
+work queue"""
+from pydantic import BaseModel
+from parse_classes.school_parse_task import ProfessionParseRequest
+# ----------------------------------------------------------------------------
+
+
+class QueueTask(BaseModel):
+    """The QueueTask class represents a parse request leased by a worker
+    together with its position in the parsing run"""
+    task_id: int
+    run_id: str
+    school_name: str
+    parse_request: ProfessionParseRequest
@@ -0,0 +1,16 @@
+"""This file contains a class representing limits of http requests to the
+hosts of a school"""
+from pydantic import BaseModel
+# ----------------------------------------------------------------------------
+
+
+class RateLimit(BaseModel):
+    """The RateLimit class represents the request rate and the bounds of the
+    adaptive concurrency for every host of a school"""
+    requests_per_second: float = 5
+    burst: int = 5
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 8
+    decrease_factor: float = 0.5
+    latency_factor: float = 2.0
@@ -0,0 +1,370 @@
+"""This file contains a columnar table of parse results used to publish
+them"""
+from typing import Any, Iterable, Iterator, Optional
+import numpy as np
+from parse_classes.parse_data_diff import ParseDataDiff
+from parse_classes.school_parse_task import SchoolParseTask
+# ----------------------------------------------------------------------------
+
+
+class ResultsTable:
+    """The ResultsTable class keeps parse results in columns. Prices, periods,
+    totals and changes are float arrays with NaN for empty values, schools,
+    professions and course levels are encoded by dictionaries, so totals,
+    changes, filters and aggregates are computed by vectorized operations.
+    The table is converted from and to the JSON shape of results only at the
+    edges of the pipeline"""
+    CATEGORY_COLUMNS = ('school', 'profession', 'course_level')
+    NUMERIC_COLUMNS = ('price', 'period', 'price_change', 'period_change',
+                       'total')
+    TEXT_COLUMNS = ('url', 'updated_at')
+    JSON_COLUMNS = ('profession', 'url', 'price', 'period', 'price_change',
+                    'period_change', 'total', 'course_level', 'updated_at')
+    SHEET_COLUMNS = ('school', 'profession', 'course_level', 'price',
+                     'period', 'total', 'price_change', 'period_change',
+                     'url', 'updated_at')
+    HISTORY_NUMERIC_COLUMNS = ('price', 'period', 'total')
+    HISTORY_COLUMNS = (CATEGORY_COLUMNS + TEXT_COLUMNS
+                       + HISTORY_NUMERIC_COLUMNS)
+
+    def __init__(self, codes: dict[str, np.ndarray],
+                 categories: dict[str, list[str]],
+                 numbers: dict[str, np.ndarray],
+                 texts: dict[str, np.ndarray],
+                 raw: Optional[dict[str, np.ndarray]] = None) -> None:
+        """Initialization of ResultsTable class
+        :param codes: a dictionary with int32 arrays of codes of the category
+        columns
+        :param categories: a dictionary with lists of values of the category
+        columns, a code is an index in the list
+        :param numbers: a dictionary with float64 arrays of the numeric
+        columns
+        :param texts: a dictionary with object arrays of the text columns
+        :param raw: a dictionary with object arrays keeping non-numeric
+        values of the numeric columns, e.g. a price without digits
+        """
+        self._codes = codes
+        self._categories = categories
+        self._numbers = numbers
+        self._texts = texts
+        self._raw = raw or {}
+
+    @classmethod
+    def from_tasks(cls, parse_data: Iterable[SchoolParseTask]
+                   ) -> 'ResultsTable':
+        """This method creates a table from the responses of the tasks
+        :param parse_data: an iterable of SchoolParseTask instances filled
+        with ProfessionParseResponse instances
+        :return: a ResultsTable instance
+        """
+        builder = _TableBuilder()
+        for task in parse_data:
+            builder.add_school(task.school_name)
+            for response in task.parse_responses:
+                builder.add_row(task.school_name, response.__dict__)
+
+        return builder.build()
+
+    @classmethod
+    def from_json(cls, data: dict[str, list[dict]]) -> 'ResultsTable':
+        """This method creates a table from the JSON shape of results
+        :param data: a dictionary with lists of rows by school names
+        :return: a ResultsTable instance
+        """
+        builder = _TableBuilder()
+        for school_name, rows in data.items():
+            builder.add_school(school_name)
+            for row in rows:
+                builder.add_row(school_name, row)
+
+        return builder.build()
+
+    def to_json(self) -> dict[str, list[dict]]:
+        """This method converts the table into the JSON shape of results
+        :return: a dictionary with lists of rows by school names
+        """
+        schools = self._categories['school']
+        result = {school_name: [] for school_name in schools}
+        rows = self._get_rows(np.arange(len(self)), self.JSON_COLUMNS)
+        for school_code, row in zip(self._codes['school'].tolist(), rows):
+            result[schools[school_code]].append(row)
+
+        return result
+
+    def to_sheet_rows(self) -> Iterator[list]:
+        """This method yields rows of the table in the order of the columns
+        of the result sheet
+        :return: an iterator of lists
+        """
+        columns = self._get_columns(np.arange(len(self)), self.SHEET_COLUMNS)
+        yield from (list(row) for row in zip(*columns))
+
+    def to_history_rows(self) -> list[tuple]:
+        """This method converts the table into rows of the price history.
+        Empty and non-numeric values of the numeric columns are None
+        :return: a list of tuples in the order of HISTORY_COLUMNS
+        """
+        columns = self._get_columns(
+            np.arange(len(self)), self.CATEGORY_COLUMNS + self.TEXT_COLUMNS)
+        for column in self.HISTORY_NUMERIC_COLUMNS:
+            columns.append([None if value != value else value
+                            for value in self._numbers[column].tolist()])
+
+        return list(zip(*columns))
+
+    def fill_totals(self) -> None:
+        """This method calculates totals of the rows without them from their
+        prices and periods"""
+        price, period = self._numbers['price'], self._numbers['period']
+        total = self._numbers['total']
+        mask = (np.isnan(total) & (np.nan_to_num(price) != 0)
+                & (np.nan_to_num(period) != 0))
+        total[mask] = np.rint(price[mask] * period[mask])
+
+    def compare(self, old_table: 'ResultsTable') -> ParseDataDiff:
+        """This method matches the rows with the rows of the previous table
+        by the school, the profession and the course level, writes price and
+        period changes of the matched rows and sets 0 for the rest
+        :param old_table: a ResultsTable instance with previous results
+        :return: a ParseDataDiff instance with added, removed and changed rows
+        """
+        new_keys = self._get_keys(self._codes)
+        old_keys = self._get_keys(self._map_codes(old_table))
+        valid = np.flatnonzero(old_keys >= 0)
+        _, new_index, old_index = np.intersect1d(
+            new_keys, old_keys[valid], return_indices=True)
+        old_index = valid[old_index]
+
+        changes = {}
+        for column, digits in (('price', 0), ('period', 2)):
+            new_values = self._numbers[column][new_index]
+            old_values = old_table._numbers[column][old_index]
+            change = np.zeros(len(self))
+            change[new_index] = np.round(
+                np.nan_to_num(new_values - old_values), digits)
+            self._numbers[f'{column}_change'] = change
+            changes[column] = ~((new_values == old_values)
+                                | (np.isnan(new_values)
+                                   & np.isnan(old_values)))
+
+        changed = new_index[changes['price'] | changes['period']]
+        added = np.ones(len(self), dtype=bool)
+        added[new_index] = False
+        removed = np.ones(len(old_table), dtype=bool)
+        removed[old_index] = False
+
+        return ParseDataDiff(
+            added=self._get_school_rows(np.flatnonzero(added)),
+            removed=old_table._get_school_rows(np.flatnonzero(removed)),
+            changed=self._get_school_rows(changed),
+            unchanged=len(new_index) - len(changed))
+
+    def filter(self, mask: np.ndarray) -> 'ResultsTable':
+        """This method selects rows of the table
+        :param mask: a boolean array with True for the rows to keep
+        :return: a new ResultsTable instance
+        """
+        return ResultsTable(
+            {name: codes[mask] for name, codes in self._codes.items()},
+            self._categories,
+            {name: values[mask] for name, values in self._numbers.items()},
+            {name: values[mask] for name, values in self._texts.items()},
+            {name: values[mask] for name, values in self._raw.items()})
+
+    def get_parsed_mask(self) -> np.ndarray:
+        """This method finds the rows having a price
+        :return: a boolean array
+        """
+        return np.nan_to_num(self._numbers['price']) > 0
+
+    def summarize(self) -> dict[str, dict[str, Any]]:
+        """This method calculates aggregates of every school: the amount of
+        rows and parsed rows, the minimal, average and maximal price
+        :return: a dictionary with aggregates by school names
+        """
+        schools = self._categories['school']
+        codes = self._codes['school']
+        parsed = self.get_parsed_mask()
+        price = self._numbers['price']
+
+        rows = np.bincount(codes, minlength=len(schools))
+        parsed_rows = np.bincount(codes[parsed], minlength=len(schools))
+        price_sum = np.bincount(codes[parsed], weights=price[parsed],
+                                minlength=len(schools))
+        price_min = np.full(len(schools), np.inf)
+        price_max = np.full(len(schools), -np.inf)
+        np.minimum.at(price_min, codes[parsed], price[parsed])
+        np.maximum.at(price_max, codes[parsed], price[parsed])
+
+        return {school_name: {
+            'rows': int(rows[code]),
+            'parsed': int(parsed_rows[code]),
+            'min_price': (int(price_min[code]) if parsed_rows[code]
+                          else None),
+            'avg_price': (round(price_sum[code] / parsed_rows[code])
+                          if parsed_rows[code] else None),
+            'max_price': (int(price_max[code]) if parsed_rows[code]
+                          else None),
+        } for code, school_name in enumerate(schools)}
+
+    def __len__(self) -> int:
+        """This method returns the amount of rows"""
+        return len(self._codes['school'])
+
+    def _map_codes(self, other: 'ResultsTable') -> dict[str, np.ndarray]:
+        """This secondary method encodes category columns of another table by
+        the dictionaries of this table
+        :param other: a ResultsTable instance
+        :return: a dictionary with int64 arrays of codes, -1 marks values
+        missing in this table
+        """
+        codes = {}
+        for column in self.CATEGORY_COLUMNS:
+            index = {value: code for code, value
+                     in enumerate(self._categories[column])}
+            mapping = np.array(
+                [index.get(value, -1)
+                 for value in other._categories[column]] or [-1],
+                dtype=np.int64)
+            codes[column] = mapping[other._codes[column]]
+
+        return codes
+
+    def _get_keys(self, codes: dict[str, np.ndarray]) -> np.ndarray:
+        """This secondary method combines codes of the category columns into
+        a single integer key of a row
+        :param codes: a dictionary with arrays of codes
+        :return: an int64 array with keys or -1 for rows with unknown values
+        """
+        key = np.zeros(len(codes['school']), dtype=np.int64)
+        missing = np.zeros(len(key), dtype=bool)
+        for column in self.CATEGORY_COLUMNS:
+            column_codes = codes[column].astype(np.int64)
+            key = key * (len(self._categories[column]) + 1) + column_codes
+            missing |= column_codes < 0
+
+        key[missing] = -1
+        return key
+
+    def _get_school_rows(
+            self, indices: np.ndarray) -> list[tuple[str, dict]]:
+        """This secondary method returns rows with their school names
+        :param indices: an array with indices of the rows
+        :return: a list of tuples of school names and rows in the JSON shape
+        """
+        schools = self._categories['school']
+        return [(schools[school_code], row) for school_code, row in zip(
+            self._codes['school'][indices].tolist(),
+            self._get_rows(indices, self.JSON_COLUMNS))]
+
+    def _get_rows(self, indices: np.ndarray,
+                  columns: tuple[str, ...]) -> list[dict]:
+        """This secondary method converts rows into dictionaries
+        :param indices: an array with indices of the rows
+        :param columns: names of the columns to include
+        :return: a list of dictionaries
+        """
+        return [dict(zip(columns, row))
+                for row in zip(*self._get_columns(indices, columns))]
+
+    def _get_columns(self, indices: np.ndarray,
+                     columns: tuple[str, ...]) -> list[list]:
+        """This secondary method converts values of the rows back to Python
+        objects column by column
+        :param indices: an array with indices of the rows
+        :param columns: names of the columns to include
+        :return: a list of lists of values for every column
+        """
+        result = []
+        for column in columns:
+            if column in self._codes:
+                categories = self._categories[column]
+                result.append([categories[code] for code
+                               in self._codes[column][indices].tolist()])
+            elif column in self._texts:
+                result.append(self._texts[column][indices].tolist())
+            else:
+                result.append(self._get_numbers(column, indices))
+
+        return result
+
+    def _get_numbers(self, column: str, indices: np.ndarray) -> list:
+        """This secondary method converts values of a numeric column back
+        to the JSON shape
+        :param column: the name of the column
+        :param indices: an array with indices of the rows
+        :return: a list of integers, floats, original non-numeric values and
+        empty strings for empty values
+        """
+        raw = self._raw.get(column)
+        raw_values = (raw[indices].tolist() if raw is not None
+                      else [None] * len(indices))
+        return [(int(value) if value.is_integer() else value)
+                if value == value else ('' if raw_value is None else raw_value)
+                for value, raw_value in zip(
+                    self._numbers[column][indices].tolist(), raw_values)]
+
+
+class _TableBuilder:
+    """The _TableBuilder class collects rows of a ResultsTable column by
+    column"""
+    def __init__(self) -> None:
+        """Initialization of _TableBuilder class"""
+        self._indexes = {column: {} for column in
+                         ResultsTable.CATEGORY_COLUMNS}
+        self._codes = {column: [] for column in ResultsTable.CATEGORY_COLUMNS}
+        self._numbers = {column: [] for column in
+                         ResultsTable.NUMERIC_COLUMNS}
+        self._texts = {column: [] for column in ResultsTable.TEXT_COLUMNS}
+        self._raw: dict[str, dict[int, Any]] = {}
+
+    def add_school(self, school_name: str) -> None:
+        """This method registers a school even if it has no rows
+        :param school_name: the name of the school
+        """
+        index = self._indexes['school']
+        index.setdefault(school_name, len(index))
+
+    def add_row(self, school_name: str, row: dict[str, Any]) -> None:
+        """This method adds a row of the school
+        :param school_name: the name of the school
+        :param row: a dictionary with fields of the row
+        """
+        position = len(self._codes['school'])
+        for column in ResultsTable.CATEGORY_COLUMNS:
+            value = school_name if column == 'school' else row.get(column)
+            index = self._indexes[column]
+            self._codes[column].append(index.setdefault(value, len(index)))
+
+        for column in ResultsTable.NUMERIC_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, (int, float)):
+                self._numbers[column].append(value)
+            else:
+                self._numbers[column].append(np.nan)
+                if value not in (None, ''):
+                    self._raw.setdefault(column, {})[position] = value
+
+        for column in ResultsTable.TEXT_COLUMNS:
+            self._texts[column].append(row.get(column))
+
+    def build(self) -> ResultsTable:
+        """This method creates the table from the collected rows
+        :return: a ResultsTable instance
+        """
+        size = len(self._codes['school'])
+        raw = {}
+        for column, values in self._raw.items():
+            raw[column] = np.full(size, None, dtype=object)
+            for position, value in values.items():
+                raw[column][position] = value
+
+        return ResultsTable(
+            {column: np.array(codes, dtype=np.int32)
+             for column, codes in self._codes.items()},
+            {column: list(index) for column, index in self._indexes.items()},
+            {column: np.array(values, dtype=np.float64)
+             for column, values in self._numbers.items()},
+            {column: np.array(values, dtype=object)
+             for column, values in self._texts.items()},
+            raw)
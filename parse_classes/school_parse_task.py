@@ -1,6 +1,7 @@
 """This file contains classes representing the parse responses and requests"""
-from typing import Union
+from typing import Union, Optional
 from pydantic import BaseModel
+from parse_classes.failure_reason import FailureReason
 # ----------------------------------------------------------------------------
 
 
@@ -20,6 +21,7 @@ class ProfessionParseRequest(BaseProfessionParseTask):
     price_tags: list[str] = None
     period_tags: Union[list[str], str] = None
     total_tags: list[str] = None
+    refresh_interval: Union[int, float, str, None] = None
 
     class Config:
         orm_mode = True
@@ -36,9 +38,12 @@ class ProfessionParseResponse(BaseProfessionParseTask):
     total: Union[int, str, float, None] = ''
     course_level: str = None
     updated_at: str = None
+    failure_reason: Optional[FailureReason] = None
+    failure_detail: Optional[str] = None
 
     class Config:
         orm_mode = True
+        use_enum_values = True
 
 
 class SchoolParseTask(BaseModel):
@@ -1,13 +1,18 @@
 """This file contains a BaseParser class to be inherited by all parsers"""
 from abc import ABC, abstractmethod
+from typing import Union
 from bs4 import BeautifulSoup
 from selenium.webdriver.chrome.webdriver import WebDriver
-from parse_classes.school_parse_task import ProfessionParseRequest
+from parse_classes.school_parse_task import ProfessionParseRequest, \
+    ProfessionParseResponse
+from utils import build_soup_strainer, create_soup, extract_embedded_html
 # ------------------------------------------------------------------------
 
 
 class BaseParser(ABC):
     """This abstract class provides an interface for all parsers"""
+    parse_only_tags: tuple[str, ...] = ()
+
     @abstractmethod
     def _parse_data(self, parse_data: ProfessionParseRequest,
                    driver: BeautifulSoup | WebDriver):
@@ -18,3 +23,50 @@ class BaseParser(ABC):
     def __call__(self, *args, **kwargs):
         """This method serves to use parser as a function"""
         pass
+
+    def parse_static(
+            self, parse_data: ProfessionParseRequest, html: str
+    ) -> Union[ProfessionParseResponse, ProfessionParseRequest]:
+        """This method parses a page downloaded without a browser. The page
+        markup is used first and then html fragments kept as strings in JSON
+        state of the page, plain JSON values are not read
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :param html: a string containing the html page
+        :return: a ProfessionParseResponse instance or an empty
+        ProfessionParseResponse instance with the failure reason
+        """
+        result = self._parse_markup(parse_data, html)
+        if getattr(result, 'price', None):
+            return result
+
+        embedded_html = extract_embedded_html(html)
+        if embedded_html:
+            return self._parse_markup(parse_data, embedded_html)
+
+        return result
+
+    def _parse_markup(
+            self, parse_data: ProfessionParseRequest, html: str
+    ) -> Union[ProfessionParseResponse, ProfessionParseRequest]:
+        """This method extracts data from html markup. Parsers working with
+        BeautifulSoup can use it as is, selenium parsers override it
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :param html: a string containing the html markup
+        :return: a ProfessionParseResponse instance or an empty
+        ProfessionParseResponse instance with the failure reason
+        """
+        return self(parse_data, self._create_soup(parse_data, html))
+
+    def _create_soup(self, parse_data: ProfessionParseRequest,
+                     html: str) -> BeautifulSoup:
+        """This method builds a BeautifulSoup tree containing only the
+        elements named by the parse_only_tags of the parser
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :param html: a string containing the html markup
+        :return: a BeautifulSoup instance
+        """
+        strainer = build_soup_strainer([
+            getattr(parse_data, field, None)
+            for field in self.parse_only_tags])
+
+        return create_soup(html, strainer)
@@ -2,15 +2,19 @@
 from typing import Union
 from bs4 import BeautifulSoup
 from create_loggers import logger
+from parse_classes.failure_reason import ElementNotFoundError
 from parse_classes.school_parse_task import ProfessionParseRequest, \
     ProfessionParseResponse
 from parsers.base_parser import BaseParser
 from constants import PRICE_TAGS, PRICE_LEVELS
+from utils import create_response, create_failed_response
 # ------------------------------------------------------------------------
 
 
 class GBParser(BaseParser):
     """The GBParser class have a logic to parse data from GB site"""
+    parse_only_tags = ('price_tags', 'period_tags')
+
     def _parse_data(
             self, parse_data: ProfessionParseRequest,
             driver: BeautifulSoup
@@ -24,10 +28,13 @@ class GBParser(BaseParser):
         """
         price_tags = parse_data.price_tags
         period_tags = parse_data.period_tags
-        parse_response = ProfessionParseResponse.from_orm(parse_data)
+        parse_response = create_response(parse_data)
+        error = None
 
         try:
             all_prices = driver.find_all(*price_tags)
+            if not all_prices:
+                raise ElementNotFoundError('Price elements are not found')
 
             for index, tag in enumerate(PRICE_TAGS):
                 if getattr(parse_data, tag, None):
@@ -38,10 +45,12 @@ class GBParser(BaseParser):
             logger.info(f'{parse_data.url} parsed successfully')
 
         except Exception as e:
+            error = e
             logger.error(
                 f'Could not parse {parse_data.url}, error: {e}')
 
-        return parse_response if parse_response.price else parse_data
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
 
     def __call__(self, *args, **kwargs):
         """This method serves to use the class instance as a function"""
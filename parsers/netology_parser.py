@@ -1,22 +1,24 @@
 """This file contains a NetologyParser class to parse Netology site"""
-import time
 from typing import Union
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.expected_conditions import \
-    presence_of_element_located
-from selenium.webdriver.support.wait import WebDriverWait
-
+    visibility_of_element_located
 from create_loggers import logger
+from parse_classes.failure_reason import ElementNotFoundError
 from parse_classes.school_parse_task import ProfessionParseRequest, \
     ProfessionParseResponse
-from parsers.base_parser import BaseParser
+from parsers.selenium_parser import BaseSeleniumParser
+from utils import (build_soup_strainer, clean_digits, create_soup,
+                   create_response, create_failed_response)
 # ------------------------------------------------------------------------
 
 
-class NetologyParser(BaseParser):
+class NetologyParser(BaseSeleniumParser):
     """The NetologyParser class have a logic to parse data from
     Netology site"""
+    ready_condition = visibility_of_element_located
+
     def _parse_data(
             self, parse_data: ProfessionParseRequest,
             driver: Chrome
@@ -26,9 +28,11 @@ class NetologyParser(BaseParser):
         url and set of tags
         :param driver: a Chrome instance to extract data from html page
         :return: a ProfessionParseResponse instance containing data from
-        Netology site or ProfessionParseRequest instance if parsing failed
+        Netology site or an empty ProfessionParseResponse instance with the
+        failure reason
         """
-        parse_response = ProfessionParseResponse.from_orm(parse_data)
+        parse_response = create_response(parse_data)
+        error = None
         try:
             price, period = self._get_data(parse_data, driver)
             parse_response.price = price
@@ -36,18 +40,22 @@ class NetologyParser(BaseParser):
             logger.info(f'{parse_data.url} parsed successfully')
 
         except Exception as e:
+            error = e
             logger.error(
                 f'Failed to parse {parse_data.url}, error: {e}')
 
-        finally:
-            if driver:
-                driver.stop_client()
-                driver.quit()
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
 
-        return parse_response if parse_response.price else parse_data
+    def _get_ready_locator(
+            self, parse_data: ProfessionParseRequest) -> tuple[str, str]:
+        """This method returns a locator of the price block
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :return: a tuple containing By strategy and the selector
+        """
+        return By.CLASS_NAME, parse_data.price_tags[0]
 
-    @staticmethod
-    def _get_data(parse_data: ProfessionParseRequest,
+    def _get_data(self, parse_data: ProfessionParseRequest,
                   driver: Chrome) -> tuple[str, str]:
         """This method extracts data from html page by provided price tags
         :param parse_data: a ProfessionParseRequest instance with data to parse
@@ -55,11 +63,53 @@ class NetologyParser(BaseParser):
         from it
         :return: a tuple containing data from html page
         """
-        driver.get(parse_data.url)
-        driver.maximize_window()
-        time.sleep(4)
+        self._load_page(parse_data, driver)
         all_data = driver.find_element(By.CLASS_NAME, parse_data.price_tags[0])
-        data_list = all_data.text.split('\n')
+
+        return self._split_price_block(all_data.text.split('\n'))
+
+    def _parse_markup(
+            self, parse_data: ProfessionParseRequest, html: str
+    ) -> Union[ProfessionParseResponse, ProfessionParseRequest]:
+        """This method extracts data from a page downloaded without a browser
+        :param parse_data: a ProfessionParseRequest instance with data to parse
+        :param html: a string containing the html markup
+        :return: a ProfessionParseResponse instance or an empty
+        ProfessionParseResponse instance with the failure reason
+        """
+        parse_response = create_response(parse_data)
+        error = None
+        try:
+            price_class = parse_data.price_tags[0]
+            sup = create_soup(
+                html, build_soup_strainer([['', price_class]]))
+            all_data = sup.find(class_=price_class)
+            if all_data is None:
+                raise ElementNotFoundError(
+                    f'Price block {price_class} is not found')
+            price, period = self._split_price_block(
+                all_data.get_text('\n', strip=True).split('\n'))
+
+            if not isinstance(clean_digits(price), int):
+                raise ValueError(f'Price {price} is not a number')
+
+            parse_response.price = price
+            parse_response.period = period
+
+        except Exception as e:
+            error = e
+            logger.error(
+                f'Failed to parse static {parse_data.url}, error: {e}')
+
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
+
+    @staticmethod
+    def _split_price_block(data_list: list[str]) -> tuple[str, str]:
+        """This method extracts price and period from lines of the price block
+        :param data_list: a list of strings from the price block
+        :return: a tuple containing price and period
+        """
         price = data_list[1]
         period = data_list[2].split('на')[-1]
 
@@ -0,0 +1,138 @@
+"""This file contains a BaseSeleniumParser class to be inherited by parsers
+working with selenium"""
+from collections import deque
+from threading import Lock
+from time import perf_counter
+from typing import Callable
+from selenium.common.exceptions import (
+    NoSuchElementException, TimeoutException)
+from selenium.webdriver import Chrome
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.expected_conditions import \
+    presence_of_element_located
+from selenium.webdriver.support.wait import WebDriverWait
+from constants import (
+    PAGE_READY_TIMEOUT, PAGE_READY_POLL, PAGE_READY_STATS_SIZE)
+from create_loggers import logger
+from parse_classes.school_parse_task import ProfessionParseRequest
+from parsers.base_parser import BaseParser
+# ------------------------------------------------------------------------
+
+
+class BaseSeleniumParser(BaseParser):
+    """This class provides selenium parsers with a page readiness strategy.
+    Instead of fixed sleeps the parser waits for the element found by its
+    price tags and records how long every page load and wait took"""
+    ready_condition: Callable = presence_of_element_located
+
+    def __init__(self) -> None:
+        """Initialization of BaseSeleniumParser class"""
+        self._waits: deque[tuple[str, float, float, bool]] = deque(
+            maxlen=PAGE_READY_STATS_SIZE)
+        self._waits_lock = Lock()
+
+    def __getstate__(self) -> dict:
+        """This method allows to send the parser to a process pool for
+        static parsing. Statistics and the lock stay in the main process"""
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        """This method restores the parser received from another process
+        :param state: a dictionary with the state of the parser
+        """
+        self.__init__()
+
+    def _get_ready_locator(
+            self, parse_data: ProfessionParseRequest) -> tuple[str, str]:
+        """This method returns a locator of the element indicating that
+        the page is ready to be parsed
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :return: a tuple containing By strategy and the selector
+        """
+        return By.XPATH, parse_data.price_tags[0]
+
+    def _load_page(self, parse_data: ProfessionParseRequest,
+                   driver: Chrome) -> None:
+        """This method opens the page and waits for the element named by the
+        price tags. If the page is completely loaded but the element did not
+        appear, the selector is considered broken
+        :param parse_data: a ProfessionParseRequest instance with url and tags
+        :param driver: a Chrome instance to load the page
+        """
+        start = perf_counter()
+        driver.get(parse_data.url)
+        load_time = perf_counter() - start
+        locator = self._get_ready_locator(parse_data)
+        start = perf_counter()
+        is_ready = False
+
+        try:
+            WebDriverWait(
+                driver, PAGE_READY_TIMEOUT, poll_frequency=PAGE_READY_POLL
+            ).until(type(self).ready_condition(locator))
+            is_ready = True
+
+        except TimeoutException as e:
+            logger.error(f'{parse_data.url} is not ready after '
+                         f'{PAGE_READY_TIMEOUT} seconds')
+            if self._is_page_complete(driver):
+                raise NoSuchElementException(
+                    f'{locator} is not found on the loaded page') from e
+            raise
+
+        finally:
+            wait_time = perf_counter() - start
+            with self._waits_lock:
+                self._waits.append(
+                    (parse_data.url, load_time, wait_time, is_ready))
+
+    @staticmethod
+    def _is_page_complete(driver: Chrome) -> bool:
+        """This secondary method checks if the browser finished loading the
+        page
+        :param driver: a Chrome instance with the loaded page
+        :return: True if the document is complete
+        """
+        try:
+            return driver.execute_script(
+                'return document.readyState') == 'complete'
+
+        except Exception:
+            return False
+
+    @property
+    def readiness_stats(self) -> dict[str, float]:
+        """This property returns statistics of the recent page waits to tune
+        the timeouts
+        :return: a dictionary with the amount of waits, timeouts, average page
+        load time, average and maximum wait time in seconds
+        """
+        with self._waits_lock:
+            waits = list(self._waits)
+
+        load_times = [load_time for _, load_time, _, _ in waits]
+        ready_times = [wait_time for _, _, wait_time, is_ready in waits
+                       if is_ready]
+        return {
+            'waits': len(waits),
+            'avg_load': (round(sum(load_times) / len(load_times), 3)
+                         if load_times else 0),
+            'timeouts': len(waits) - len(ready_times),
+            'avg_ready': (round(sum(ready_times) / len(ready_times), 3)
+                          if ready_times else 0),
+            'max_ready': round(max(ready_times), 3) if ready_times else 0,
+        }
+
+    @staticmethod
+    def _get_css_selector(tags: list[str]) -> str:
+        """This secondary method converts BeautifulSoup style tags such as
+        ['span', 'price big'] into a css selector
+        :param tags: a list containing the tag name and the class
+        :return: a string with the css selector
+        """
+        selector = tags[0] or ''
+        if len(tags) > 1 and tags[1]:
+            selector += ''.join(
+                f'.{css_class}' for css_class in tags[1].split())
+
+        return selector or '*'
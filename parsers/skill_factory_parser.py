@@ -1,17 +1,25 @@
 """This file contains a SkillFactoryParser class to parse SkillFactory site"""
 from typing import Union
+from lxml import html as lxml_html
+from lxml.html import HtmlElement
 from selenium.webdriver import Chrome
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.expected_conditions import \
+    visibility_of_element_located
 from create_loggers import logger
+from parse_classes.failure_reason import ElementNotFoundError
 from parse_classes.school_parse_task import ProfessionParseRequest, \
     ProfessionParseResponse
-from parsers.base_parser import BaseParser
+from parsers.selenium_parser import BaseSeleniumParser
+from utils import create_response, create_failed_response
 # ------------------------------------------------------------------------
 
 
-class SkillFactoryParser(BaseParser):
+class SkillFactoryParser(BaseSeleniumParser):
     """The SkillFactoryParser class have a logic to parse data from
     SkillFactory site"""
+    ready_condition = visibility_of_element_located
+
     def _parse_data(
             self, parse_data: ProfessionParseRequest,
             driver: Chrome
@@ -21,9 +29,11 @@ class SkillFactoryParser(BaseParser):
         containing single url and set of tags
         :param driver: a Chrome instance to extract data from html page
         :return: a ProfessionParseResponse instance containing data from
-        SkillFactory site or ProfessionParseRequest instance if parsing failed
+        SkillFactory site or an empty ProfessionParseResponse instance with the
+        failure reason
         """
-        parse_response = ProfessionParseResponse.from_orm(parse_data)
+        parse_response = create_response(parse_data)
+        error = None
         try:
             price, middle_price, pro_price, period = self._get_data(
                 parse_data, driver)
@@ -35,18 +45,14 @@ class SkillFactoryParser(BaseParser):
             logger.info(f'{parse_data.url} parsed successfully')
 
         except Exception as e:
+            error = e
             logger.error(
                 f'Could not parse {parse_data.url}, error: {e}')
 
-        finally:
-            if driver:
-                driver.stop_client()
-                driver.quit()
-
-        return parse_response if parse_response.price else parse_data
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
 
-    @staticmethod
-    def _get_data(parse_data: ProfessionParseRequest,
+    def _get_data(self, parse_data: ProfessionParseRequest,
                   driver: Chrome) -> tuple[str, str, str, str]:
         """This method extracts data from html page by provided price tags
         :param parse_data: a ProfessionParseRequest instance with data to parse
@@ -55,7 +61,7 @@ class SkillFactoryParser(BaseParser):
         from it
         :return: a tuple containing data from html page
         """
-        driver.get(parse_data.url)
+        self._load_page(parse_data, driver)
 
         price = driver.find_element(
             By.XPATH, parse_data.price_tags[0])
@@ -68,6 +74,56 @@ class SkillFactoryParser(BaseParser):
 
         return price.text, middle_price.text, pro_price.text, period.text
 
+    def _parse_markup(
+            self, parse_data: ProfessionParseRequest, html: str
+    ) -> Union[ProfessionParseResponse, ProfessionParseRequest]:
+        """This method extracts data from a page downloaded without a browser
+        by the same XPath tags
+        :param parse_data: a ProfessionParseRequest instance with data to parse
+        :param html: a string containing the html markup
+        :return: a ProfessionParseResponse instance or an empty
+        ProfessionParseResponse instance with the failure reason
+        """
+        parse_response = create_response(parse_data)
+        error = None
+        try:
+            tree = lxml_html.fromstring(html)
+            parse_response.price = self._find_text(
+                tree, parse_data.price_tags[0])
+            parse_response.middle_price = self._find_text(
+                tree, parse_data.middle_price_tags[0])
+            parse_response.pro_price = self._find_text(
+                tree, parse_data.pro_price_tags[0])
+            parse_response.period = self._find_text(
+                tree, parse_data.period_tags[0])
+
+        except Exception as e:
+            error = e
+            parse_response.price = ''
+            logger.error(
+                f'Could not parse static {parse_data.url}, error: {e}')
+
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
+
+    @staticmethod
+    def _find_text(tree: HtmlElement, xpath: str) -> str:
+        """This secondary method finds the first element by XPath and returns
+        its text
+        :param tree: a HtmlElement instance with the page
+        :param xpath: a string containing XPath of the element
+        :return: a string with the text of the element
+        """
+        elements = tree.xpath(xpath)
+        if not elements:
+            raise ElementNotFoundError(f'Nothing found by {xpath}')
+
+        element = elements[0]
+        if isinstance(element, HtmlElement):
+            return element.text_content().strip()
+
+        return str(element).strip()
+
     def __call__(self, *args, **kwargs):
         """This method serves to use the class instance as a function"""
         return self._parse_data(*args, **kwargs)
@@ -2,16 +2,20 @@
 from typing import Union
 from bs4 import BeautifulSoup
 from create_loggers import logger
+from parse_classes.failure_reason import ElementNotFoundError
 from parse_classes.school_parse_task import (
     ProfessionParseResponse, ProfessionParseRequest)
 from parsers.base_parser import BaseParser
 from constants import PRICE_TAGS, PRICE_TYPES
+from utils import create_response, create_failed_response
 # ------------------------------------------------------------------------
 
 
 class SkillBoxParser(BaseParser):
     """The SkillBoxParser class have a logic to parse data from
     SkillBox site"""
+    parse_only_tags = ('price_tags', 'period_tags')
+
     def _parse_data(
             self, parse_data: ProfessionParseRequest,
             driver: BeautifulSoup
@@ -21,25 +25,31 @@ class SkillBoxParser(BaseParser):
         containing single url and set of tags
         :param driver: a BeautifulSoup instance to extract data from html page
         :return: a ProfessionParseResponse instance containing data from
-        SkillBox site or ProfessionParseRequest instance if parsing failed
+        SkillBox site or an empty ProfessionParseResponse instance with the
+        failure reason
         """
         price_tags = parse_data.price_tags
         period_tags = parse_data.period_tags
-        parse_response = ProfessionParseResponse.from_orm(parse_data)
+        parse_response = create_response(parse_data)
+        error = None
 
         try:
             prices = driver.find_all(*price_tags)
             periods = driver.find_all(*period_tags)
+            if not prices:
+                raise ElementNotFoundError('Price elements are not found')
             parse_response = self._sort_extracted_data(
                 parse_response, parse_data, prices, periods)
 
             logger.info(f'{parse_data.url} parsed successfully')
 
         except Exception as e:
+            error = e
             logger.error(
                 f'Could not parse {parse_data.url}, error: {e}')
 
-        return parse_response if parse_response.price else parse_data
+        return (parse_response if parse_response.price
+                else create_failed_response(parse_data, error))
 
     @staticmethod
     def _sort_extracted_data(
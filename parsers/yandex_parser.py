@@ -1,19 +1,23 @@
 """This file contains a YandexPracticumParser class to parse
 YandexPracticum site"""
-from typing import Union, Optional
+from typing import Union
 from selenium.webdriver import Chrome
+from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup, Tag
 from create_loggers import logger
+from parse_classes.failure_reason import ElementNotFoundError
 from parse_classes.school_parse_task import ProfessionParseRequest, \
     ProfessionParseResponse
-from parsers.base_parser import BaseParser
-from utils import clean_digits
+from parsers.selenium_parser import BaseSeleniumParser
+from utils import create_response, clean_digits, create_failed_response
 # ------------------------------------------------------------------------
 
 
-class YandexPracticumParser(BaseParser):
+class YandexPracticumParser(BaseSeleniumParser):
     """The YandexPracticumParser class have a logic to parse data from
     YandexPracticum site"""
+    parse_only_tags = ('price_tags', 'total_tags')
+
     def _parse_data(
             self, parse_data: ProfessionParseRequest,
             driver: Chrome
@@ -23,42 +27,64 @@ class YandexPracticumParser(BaseParser):
         containing single url and set of tags
         :param driver: a Chrome instance to extract data from html page
         :return: a ProfessionParseResponse instance containing data from
-        YandexPracticum site or ProfessionParseRequest instance if parsing
-        failed
+        YandexPracticum site or an empty ProfessionParseResponse instance with
+        the failure reason
         """
-        result = self._load_data(parse_data, driver)
+        try:
+            result = self._load_data(parse_data, driver)
+
+        except Exception as e:
+            logger.error(
+                f'Could not parse {parse_data.url}, error: {e}')
+            return create_failed_response(parse_data, e)
 
-        if not result:
-            return parse_data
+        return (result if result.price
+                else create_failed_response(parse_data))
 
-        return result
+    def _get_ready_locator(
+            self, parse_data: ProfessionParseRequest) -> tuple[str, str]:
+        """This method returns a locator of the price elements
+        :param parse_data: a ProfessionParseRequest instance with tags
+        :return: a tuple containing By strategy and the selector
+        """
+        return By.CSS_SELECTOR, self._get_css_selector(parse_data.price_tags)
 
     def _load_data(
             self, parse_data: ProfessionParseRequest,
-            driver: Chrome) -> Optional[ProfessionParseResponse]:
+            driver: Chrome) -> ProfessionParseResponse:
         """This is a main method to load html page from YandexPracticum and
         extract necessary data
         :param parse_data: a ProfessionParseRequest instance with data to parse
         :param driver: a Chrome instance to load data from html page
-        :return: a dictionary containing data from YandexPracticum
+        :return: a ProfessionParseResponse instance containing data from
+        YandexPracticum
+        """
+        self._load_page(parse_data, driver)
+        sup = self._create_soup(parse_data, driver.page_source)
+        result = self._filter_data(parse_data, sup)
+        logger.info(f'{parse_data.url} parsed successfully')
+
+        return result
+
+    def _parse_markup(
+            self, parse_data: ProfessionParseRequest, html: str
+    ) -> Union[ProfessionParseResponse, ProfessionParseRequest]:
+        """This method extracts data from a page downloaded without a browser
+        :param parse_data: a ProfessionParseRequest instance with data to parse
+        :param html: a string containing the html markup
+        :return: a ProfessionParseResponse instance or an empty
+        ProfessionParseResponse instance with the failure reason
         """
         try:
-            driver.get(parse_data.url)
-            sup = BeautifulSoup(driver.page_source, 'html.parser')
-            result = self._filter_data(parse_data, sup)
-            logger.info(f'{parse_data.url} parsed successfully')
+            result = self._filter_data(
+                parse_data, self._create_soup(parse_data, html))
+            return (result if result.price
+                    else create_failed_response(parse_data))
 
         except Exception as e:
             logger.error(
-                f'Could not parse {parse_data.url}, error: {e}')
-            result = None
-
-        finally:
-            if driver:
-                driver.stop_client()
-                driver.quit()
-
-        return result
+                f'Could not parse static {parse_data.url}, error: {e}')
+            return create_failed_response(parse_data, e)
 
     def _filter_data(self, data: ProfessionParseRequest,
                      sup: BeautifulSoup) -> ProfessionParseResponse:
@@ -69,9 +95,9 @@ class YandexPracticumParser(BaseParser):
         :return: a ProfessionParseResponse instance containing extracted data
         """
         price_data = sup.find_all(*data.price_tags)
-        parse_response = ProfessionParseResponse.from_orm(data)
+        parse_response = create_response(data)
         if not price_data:
-            raise ValueError
+            raise ElementNotFoundError('Price elements are not found')
 
         profession = data.profession
         if profession in ['Internet_marketer', 'Web_developer']:
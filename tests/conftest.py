@@ -0,0 +1,6 @@
+"""This file prepares the project modules for the tests. Run the tests from
+the project root:
+python -m pytest -q
+"""
+import bootstrap  # noqa: F401 prepares the project modules
+# ------------------------------------------------------------------------
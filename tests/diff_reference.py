@@ -0,0 +1,101 @@
+"""This file contains the reference diff of dictionaries the comparison of
+ResultsTable instances is checked against and a factory of snapshots"""
+import random
+from typing import Any, Optional, Union
+from parse_classes.parse_data_diff import ParseDataDiff
+# ------------------------------------------------------------------------
+
+SCHOOLS = 5
+LEVELS = ('basic', 'middle', 'pro')
+CHANGED_SHARE = 0.05
+REMOVED_SHARE = 0.01
+
+
+def create_snapshots(rows: int) -> tuple[dict, dict]:
+    """This function creates two snapshots of parsed data. In the new one
+    a part of prices is changed, a part of rows is removed and the same
+    amount of new rows is added
+    :param rows: the amount of rows in a snapshot
+    :return: a tuple of the old and the new snapshots
+    """
+    random.seed(1)
+    old_data = {f'School_{index}': [] for index in range(SCHOOLS)}
+    for index in range(rows):
+        old_data[f'School_{index % SCHOOLS}'].append({
+            'profession': f'Profession_{index // len(LEVELS) // SCHOOLS}',
+            'course_level': LEVELS[index % len(LEVELS)],
+            'url': f'https://school.example/{index}',
+            'price': random.randint(1000, 9000), 'period': 12,
+        })
+
+    new_data = {}
+    for school_name, school_rows in old_data.items():
+        new_rows = new_data[school_name] = []
+        for row in school_rows:
+            if random.random() < REMOVED_SHARE:
+                row = dict(row, profession=f'New_{row["profession"]}')
+
+            elif random.random() < CHANGED_SHARE:
+                row = dict(row, price=row['price'] + 100)
+
+            new_rows.append(dict(row))
+        random.shuffle(new_rows)
+
+    return old_data, new_data
+
+
+def get_change(new_value: Any, old_value: Any,
+               digits: Optional[int] = None) -> Union[int, float]:
+    """This function calculates the change of a numeric value
+    :param new_value: the new value
+    :param old_value: the previous value
+    :param digits: the amount of digits to round the change or None
+    :return: the difference or 0 if any of the values is not a number
+    """
+    try:
+        change = new_value - old_value
+    except TypeError:
+        return 0
+
+    return change if digits is None else round(change, digits)
+
+
+def diff_parse_data(old_data: dict[str, list[dict]],
+                    new_data: dict[str, list[dict]]) -> ParseDataDiff:
+    """This function matches rows of two snapshots of dictionaries by the
+    school, the profession and the course level and writes price and period
+    changes to the new rows
+    :param old_data: dictionary with previous parse data
+    :param new_data: dictionary with new parse data
+    :return: a ParseDataDiff instance with added, removed and changed rows
+    """
+    old_rows = {}
+    for school_name, rows in old_data.items():
+        for row in rows:
+            old_rows[school_name, row.get('profession'),
+                     row.get('course_level')] = row
+
+    diff = ParseDataDiff()
+    for school_name, rows in new_data.items():
+        for row in rows:
+            old_row = old_rows.pop((school_name, row.get('profession'),
+                                    row.get('course_level')), None)
+            if old_row is None:
+                row['price_change'], row['period_change'] = 0, 0
+                diff.added.append((school_name, row))
+
+            elif (row.get('price') == old_row.get('price')
+                  and row.get('period') == old_row.get('period')):
+                row['price_change'], row['period_change'] = 0, 0
+                diff.unchanged += 1
+
+            else:
+                row['price_change'] = get_change(
+                    row.get('price'), old_row.get('price'))
+                row['period_change'] = get_change(
+                    row.get('period'), old_row.get('period'), 2)
+                diff.changed.append((school_name, row))
+
+    diff.removed.extend((key[0], row) for key, row in old_rows.items())
+
+    return diff
@@ -0,0 +1,114 @@
+"""This file contains tests of the asynchronous parsing utilities"""
+import asyncio
+import pytest
+import async_utils
+from async_utils import FetchContext, HostLimiter, event_loop, \
+    fetch_limited
+from managers.retry_scheduler import RetryBudget, RetryScheduler
+from parse_classes.rate_limit import RateLimit
+from parse_classes.school_parse_task import ProfessionParseRequest
+# ------------------------------------------------------------------------
+
+
+def create_scheduler(amount: int) -> RetryScheduler:
+    """This function creates a scheduler filled with requests
+    :param amount: the amount of requests
+    :return: a RetryScheduler instance
+    """
+    scheduler = RetryScheduler(1, RetryBudget(0), 1, 1)
+    scheduler.schedule([
+        ProfessionParseRequest(profession=f'Profession_{index}',
+                               url=f'https://school.example/{index}')
+        for index in range(amount)])
+    return scheduler
+
+
+def create_context(fetch_limit: int = 10) -> FetchContext:
+    """This function creates a context without a session and a cache
+    :param fetch_limit: the global limit of concurrent fetches
+    :return: a FetchContext instance
+    """
+    return FetchContext(None, None, None, asyncio.Semaphore(fetch_limit))
+
+
+def test_cancelled_loop_cancels_fetches(monkeypatch):
+    """Fetches of the event loop are cancelled when the loop is cancelled
+    by the timeout of the school"""
+    cancelled = []
+
+    async def parse_url(parse_request, parser, context, rate_limit):
+        """This function hangs until it is cancelled"""
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(parse_request.url)
+            raise
+
+    async def run() -> None:
+        """This function runs the loop with the timeout and checks the
+        fetches before the event loop is closed"""
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(event_loop(
+                create_scheduler(3), None, None, RateLimit()), 0.05)
+        assert len(cancelled) == 3
+
+    monkeypatch.setattr(async_utils, 'parse_url', parse_url)
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize('rate_limit', [
+    RateLimit(requests_per_second=0.1, burst=1),
+    RateLimit(initial_concurrency=1, min_concurrency=1)])
+def test_cancelled_fetch_frees_host_slot(monkeypatch, rate_limit):
+    """A fetch cancelled while it waits for a token or a free slot does not
+    keep the slot and does not change the concurrency limit"""
+    async def run() -> None:
+        """This function cancels the waiting fetch and finishes the first
+        one"""
+        page_released = asyncio.Event()
+
+        async def fetch_page(url, session, headers):
+            """This function returns the page when it is released"""
+            await page_released.wait()
+            return 'page', {}
+
+        monkeypatch.setattr(async_utils, 'fetch_page', fetch_page)
+        context, limiter = create_context(), HostLimiter(rate_limit)
+        first = asyncio.create_task(fetch_limited(
+            'https://school.example/0', context, limiter, {}))
+        waiting = asyncio.create_task(fetch_limited(
+            'https://school.example/1', context, limiter, {}))
+        await asyncio.sleep(0.05)
+        assert limiter.state['in_flight'] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        page_released.set()
+        await first
+
+        assert limiter.state['in_flight'] == 0
+        assert limiter.state['requests'] == 1
+
+    asyncio.run(run())
+
+
+def test_global_limit_wait_is_not_host_latency(monkeypatch):
+    """Time spent waiting for the global limit of fetches is not counted in
+    the latency of the host"""
+    async def fetch_page(url, session, headers):
+        """This function returns the page immediately"""
+        return 'page', {}
+
+    async def run() -> None:
+        """This function fetches a page while the global limit is taken"""
+        context, limiter = create_context(1), HostLimiter(RateLimit())
+        await context.fetch_limit.acquire()
+        asyncio.get_running_loop().call_later(
+            0.2, context.fetch_limit.release)
+        await fetch_limited('https://school.example/0', context, limiter, {})
+
+        assert (limiter.state['latency'] or 0) < 0.1
+
+    monkeypatch.setattr(async_utils, 'fetch_page', fetch_page)
+    asyncio.run(run())
@@ -0,0 +1,158 @@
+"""This file contains tests of the DriverPoolManager class with fake
+selenium sessions"""
+from threading import Event, Semaphore, Thread
+import pytest
+from managers import DriverPoolManager, driver_pool_manager
+from parse_classes.browser_profile import BrowserProfile
+# ------------------------------------------------------------------------
+
+MAX_SESSIONS = 4
+
+
+class FakeDriver:
+    """The FakeDriver class replaces a Remote WebDriver session"""
+    sessions: list['FakeDriver'] = []
+
+    def __init__(self, **kwargs) -> None:
+        """Initialization of FakeDriver class"""
+        self.is_alive = True
+        self.current_url = 'about:blank'
+        FakeDriver.sessions.append(self)
+
+    def set_page_load_timeout(self, timeout: float) -> None:
+        """This method accepts the page load timeout"""
+
+    def set_script_timeout(self, timeout: float) -> None:
+        """This method accepts the script timeout"""
+
+    def execute(self, command: str, params: dict) -> None:
+        """This method accepts a command of the session"""
+
+    def stop_client(self) -> None:
+        """This method accepts stopping of the client"""
+
+    def quit(self) -> None:
+        """This method closes the session"""
+        self.is_alive = False
+
+
+@pytest.fixture
+def pool(monkeypatch) -> DriverPoolManager:
+    """This fixture creates a pool of fake sessions"""
+    FakeDriver.sessions = []
+    monkeypatch.setattr(driver_pool_manager.webdriver, 'Remote', FakeDriver)
+    pool = DriverPoolManager('http://localhost:4444/wd/hub', MAX_SESSIONS,
+                             20, 10)
+    yield pool
+    pool.close()
+
+
+def count_alive() -> int:
+    """This function counts sessions which are not quit
+    :return: the amount of the sessions
+    """
+    return sum(driver.is_alive for driver in FakeDriver.sessions)
+
+
+def test_warm_up_is_counted_by_profile(pool):
+    """Warming up a profile replaces idle sessions of another profile and
+    keeps the amount of sessions within the limit"""
+    first, second = BrowserProfile(name='first'), BrowserProfile(
+        name='second')
+
+    assert pool.warm_up(MAX_SESSIONS, first) == MAX_SESSIONS
+    assert pool.warm_up(2, second) == 2
+    assert count_alive() == MAX_SESSIONS
+    assert pool.warm_up(3, first) == 3
+    assert pool.warm_up(0, second) == 1
+    assert count_alive() == MAX_SESSIONS
+
+
+def test_warm_up_does_not_block_the_pool(pool, monkeypatch):
+    """Sessions of the warm up are created outside the lock of the pool, so
+    a release is not blocked while they start and the warm up returns"""
+    profile = BrowserProfile(name='first')
+    driver = pool.lease(profile)
+    started, opened = Semaphore(0), Event()
+
+    def create_driver(**kwargs) -> FakeDriver:
+        """This function creates a session when creating is allowed"""
+        started.release()
+        opened.wait(5)
+        return FakeDriver(**kwargs)
+
+    monkeypatch.setattr(driver_pool_manager.webdriver, 'Remote',
+                        create_driver)
+    warm_up = Thread(target=pool.warm_up, args=(2, profile))
+    warm_up.start()
+    assert started.acquire(timeout=5)
+
+    release = Thread(target=pool.release, args=(driver,))
+    release.start()
+    release.join(1)
+    assert not release.is_alive()
+    opened.set()
+    warm_up.join(5)
+    assert not warm_up.is_alive()
+    assert count_alive() == 3
+
+
+def test_warm_up_leaves_room_for_leased_sessions(pool):
+    """Leased sessions are counted in the limit of the warm up"""
+    first, second = BrowserProfile(name='first'), BrowserProfile(
+        name='second')
+    drivers = [pool.lease(first) for _ in range(3)]
+
+    assert pool.warm_up(MAX_SESSIONS, second) == 1
+    assert count_alive() == MAX_SESSIONS
+    for driver in drivers:
+        pool.release(driver)
+    assert count_alive() == MAX_SESSIONS
+
+
+def test_lease_reuses_warm_sessions(pool):
+    """A lease takes a warm session of its profile instead of creating one
+    and a session of another profile is quit only if there is no room"""
+    first, second = BrowserProfile(name='first'), BrowserProfile(
+        name='second')
+    pool.warm_up(2, first)
+    driver = pool.lease(first)
+
+    assert driver in FakeDriver.sessions[:2]
+    pool.release(pool.lease(second))
+    assert len(FakeDriver.sessions) == 3 and count_alive() == 3
+    pool.release(driver)
+
+
+def test_lease_waits_for_free_session_within_timeout(pool):
+    """A lease raises TimeoutError if all the sessions stay leased, the
+    session released after that is leased again"""
+    profile = BrowserProfile(name='first')
+    drivers = [pool.lease(profile) for _ in range(MAX_SESSIONS)]
+
+    with pytest.raises(TimeoutError):
+        pool.lease(profile, timeout=0.05)
+
+    pool.release(drivers.pop())
+    drivers.append(pool.lease(profile, timeout=0.05))
+    for driver in drivers:
+        pool.release(driver)
+    assert count_alive() == MAX_SESSIONS
+
+
+def test_lowered_limit_quits_sessions(pool):
+    """Sessions over the lowered limit are quit when they are idle or
+    released, new leases wait for the room"""
+    profile = BrowserProfile(name='first')
+    pool.warm_up(2, profile)
+    drivers = [pool.lease(profile) for _ in range(MAX_SESSIONS)]
+    pool.set_max_sessions(1)
+
+    for driver in drivers:
+        pool.release(driver)
+    assert count_alive() == 1
+    driver = pool.lease(profile)
+    with pytest.raises(TimeoutError):
+        pool.lease(profile, timeout=0.05)
+    pool.release(driver)
+    assert pool.max_sessions == 1 and pool.hub_limit == MAX_SESSIONS
@@ -0,0 +1,124 @@
+"""This file contains tests of the browser parsing of the ParseManager
+class with fake selenium sessions"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic, sleep
+import pytest
+from managers import (ParseManager, DriverPoolManager, HttpCacheManager,
+                      RunJournal, driver_pool_manager, parse_manager)
+from parse_classes.school_parse_task import ProfessionParseRequest, \
+    ProfessionParseResponse
+from test_driver_pool_manager import FakeDriver
+# ------------------------------------------------------------------------
+
+MAX_IN_FLIGHT = 2
+
+
+class Concurrency:
+    """The Concurrency class counts the code running at the same time"""
+    def __init__(self) -> None:
+        """Initialization of Concurrency class"""
+        self.current = 0
+        self.max = 0
+        self._lock = Lock()
+
+    def __enter__(self) -> None:
+        """This method counts the start of the code"""
+        with self._lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+
+    def __exit__(self, *args) -> None:
+        """This method counts the end of the code"""
+        with self._lock:
+            self.current -= 1
+
+
+class Parser:
+    """The Parser class replaces a selenium parser"""
+    def __init__(self, delay: float) -> None:
+        """Initialization of Parser class
+        :param delay: seconds to parse a page
+        """
+        self.delay = delay
+        self.pages = Concurrency()
+
+    def __call__(self, parse_request: ProfessionParseRequest,
+                 driver: FakeDriver) -> ProfessionParseResponse:
+        """This method parses a page
+        :param parse_request: a ProfessionParseRequest instance
+        :param driver: a leased session
+        :return: a ProfessionParseResponse instance with a price
+        """
+        with self.pages:
+            sleep(self.delay)
+
+        return ProfessionParseResponse(
+            profession=parse_request.profession, url=parse_request.url,
+            price=1000)
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch) -> ParseManager:
+    """This fixture creates a manager with a pool of fake sessions and
+    a small limit of batches in flight"""
+    monkeypatch.setattr(driver_pool_manager.webdriver, 'Remote', FakeDriver)
+    monkeypatch.setattr(parse_manager, 'SYNC_MAX_IN_FLIGHT', MAX_IN_FLIGHT)
+    manager = ParseManager(
+        {}, {}, DriverPoolManager('http://localhost:4444/wd/hub',
+                                  MAX_IN_FLIGHT, 20, 10),
+        HttpCacheManager(str(tmp_path / 'cache')), {}, {},
+        RunJournal(str(tmp_path / 'journal'), 3600))
+    yield manager
+    manager.close()
+
+
+def create_requests(host: str, amount: int) -> list[ProfessionParseRequest]:
+    """This function creates requests of a host
+    :param host: the host of the urls
+    :param amount: the amount of requests
+    :return: a list of ProfessionParseRequest instances
+    """
+    return [ProfessionParseRequest(profession=f'Profession_{index}',
+                                   url=f'https://{host}/{index}')
+            for index in range(amount)]
+
+
+def test_schools_share_the_in_flight_limit(manager):
+    """Schools parsed at the same time do not run more batches than the
+    shared limit"""
+    parser, batches = Parser(0.02), Concurrency()
+    parse_host_batch = manager._parse_host_batch
+
+    def count_batches(*args) -> list:
+        """This function counts batches running at the same time"""
+        with batches:
+            return parse_host_batch(*args)
+
+    manager._parse_host_batch = count_batches
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(
+            lambda index: manager._multi_thread_parser(
+                f'School_{index}',
+                create_requests(f'school{index}.example', 6), parser,
+                monotonic() + 30), range(3)))
+
+    assert [len(result) for result in results] == [6, 6, 6]
+    assert all(row.price == 1000 for result in results for row in result)
+    assert batches.max <= MAX_IN_FLIGHT
+    assert parser.pages.max <= MAX_IN_FLIGHT
+
+
+def test_deadline_stops_running_batches(manager):
+    """Batches running at the deadline stop before the next page and the
+    unfinished requests get the timeout reason"""
+    parser = Parser(0.1)
+    result = manager._multi_thread_parser(
+        'School_0', create_requests('school.example', 20), parser,
+        monotonic() + 0.25)
+    sleep(0.15)
+
+    assert parser.pages.current == 0
+    assert len(result) == 20
+    assert {row.failure_reason for row in result if not row.price} == {
+        'timeout'}
@@ -0,0 +1,105 @@
+"""This file contains tests of the ParseStorageManager class"""
+import sqlite3
+import pytest
+from managers import ParseStorageManager
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest
+from utils import save_data_to_json, convert_parse_tasks_to_json
+# ------------------------------------------------------------------------
+
+MAX_VERSIONS = 3
+
+
+@pytest.fixture
+def storage(tmp_path) -> ParseStorageManager:
+    """This fixture creates a storage in a temporary directory"""
+    storage = ParseStorageManager(str(tmp_path), MAX_VERSIONS)
+    yield storage
+    storage.close()
+
+
+def create_parse_data(price_tag: str = 'price') -> list[SchoolParseTask]:
+    """This function creates parse data of a school
+    :param price_tag: the price tag of the requests
+    :return: a list of SchoolParseTask instances
+    """
+    return [SchoolParseTask(school_name='School_0', parse_requests=[
+        ProfessionParseRequest(profession=f'Profession_{index}',
+                               url=f'https://school.example/{index}',
+                               price_tags=[price_tag])
+        for index in range(2)])]
+
+
+def count_contents(storage_path) -> int:
+    """This function counts the stored contents
+    :param storage_path: the path to the storage directory
+    :return: the amount of rows in the contents table
+    """
+    with sqlite3.connect(storage_path / ParseStorageManager.DB_NAME) as db:
+        return db.execute('SELECT COUNT(*) FROM contents').fetchone()[0]
+
+
+def test_same_data_is_not_saved_again(storage, tmp_path):
+    """Saving the data equal to the latest version returns that version"""
+    version = storage.save_to_storage(create_parse_data())
+
+    assert storage.save_to_storage(create_parse_data()) == version
+    assert len(storage.get_versions()) == 1
+    assert count_contents(tmp_path) == 1
+
+
+def test_content_is_shared_by_versions(storage, tmp_path):
+    """A version returning to previous data refers to the stored content"""
+    first = storage.save_to_storage(create_parse_data())
+    second = storage.save_to_storage(create_parse_data('new_price'))
+    third = storage.save_to_storage(create_parse_data())
+
+    versions = storage.get_versions()
+    assert [version['id'] for version in versions] == [third, second, first]
+    assert versions[0]['hash'] == versions[2]['hash'] != versions[1]['hash']
+    assert versions[0]['requests'] == 2
+    assert count_contents(tmp_path) == 2
+
+
+def test_versions_are_loaded(storage):
+    """The latest version and a previous one are loaded back"""
+    first = storage.save_to_storage(create_parse_data())
+    storage.save_to_storage(create_parse_data('new_price'))
+
+    assert storage.load_from_storage() == create_parse_data('new_price')
+    assert storage.load_from_storage(first) == create_parse_data()
+
+
+def test_old_contents_are_removed(storage, tmp_path):
+    """Versions over the limit are removed with the contents only they
+    used"""
+    for index in range(MAX_VERSIONS + 2):
+        storage.save_to_storage(create_parse_data(f'price_{index}'))
+
+    assert len(storage.get_versions()) == MAX_VERSIONS
+    assert count_contents(tmp_path) == MAX_VERSIONS
+
+
+def test_broken_version_is_skipped(storage, tmp_path):
+    """The previous version is loaded if the latest content does not match
+    its hash"""
+    storage.save_to_storage(create_parse_data())
+    storage.save_to_storage(create_parse_data('new_price'))
+    latest_hash = storage.get_versions()[0]['hash']
+    storage.close()
+    with sqlite3.connect(tmp_path / ParseStorageManager.DB_NAME) as db:
+        db.execute("UPDATE contents SET data = '{}' WHERE hash = ?",
+                   (latest_hash,))
+
+    assert storage.load_from_storage() == create_parse_data()
+
+
+def test_save_files_are_imported(tmp_path):
+    """Save files of the previous storage are imported once as versions"""
+    save_data_to_json(convert_parse_tasks_to_json(create_parse_data()),
+                      str(tmp_path / 'save_0.json'))
+    storage = ParseStorageManager(str(tmp_path), MAX_VERSIONS)
+
+    assert storage.load_from_storage() == create_parse_data()
+    assert not (tmp_path / 'save_0.json').exists()
+    storage.close()
@@ -0,0 +1,40 @@
+"""This file contains tests of the PriceHistoryManager class"""
+from datetime import date, timedelta
+import pytest
+from managers import PriceHistoryManager
+from parse_classes.results_table import ResultsTable
+# ------------------------------------------------------------------------
+
+
+@pytest.fixture
+def history(tmp_path) -> PriceHistoryManager:
+    """This fixture creates a history in a temporary database"""
+    history = PriceHistoryManager(str(tmp_path / 'price_history.db'))
+    yield history
+    history.close()
+
+
+def create_results(days_ago: int, price) -> ResultsTable:
+    """This function creates results of a single course
+    :param days_ago: the amount of days from the day of the update
+    :param price: the price of the course, '' for a failed parse
+    :return: a ResultsTable instance
+    """
+    day = (date.today() - timedelta(days=days_ago)).isoformat()
+    return ResultsTable.from_json({'School_0': [{
+        'profession': 'Profession_0', 'course_level': 'basic',
+        'url': 'https://school.example/0', 'price': price, 'period': 12,
+        'updated_at': f'{day} 12:00:00'}]})
+
+
+def test_failed_prices_are_not_in_change_chain(history):
+    """A failed parse is not stored, the next price is compared with the
+    last price of the course"""
+    assert history.ingest(create_results(3, 1000)) == 1
+    assert history.ingest(create_results(2, '')) == 0
+    assert history.ingest(create_results(1, 1200)) == 1
+
+    rows = history.get_price_history('School_0', 'Profession_0')
+    assert [(row['price'], row['price_change']) for row in rows] == [
+        (1000, None), (1200, 200)]
+    assert [row['price_change'] for row in history.get_changes()] == [200]
@@ -0,0 +1,187 @@
+"""This file contains tests of the RefreshScheduler class"""
+import pytest
+from managers import RefreshScheduler, refresh_scheduler
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest, ProfessionParseResponse
+# ------------------------------------------------------------------------
+
+DEFAULT_INTERVAL = 100
+MIN_INTERVAL = 10
+MAX_INTERVAL = 1000
+BACKOFF = 2
+RETRY_DELAY = 5
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    """This fixture freezes the time of the scheduler and removes the
+    jitter, the time is changed by the first item of the list"""
+    clock = [1000.0]
+    monkeypatch.setattr(refresh_scheduler, 'time', lambda: clock[0])
+    monkeypatch.setattr(refresh_scheduler, 'uniform', lambda low, high: 1)
+    return clock
+
+
+@pytest.fixture
+def scheduler(tmp_path, clock) -> RefreshScheduler:
+    """This fixture creates a scheduler with the state in a temporary
+    directory"""
+    return RefreshScheduler(str(tmp_path / 'refresh_state.json'),
+                            DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL,
+                            BACKOFF, RETRY_DELAY)
+
+
+def create_parse_data(amount: int = 3, refresh_interval=None
+                      ) -> list[SchoolParseTask]:
+    """This function creates parse data of a school
+    :param amount: the amount of requests
+    :param refresh_interval: the interval in hours set on the tag sheet
+    :return: a list of SchoolParseTask instances
+    """
+    return [SchoolParseTask(school_name='School_0', parse_requests=[
+        ProfessionParseRequest(profession=f'Profession_{index}',
+                               url=f'https://school.example/{index}',
+                               refresh_interval=refresh_interval)
+        for index in range(amount)])]
+
+
+def parse(parse_data: list[SchoolParseTask],
+          price: int = 1000) -> list[SchoolParseTask]:
+    """This function fills the tasks with responses
+    :param parse_data: a list of SchoolParseTask instances
+    :param price: the price of the responses, '' for failed ones
+    :return: the list of SchoolParseTask instances
+    """
+    for task in parse_data:
+        task.parse_responses = [
+            ProfessionParseResponse(
+                profession=parse_request.profession, url=parse_request.url,
+                price=price, period=12, course_level='basic')
+            for parse_request in task.parse_requests]
+
+    return parse_data
+
+
+def get_urls(parse_data: list[SchoolParseTask]) -> list[str]:
+    """This function returns urls of the requests
+    :param parse_data: a list of SchoolParseTask instances
+    :return: a list of strings
+    """
+    return [parse_request.url for task in parse_data
+            for parse_request in task.parse_requests]
+
+
+def test_due_requests_are_taken_once(scheduler, clock):
+    """New requests are due immediately and taken by the limit, a taken
+    request is not taken again until it is refreshed"""
+    scheduler.sync(create_parse_data())
+
+    assert get_urls(scheduler.pop_due(2)) == [
+        'https://school.example/0', 'https://school.example/1']
+    assert get_urls(scheduler.pop_due(10)) == ['https://school.example/2']
+    assert scheduler.pop_due(10) == []
+
+
+def test_interval_adapts_to_price_changes(scheduler, clock):
+    """The interval grows while the price stays the same and is halved when
+    the price changes, both within the limits"""
+    scheduler.sync(create_parse_data(1))
+    for price, interval in ((1000, 200), (1000, 400), (1000, 800),
+                            (1000, 1000), (1000, 1000), (2000, 500),
+                            (3000, 250), (4000, 125), (5000, 62.5)):
+        due_tasks = scheduler.pop_due(10)
+        assert len(get_urls(due_tasks)) == 1
+        scheduler.update(parse(due_tasks, price))
+        clock[0] += interval - 1
+        assert scheduler.pop_due(10) == []
+        clock[0] += 1
+
+    response, = scheduler.get_results()[0].parse_responses
+    assert (response.price, response.price_change) == (5000, 1000)
+
+
+def test_configured_interval_is_kept(scheduler, clock):
+    """The interval set on the tag sheet is used instead of the learned
+    one"""
+    scheduler.sync(create_parse_data(1, refresh_interval=2))
+    scheduler.update(parse(scheduler.pop_due(10)))
+
+    clock[0] += 2 * 3600 - 1
+    assert scheduler.pop_due(10) == []
+    clock[0] += 1
+    assert len(get_urls(scheduler.pop_due(10))) == 1
+
+
+def test_failed_request_is_retried(scheduler, clock):
+    """A request without a price is refreshed again after the retry delay,
+    the previous responses are kept"""
+    scheduler.sync(create_parse_data(1))
+    scheduler.update(parse(scheduler.pop_due(10)))
+    clock[0] += DEFAULT_INTERVAL * BACKOFF
+    scheduler.update(parse(scheduler.pop_due(10), ''))
+
+    clock[0] += RETRY_DELAY - 1
+    assert scheduler.pop_due(10) == []
+    clock[0] += 1
+    assert len(get_urls(scheduler.pop_due(10))) == 1
+    assert scheduler.get_results()[0].parse_responses[0].price == 1000
+
+
+def test_taken_requests_are_requeued(scheduler, clock):
+    """Taken requests which were not refreshed are scheduled again after
+    the retry delay, refreshed ones are not"""
+    scheduler.sync(create_parse_data())
+    taken = scheduler.pop_due(10)
+    refreshed = [SchoolParseTask(school_name='School_0',
+                                 parse_requests=taken[0].parse_requests[:1])]
+    scheduler.update(parse(refreshed))
+    scheduler.requeue_taken()
+
+    clock[0] += RETRY_DELAY
+    assert sorted(get_urls(scheduler.pop_due(10))) == [
+        'https://school.example/1', 'https://school.example/2']
+    scheduler.requeue_taken()
+    scheduler.requeue_taken()
+    clock[0] += RETRY_DELAY
+    assert sorted(get_urls(scheduler.pop_due(10))) == [
+        'https://school.example/1', 'https://school.example/2']
+
+
+def test_sync_drops_removed_requests(scheduler, clock):
+    """Requests removed from the tag sheet are not taken any more, kept
+    requests keep their schedule"""
+    scheduler.sync(create_parse_data())
+    scheduler.update(parse(scheduler.pop_due(1)))
+    scheduler.sync(create_parse_data(2))
+
+    assert get_urls(scheduler.pop_due(10)) == ['https://school.example/1']
+    assert len(scheduler.get_results()[0].parse_requests) == 2
+
+
+def test_state_is_restored(scheduler, tmp_path, clock):
+    """Due times and responses are restored by a new scheduler"""
+    scheduler.sync(create_parse_data(2))
+    scheduler.update(parse(scheduler.pop_due(1)))
+    scheduler.save()
+
+    restored = RefreshScheduler(str(tmp_path / 'refresh_state.json'),
+                                DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL,
+                                BACKOFF, RETRY_DELAY)
+    restored.load()
+    restored.sync(create_parse_data(2))
+    assert get_urls(restored.pop_due(10)) == ['https://school.example/1']
+    assert restored.get_results()[0].parse_responses[0].price == 1000
+
+
+def test_updates_are_kept_until_cleared(scheduler, clock):
+    """Refreshed responses are returned until they are cleared after
+    publishing, so a failed flush publishes them again"""
+    scheduler.sync(create_parse_data(2))
+    scheduler.update(parse(scheduler.pop_due(1)))
+
+    assert get_urls(scheduler.get_updates()) == ['https://school.example/0']
+    assert get_urls(scheduler.get_updates()) == ['https://school.example/0']
+
+    scheduler.clear_updates()
+    assert not scheduler.has_updates
+    assert get_urls(scheduler.get_updates()) == []
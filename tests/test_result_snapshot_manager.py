@@ -0,0 +1,107 @@
+"""This file contains tests of the ResultSnapshotManager class"""
+import copy
+from datetime import date, timedelta
+from managers import ResultSnapshotManager
+# ------------------------------------------------------------------------
+
+BASE_INTERVAL = 3
+MAX_DAYS = 30
+
+
+def create_days(days: int) -> list[tuple[str, dict]]:
+    """This function creates results of days. Every day a price is changed
+    and update times are moved, a row is added on the third day, a field is
+    added on the fourth day, a new school appears on the fifth day
+    :param days: the amount of days
+    :return: a list of tuples of days and results from the oldest day
+    """
+    rows = [{'profession': f'Profession_{index}', 'course_level': level,
+             'url': f'https://school.example/{index}', 'price': 1000,
+             'period': 12, 'updated_at': None}
+            for index in range(5) for level in ('basic', 'pro')]
+    result = []
+    for day_index in range(days):
+        day = (date(2023, 1, 1) + timedelta(days=day_index)).isoformat()
+        rows[day_index % len(rows)]['price'] += 100
+        for index, row in enumerate(rows):
+            row['updated_at'] = f'{day} {index // 4:02}:00:00'
+        if day_index == 2:
+            rows.append(dict(rows[0], profession='New'))
+        if day_index == 3:
+            rows[1]['total'] = 12000
+
+        data = {'School_0': rows[:6], 'School_1': rows[6:]}
+        if day_index >= 4:
+            data['School_2'] = [dict(rows[0], profession='Other')]
+        result.append((day, copy.deepcopy(data)))
+
+    return result
+
+
+def test_days_are_rebuilt(tmp_path):
+    """Every day is rebuilt equal to the saved results by a new manager"""
+    results = create_days(10)
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, MAX_DAYS)
+    for day, data in results:
+        snapshots.save(copy.deepcopy(data), day)
+
+    suffixes = [file_name.split('.', 1)[1]
+                for file_name in sorted(path.name
+                                        for path in tmp_path.iterdir())]
+    assert suffixes.count('delta.json.gz') >= len(results) // 2
+
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, MAX_DAYS)
+    assert snapshots.get_days() == [day for day, _ in results]
+    for day, data in results:
+        assert snapshots.load(day) == data
+    assert snapshots.load() == results[-1][1]
+
+
+def test_bases_are_written_by_interval(tmp_path):
+    """A full base is written at least every base interval"""
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, MAX_DAYS)
+    for day, data in create_days(7):
+        snapshots.save(data, day)
+
+    bases = sorted(path.name[:10] for path in tmp_path.iterdir()
+                   if path.name.endswith(ResultSnapshotManager.BASE_SUFFIX))
+    assert bases[0] == '2023-01-01'
+    for first, second in zip(bases, bases[1:] + ['2023-01-07']):
+        assert (date.fromisoformat(second)
+                - date.fromisoformat(first)).days <= BASE_INTERVAL
+
+
+def test_missing_day_uses_previous_one(tmp_path):
+    """A day without a snapshot is loaded as the previous day"""
+    results = create_days(3)
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, MAX_DAYS)
+    for day, data in results[:2]:
+        snapshots.save(data, day)
+
+    assert snapshots.load('2023-01-05') == results[1][1]
+    assert snapshots.load('2022-12-31') is None
+
+
+def test_older_day_is_not_saved(tmp_path):
+    """A snapshot older than the latest one is ignored"""
+    results = create_days(2)
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, MAX_DAYS)
+    snapshots.save(results[1][1], results[1][0])
+    snapshots.save(results[0][1], results[0][0])
+
+    assert snapshots.get_days() == [results[1][0]]
+
+
+def test_old_days_are_removed(tmp_path):
+    """Days older than the limit are removed, the kept days are rebuilt"""
+    results = create_days(12)
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, 4)
+    for day, data in results:
+        snapshots.save(copy.deepcopy(data), day)
+
+    days = snapshots.get_days()
+    assert days[-1] == results[-1][0] and len(days) < len(results)
+    snapshots = ResultSnapshotManager(str(tmp_path), BASE_INTERVAL, 4)
+    for day, data in results:
+        if day >= days[0]:
+            assert snapshots.load(day) == data
@@ -0,0 +1,82 @@
+"""This file contains tests of the ResultsTable class comparing it with the
+reference diff of dictionaries"""
+import copy
+import random
+import pytest
+from diff_reference import create_snapshots, diff_parse_data
+from parse_classes.results_table import ResultsTable
+# ------------------------------------------------------------------------
+
+
+def get_keys(rows: list[tuple[str, dict]]) -> list[tuple]:
+    """This function returns sorted keys of the rows of a diff
+    :param rows: a list of tuples of school names and rows
+    :return: a list of tuples of the school, the profession and the course
+    level
+    """
+    return sorted((school_name, row.get('profession'),
+                   row.get('course_level')) for school_name, row in rows)
+
+
+def get_changes(data: dict[str, list[dict]]) -> dict[str, tuple]:
+    """This function returns changes of the rows by their urls
+    :param data: a dictionary with lists of rows by school names
+    :return: a dictionary with tuples of the price and the period changes
+    """
+    return {row['url']: (row['price_change'], row['period_change'])
+            for rows in data.values() for row in rows}
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_compare_matches_dictionary_diff(seed):
+    """Added, removed and changed rows and changes of every row are the
+    same as the diff of dictionaries gives"""
+    old_data, new_data = create_snapshots(600)
+    random.seed(seed)
+    for rows in (*old_data.values(), *new_data.values()):
+        for row in rows:
+            if random.random() < 0.05:
+                row['price'] = ''
+            if random.random() < 0.05:
+                row['period'] = round(random.uniform(1, 24), 1)
+
+    expected_data = copy.deepcopy(new_data)
+    expected = diff_parse_data(copy.deepcopy(old_data), expected_data)
+    new_table = ResultsTable.from_json(new_data)
+    diff = new_table.compare(ResultsTable.from_json(old_data))
+
+    assert diff.added and diff.removed and diff.changed
+    assert get_keys(diff.added) == get_keys(expected.added)
+    assert get_keys(diff.removed) == get_keys(expected.removed)
+    assert get_keys(diff.changed) == get_keys(expected.changed)
+    assert diff.unchanged == expected.unchanged
+    assert get_changes(new_table.to_json()) == get_changes(expected_data)
+
+
+def test_compare_without_changes():
+    """Equal tables have no difference and zero changes"""
+    old_data, _ = create_snapshots(30)
+    new_table = ResultsTable.from_json(copy.deepcopy(old_data))
+    diff = new_table.compare(ResultsTable.from_json(old_data))
+
+    assert not diff
+    assert diff.unchanged == 30
+    assert set(get_changes(new_table.to_json()).values()) == {(0, 0)}
+
+
+def test_compare_matches_moved_rows():
+    """Rows are matched by the school, the profession and the course level,
+    not by their positions"""
+    old_data = {'School_0': [
+        {'profession': 'A', 'course_level': 'basic', 'url': 'a_basic',
+         'price': 1000, 'period': 12},
+        {'profession': 'A', 'course_level': 'pro', 'url': 'a_pro',
+         'price': 2000, 'period': 12}]}
+    new_data = {'School_0': [dict(old_data['School_0'][1], price=2500),
+                             dict(old_data['School_0'][0], period=10.5)]}
+    new_table = ResultsTable.from_json(new_data)
+    diff = new_table.compare(ResultsTable.from_json(old_data))
+
+    assert get_changes(new_table.to_json()) == {
+        'a_pro': (500, 0), 'a_basic': (0, -1.5)}
+    assert len(diff.changed) == 2 and not diff.added and not diff.removed
@@ -0,0 +1,136 @@
+"""This file contains tests of RetryScheduler and RetryBudget classes"""
+import pytest
+from managers import retry_scheduler
+from managers.retry_scheduler import RetryBudget, RetryScheduler
+from parse_classes.school_parse_task import ProfessionParseRequest
+# ------------------------------------------------------------------------
+
+
+class Clock:
+    """The Clock class replaces the monotonic time of the scheduler"""
+    def __init__(self) -> None:
+        """Initialization of Clock class"""
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """This method returns the current time
+        :return: a float number of seconds
+        """
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    """This fixture freezes the time of the scheduler and takes the upper
+    bound of the jitter"""
+    clock = Clock()
+    monkeypatch.setattr(retry_scheduler, 'monotonic', clock)
+    monkeypatch.setattr(retry_scheduler, 'uniform', lambda low, high: high)
+    return clock
+
+
+def create_requests(amount: int) -> list[ProfessionParseRequest]:
+    """This function creates parse requests with different urls
+    :param amount: the amount of requests
+    :return: a list of ProfessionParseRequest instances
+    """
+    return [ProfessionParseRequest(profession=f'Profession_{index}',
+                                   url=f'https://school.example/{index}')
+            for index in range(amount)]
+
+
+def test_fresh_requests_keep_order(clock):
+    """Fresh requests are taken in the order they are scheduled"""
+    scheduler = RetryScheduler(3, RetryBudget(10), 1, 60)
+    parse_requests = create_requests(5)
+    scheduler.schedule(parse_requests)
+
+    assert scheduler.pop_ready(2) == parse_requests[:2]
+    assert scheduler.pop_ready() == parse_requests[2:]
+    assert len(scheduler) == 0
+    assert scheduler.time_to_next() is None
+
+
+def test_retry_waits_for_backoff(clock):
+    """A retry is ready after the exponential delay limited by the maximum,
+    fresh requests are not blocked by it"""
+    scheduler = RetryScheduler(5, RetryBudget(10), 1, 3)
+    failed, fresh = create_requests(2)
+    scheduler.schedule([failed])
+    scheduler.pop_ready()
+
+    delays = []
+    for _ in range(3):
+        assert scheduler.retry(failed)
+        delays.append(scheduler.time_to_next())
+        assert scheduler.pop_ready() == []
+        clock.now += delays[-1]
+        assert scheduler.pop_ready() == [failed]
+
+    assert delays == [1, 2, 3]
+    assert scheduler.attempts(failed) == 4
+
+    scheduler.retry(failed)
+    scheduler.schedule([fresh])
+    assert scheduler.pop_ready() == [fresh]
+
+
+def test_retries_are_ordered_by_ready_time(clock):
+    """Retries are taken by the time they are ready, not by the order of
+    failures"""
+    scheduler = RetryScheduler(5, RetryBudget(10), 1, 60)
+    first, second = create_requests(2)
+    scheduler.schedule([first, second])
+    scheduler.pop_ready()
+    scheduler.retry(first)
+    scheduler.pop_ready()
+    clock.now += 1
+    scheduler.pop_ready()
+
+    scheduler.retry(first)
+    scheduler.retry(second)
+    clock.now += 2
+    assert scheduler.pop_ready() == [second, first]
+
+
+def test_max_attempts_stops_retries(clock):
+    """A request is given up when its attempts are run out"""
+    scheduler = RetryScheduler(2, RetryBudget(10), 1, 60)
+    parse_request, = create_requests(1)
+    scheduler.schedule([parse_request])
+    scheduler.pop_ready()
+
+    assert scheduler.retry(parse_request)
+    clock.now += 1
+    scheduler.pop_ready()
+    assert not scheduler.retry(parse_request)
+    assert len(scheduler) == 0
+
+
+def test_budget_is_shared_between_schedulers(clock):
+    """Retries of all the schedulers are taken from the single budget"""
+    budget = RetryBudget(2)
+    schedulers = [RetryScheduler(5, budget, 1, 60) for _ in range(2)]
+    parse_requests = create_requests(3)
+    for scheduler, parse_request in zip(schedulers, parse_requests):
+        scheduler.schedule([parse_request])
+        scheduler.pop_ready()
+        assert scheduler.retry(parse_request)
+
+    schedulers[0].schedule([parse_requests[2]])
+    schedulers[0].pop_ready()
+    assert not schedulers[0].retry(parse_requests[2])
+    assert budget.retries_left == 0
+
+
+def test_drain_returns_waiting_requests(clock):
+    """Drain removes the waiting requests by their ready time"""
+    scheduler = RetryScheduler(5, RetryBudget(10), 1, 60)
+    failed, fresh = create_requests(2)
+    scheduler.schedule([failed])
+    scheduler.pop_ready()
+    scheduler.retry(failed)
+    scheduler.schedule([fresh])
+
+    assert scheduler.drain() == [fresh, failed]
+    assert len(scheduler) == 0
@@ -0,0 +1,100 @@
+"""This file contains tests of the RunJournal class"""
+import os
+from time import time
+import pytest
+from managers import RunJournal
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest, ProfessionParseResponse
+# ------------------------------------------------------------------------
+
+MAX_AGE = 3600
+
+
+@pytest.fixture
+def journal_path(tmp_path) -> str:
+    """This fixture returns a temporary directory of journals"""
+    return str(tmp_path)
+
+
+def create_parse_data(indexes) -> list[SchoolParseTask]:
+    """This function creates parse data of a school
+    :param indexes: an iterable of indexes of the requests
+    :return: a list of SchoolParseTask instances
+    """
+    return [SchoolParseTask(school_name='School_0', parse_requests=[
+        ProfessionParseRequest(profession=f'Profession_{index}',
+                               url=f'https://school.example/{index}')
+        for index in indexes])]
+
+
+def record(journal: RunJournal, parse_data: list[SchoolParseTask]) -> None:
+    """This function journals responses of the requests
+    :param journal: a RunJournal instance with a started run
+    :param parse_data: a list of SchoolParseTask instances
+    """
+    for task in parse_data:
+        for parse_request in task.parse_requests:
+            journal.record(ProfessionParseResponse(
+                profession=parse_request.profession, url=parse_request.url,
+                price=1000))
+
+
+def get_urls(done: dict) -> list[str]:
+    """This function returns sorted urls of the restored responses
+    :param done: a dictionary of responses by urls and professions
+    :return: a list of strings
+    """
+    return sorted(url for url, _ in done)
+
+
+def test_interrupted_run_is_resumed_once(journal_path):
+    """Responses journaled before a restart are restored by the same run
+    only once"""
+    parse_data = create_parse_data(range(3))
+    journal = RunJournal(journal_path, MAX_AGE)
+    assert journal.start(parse_data) == {}
+    record(journal, create_parse_data(range(2)))
+    journal.close()
+
+    restarted = RunJournal(journal_path, MAX_AGE)
+    assert get_urls(restarted.start(parse_data)) == [
+        'https://school.example/0', 'https://school.example/1']
+    assert restarted.start(parse_data) == {}
+
+    restarted.finish()
+    assert os.listdir(journal_path) == []
+
+
+def test_given_run_id_is_restored_by_requests(journal_path):
+    """Responses of a run with the given id are restored for the requests
+    of every start, each of them once"""
+    journal = RunJournal(journal_path, MAX_AGE)
+    journal.start(create_parse_data(range(2)), 'refresh')
+    record(journal, create_parse_data(range(2)))
+    journal.close()
+
+    restarted = RunJournal(journal_path, MAX_AGE)
+    assert get_urls(restarted.start(create_parse_data([1, 2]), 'refresh')
+                    ) == ['https://school.example/1']
+    assert get_urls(restarted.start(create_parse_data(range(2)), 'refresh')
+                    ) == ['https://school.example/0']
+    restarted.close()
+
+
+def test_stale_journal_is_removed(journal_path):
+    """A journal not finished for longer than the max age is removed and not
+    used to resume the run"""
+    parse_data = create_parse_data(range(2))
+    journal = RunJournal(journal_path, MAX_AGE)
+    journal.start(parse_data)
+    record(journal, parse_data)
+    journal.close()
+    stale_time = time() - MAX_AGE - 1
+    for file_name in os.listdir(journal_path):
+        os.utime(os.path.join(journal_path, file_name),
+                 (stale_time, stale_time))
+
+    restarted = RunJournal(journal_path, MAX_AGE)
+    assert restarted.start(parse_data) == {}
+    restarted.finish()
+    assert os.listdir(journal_path) == []
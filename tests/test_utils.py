@@ -0,0 +1,99 @@
+"""This file contains tests of the functions expanding parsed responses,
+reading JSON state of pages and classifying failures"""
+import asyncio
+import pytest
+from aiohttp import ClientResponseError, RequestInfo
+from selenium.common.exceptions import NoSuchElementException
+from yarl import URL
+from parse_classes.failure_reason import FailureReason, ElementNotFoundError
+from parse_classes.school_parse_task import ProfessionParseResponse, \
+    ProfessionParseRequest
+from utils import refactor_parse_responses, classify_failure, \
+    create_failed_response, is_deterministic_failure, extract_embedded_html
+# ------------------------------------------------------------------------
+
+
+def test_responses_are_expanded_by_price_tiers():
+    """A response is expanded into rows of its price tiers with normalized
+    prices, periods and totals"""
+    rows = list(refactor_parse_responses([ProfessionParseResponse(
+        profession='Profession_0', url='https://school.example/0',
+        price='10 000 ₽', period='12 мес', middle_price='20 000',
+        middle_period=6)], '2023-01-01 12:00:00'))
+
+    assert [(row.course_level, row.price, row.period, row.total)
+            for row in rows] == [('basic', 10000, 12, 120000),
+                                 ('middle', 20000, 6, 120000)]
+    assert {row.updated_at for row in rows} == {'2023-01-01 12:00:00'}
+
+
+def test_rows_share_the_timestamp_of_the_run():
+    """All the rows get the single timestamp created for the run"""
+    rows = list(refactor_parse_responses(
+        ProfessionParseResponse(profession=f'Profession_{index}',
+                                price=1000, period=12)
+        for index in range(50)))
+
+    assert len({row.updated_at for row in rows}) == 1
+
+
+def test_responses_are_consumed_lazily():
+    """Responses are taken from the source only when their rows are
+    needed"""
+    taken = []
+
+    def generate():
+        """This function yields responses and keeps the taken ones"""
+        for index in range(3):
+            taken.append(index)
+            yield ProfessionParseResponse(profession=f'Profession_{index}',
+                                          price=1000, pro_price=2000)
+
+    rows = refactor_parse_responses(generate(), '2023-01-01 12:00:00')
+    assert taken == []
+    assert [next(rows).course_level, next(rows).course_level] == [
+        'basic', 'pro']
+    assert taken == [0]
+
+
+def test_only_html_strings_are_taken_from_json_state():
+    """Html fragments are collected from the JSON state scripts, plain JSON
+    values are not read"""
+    html = ('<script id="__NEXT_DATA__" type="application/json">'
+            '{"props": {"price": 10000, "block": "<div class=\\"price\\">'
+            '20 000</div>"}}</script><script>{"html": "<p>ad</p>"}</script>')
+
+    assert extract_embedded_html(html) == '<div class="price">20 000</div>'
+
+
+def create_http_error(status: int) -> ClientResponseError:
+    """This function creates an error of the http status
+    :param status: the http status of the response
+    :return: a ClientResponseError instance
+    """
+    url = URL('https://school.example/0')
+    return ClientResponseError(RequestInfo(url, 'GET', {}, url), (),
+                               status=status)
+
+
+@pytest.mark.parametrize('error, reason, is_deterministic', [
+    (None, FailureReason.VALUE_NOT_PARSEABLE, True),
+    (ElementNotFoundError('price'), FailureReason.ELEMENT_NOT_FOUND, True),
+    (NoSuchElementException('price'), FailureReason.ELEMENT_NOT_FOUND, True),
+    (ValueError('price'), FailureReason.VALUE_NOT_PARSEABLE, True),
+    (create_http_error(404), FailureReason.HTTP_STATUS, True),
+    (create_http_error(503), FailureReason.HTTP_STATUS, False),
+    (asyncio.TimeoutError(), FailureReason.TIMEOUT, False),
+    (IndexError('list index out of range'), FailureReason.UNKNOWN, False),
+    (AttributeError('text'), FailureReason.UNKNOWN, False),
+    (ConnectionResetError(), FailureReason.NETWORK_ERROR, False),
+])
+def test_failures_are_classified(error, reason, is_deterministic):
+    """Only explicit signals of missing elements and values and missing
+    pages are deterministic, other errors are retried"""
+    parse_response = create_failed_response(ProfessionParseRequest(
+        profession='Profession_0', url='https://school.example/0'), error)
+
+    assert classify_failure(error)[0] == reason
+    assert parse_response.failure_reason == reason.value
+    assert is_deterministic_failure(parse_response) == is_deterministic
@@ -0,0 +1,143 @@
+"""This file contains tests of the WorkQueueManager class"""
+import pytest
+from managers import WorkQueueManager, work_queue_manager
+from parse_classes.school_parse_task import SchoolParseTask, \
+    ProfessionParseRequest, ProfessionParseResponse
+# ------------------------------------------------------------------------
+
+LEASE_TIMEOUT = 60
+MAX_DELIVERIES = 2
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    """This fixture freezes the time of the queue, the time is changed by
+    the first item of the list"""
+    clock = [1000.0]
+    monkeypatch.setattr(work_queue_manager, 'time', lambda: clock[0])
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock) -> WorkQueueManager:
+    """This fixture creates a queue in a temporary database"""
+    queue = WorkQueueManager(
+        str(tmp_path / 'queue.db'), LEASE_TIMEOUT, MAX_DELIVERIES)
+    yield queue
+    queue.close()
+
+
+def create_parse_data() -> list[SchoolParseTask]:
+    """This function creates parse data of two schools
+    :return: a list of SchoolParseTask instances
+    """
+    return [SchoolParseTask(school_name=school_name, parse_requests=[
+        ProfessionParseRequest(profession=f'Profession_{index}',
+                               url=f'https://{school_name}.example/{index}')
+        for index in range(2)]) for school_name in ('School_0', 'School_1')]
+
+
+def complete(queue: WorkQueueManager, queue_tasks: list) -> None:
+    """This function completes the leased requests
+    :param queue: a WorkQueueManager instance
+    :param queue_tasks: a list of QueueTask instances
+    """
+    for queue_task in queue_tasks:
+        queue.complete(queue_task.task_id, ProfessionParseResponse(
+            profession=queue_task.parse_request.profession,
+            url=queue_task.parse_request.url, price=1000))
+
+
+def test_lease_is_exclusive_until_expiry(queue, clock):
+    """Leased requests are not delivered to another worker until the lease
+    expires"""
+    run_id = queue.put(create_parse_data())
+    first = queue.lease('worker_0', 3)
+
+    assert [task.parse_request.url for task in first] == [
+        'https://School_0.example/0', 'https://School_0.example/1',
+        'https://School_1.example/0']
+    assert [task.run_id for task in first] == [run_id] * 3
+    assert [task.school_name for task in queue.lease('worker_1', 10)] == [
+        'School_1']
+    assert queue.lease('worker_1', 10) == []
+
+    clock[0] += LEASE_TIMEOUT - 1
+    assert queue.lease('worker_1', 10) == []
+
+
+def test_expired_lease_is_redelivered(queue, clock):
+    """Requests of a crashed worker are delivered again after the lease
+    expires, completed requests are not"""
+    run_id = queue.put(create_parse_data())
+    complete(queue, queue.lease('worker_0', 1))
+    crashed = queue.lease('worker_0', 3)
+
+    clock[0] += LEASE_TIMEOUT + 1
+    redelivered = queue.lease('worker_1', 10)
+    assert [task.task_id for task in redelivered] == [
+        task.task_id for task in crashed]
+    assert not queue.is_finished(run_id)
+
+    complete(queue, redelivered)
+    assert queue.is_finished(run_id)
+    assert sorted(queue.get_responses(run_id)) == [
+        (0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def test_first_response_wins(queue, clock):
+    """A late response of an expired lease does not replace the response of
+    the redelivered request"""
+    run_id = queue.put(create_parse_data()[:1])
+    crashed = queue.lease('worker_0', 1)
+    clock[0] += LEASE_TIMEOUT + 1
+    redelivered = queue.lease('worker_1', 1)
+
+    complete(queue, redelivered)
+    queue.complete(crashed[0].task_id, ProfessionParseResponse(price=1))
+    assert queue.get_responses(run_id)[0, 0].price == 1000
+
+
+def test_deliveries_are_limited(queue, clock):
+    """A request is failed when its deliveries are run out, so the run can
+    be finished"""
+    run_id = queue.put(create_parse_data()[:1])
+    for _ in range(MAX_DELIVERIES):
+        assert len(queue.lease('worker_0', 10)) == 2
+        clock[0] += LEASE_TIMEOUT + 1
+
+    assert queue.lease('worker_1', 10) == []
+    assert queue.is_finished(run_id)
+    assert queue.get_responses(run_id) == {}
+
+
+def test_runs_are_deleted_separately(queue, clock):
+    """Deleting a finished run keeps the requests of another run"""
+    first_run = queue.put(create_parse_data()[:1])
+    second_run = queue.put(create_parse_data()[1:])
+    complete(queue, queue.lease('worker_0', 2))
+
+    queue.delete_run(first_run)
+    assert queue.get_responses(first_run) == {}
+    assert [task.run_id for task in queue.lease('worker_0', 10)] == [
+        second_run] * 2
+
+
+def test_hub_sessions_are_shared_between_workers(queue, clock):
+    """The limit of a hub is divided between its alive workers, stopped and
+    silent workers give their sessions back"""
+    hub, other_hub = 'http://hub_0:4444/wd/hub', 'http://hub_1:4444/wd/hub'
+    assert queue.claim_sessions('worker_0', hub, 10) == 10
+    assert queue.claim_sessions('worker_1', hub, 10) == 5
+    assert queue.claim_sessions('worker_2', other_hub, 10) == 10
+    assert queue.claim_sessions('worker_0', hub, 10) == 5
+
+    queue.leave('worker_1')
+    assert queue.claim_sessions('worker_0', hub, 10) == 10
+
+    queue.claim_sessions('worker_1', hub, 3)
+    assert [queue.claim_sessions(f'worker_{index}', hub, 3)
+            for index in (0, 1)] == [2, 1]
+
+    clock[0] += 2 * LEASE_TIMEOUT + 1
+    assert queue.claim_sessions('worker_0', hub, 3) == 3
@@ -1,18 +1,31 @@
 """This file contains different utility functions to load and save data,
 refactor dictionaries, etc."""
+import asyncio
 import json
 import os
 import subprocess
+from copy import copy
 import re
 from datetime import datetime
-from typing import Any, Union
-from constants import (LEVELS, SERVICE_TAGS,
-                       REFACTOR_TAGS, PRICE_TYPES, PERIODS)
+from time import monotonic
+from typing import Any, Union, Optional, Iterator, Iterable
+from aiohttp import ClientResponseError
+from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound
+from selenium.common.exceptions import (
+    NoSuchElementException, TimeoutException)
+from constants import (LEVELS, SERVICE_TAGS, HTML_PARSER_BACKEND,
+                       REFACTOR_TAGS, PRICE_TYPES, PERIODS,
+                       STATE_SCRIPT_TYPES, STATE_SCRIPT_IDS,
+                       DETERMINISTIC_FAILURES, DETERMINISTIC_HTTP_STATUSES)
 from create_loggers import logger
+from parse_classes.failure_reason import FailureReason, ElementNotFoundError
+from parse_classes.parse_record import ParseRecord
 from parse_classes.school_parse_task import SchoolParseTask, \
-    ProfessionParseRequest, ProfessionParseResponse
+    ProfessionParseRequest, ProfessionParseResponse, BaseProfessionParseTask
 # ------------------------------------------------------------------------
 
+NON_DIGITS = re.compile(r'\D+')
+
 
 def clean_digits(data: Union[int, str]) -> int:
     """This function serves to remove any characters from provided data except
@@ -21,13 +34,220 @@ def clean_digits(data: Union[int, str]) -> int:
     :return: an integer
     """
     try:
-        result = re.sub(r'\D*', '', data)
-        result = int(str(result))
-        return result
+        return int(NON_DIGITS.sub('', data))
     except (ValueError, TypeError):
         return data
 
 
+def create_timestamp() -> str:
+    """This function creates a timestamp of the run to stamp all its rows
+    :return: a string containing the current time without microseconds
+    """
+    return str(datetime.now()).split('.')[0]
+
+
+def build_soup_strainer(tags_list: list) -> Optional[SoupStrainer]:
+    """This function creates a SoupStrainer keeping only the elements which
+    can be found by provided tags, e.g. ['span', 'price'] means span tags
+    having the price class. Elements are kept with all their children
+    :param tags_list: a list of tags used in find and find_all methods
+    :return: a SoupStrainer instance or None if tags cannot be used to
+    strain the page
+    """
+    targets = []
+    for tags in tags_list:
+        if not isinstance(tags, list) or not tags or \
+                not all(isinstance(tag, str) for tag in tags[:2]):
+            return None
+
+        name = tags[0] or None
+        css_class = tags[1] if len(tags) > 1 and tags[1] else None
+        targets.append((name, css_class))
+
+    if not targets:
+        return None
+
+    def is_target(name: str, attrs: Optional[dict] = None) -> bool:
+        """This function checks if the element matches any of the tags"""
+        classes = (attrs or {}).get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+
+        for target_name, target_class in targets:
+            if target_name and target_name != name:
+                continue
+            if target_class and target_class not in classes and \
+                    target_class != ' '.join(classes):
+                continue
+            return True
+
+        return False
+
+    return SoupStrainer(is_target)
+
+
+def create_soup(html: str,
+                strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """This function builds a BeautifulSoup tree by the configured backend
+    :param html: a string containing the html page
+    :param strainer: a SoupStrainer instance to build only a part of the tree
+    :return: a BeautifulSoup instance
+    """
+    try:
+        return BeautifulSoup(html, HTML_PARSER_BACKEND, parse_only=strainer)
+
+    except FeatureNotFound:
+        return BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+
+def extract_embedded_html(html: str) -> str:
+    """This function collects html fragments embedded into JSON state of the
+    page such as __NEXT_DATA__ or application/json scripts. Only JSON strings
+    containing html markup are collected, so the selectors of the parsers
+    can run on them. Plain JSON values such as a numeric price are not read,
+    pages keeping prices only this way are parsed by the browser
+    :param html: a string containing the html page
+    :return: a string containing all found html fragments
+    """
+    soup = create_soup(html, SoupStrainer('script'))
+    fragments = []
+    for script in soup.find_all('script'):
+        if script.get('type') not in STATE_SCRIPT_TYPES \
+                and script.get('id') not in STATE_SCRIPT_IDS:
+            continue
+
+        try:
+            state = json.loads(script.string or '')
+
+        except ValueError:
+            continue
+
+        fragments.extend(_find_html_strings(state))
+
+    return '\n'.join(fragments)
+
+
+def _find_html_strings(data: Any) -> Iterator[str]:
+    """This secondary function finds strings containing html markup in
+    the loaded JSON data
+    :param data: a dictionary, a list or a scalar value loaded from JSON
+    :return: an iterator of strings with html markup
+    """
+    if isinstance(data, (dict, list)):
+        values = data.values() if isinstance(data, dict) else data
+        for value in values:
+            yield from _find_html_strings(value)
+
+    elif isinstance(data, str) and '<' in data and '>' in data:
+        yield data
+
+
+def classify_failure(
+        error: Optional[Exception]) -> tuple[FailureReason, Optional[str]]:
+    """This function determines the reason of a failed parsing by the raised
+    exception. Only explicit signals of missing elements and values are
+    deterministic, other errors of parsers such as an IndexError of
+    a partially rendered page are unknown and retried
+    :param error: an exception raised during parsing or None if the page was
+    parsed without exceptions but the price was not found
+    :return: a tuple containing the FailureReason and the details such as
+    http status or the error message
+    """
+    if error is None:
+        return FailureReason.VALUE_NOT_PARSEABLE, None
+
+    detail = str(error) or type(error).__name__
+    if isinstance(error, ClientResponseError):
+        return FailureReason.HTTP_STATUS, str(error.status)
+
+    if isinstance(error, (TimeoutException, asyncio.TimeoutError,
+                          TimeoutError)):
+        return FailureReason.TIMEOUT, detail
+
+    if isinstance(error, (NoSuchElementException, ElementNotFoundError)):
+        return FailureReason.ELEMENT_NOT_FOUND, detail
+
+    if isinstance(error, ValueError):
+        return FailureReason.VALUE_NOT_PARSEABLE, detail
+
+    if isinstance(error, (LookupError, AttributeError, TypeError,
+                          ArithmeticError)):
+        return FailureReason.UNKNOWN, detail
+
+    return FailureReason.NETWORK_ERROR, detail
+
+
+def create_response(
+        parse_request: ProfessionParseRequest) -> ProfessionParseResponse:
+    """This function creates an empty response of the request. The common
+    fields are validated together with the request, so they are copied
+    without the validation of from_orm
+    :param parse_request: a ProfessionParseRequest instance
+    :return: a ProfessionParseResponse instance
+    """
+    values = parse_request.__dict__
+    return ProfessionParseResponse.construct(
+        **{name: values[name] for name in BaseProfessionParseTask.__fields__})
+
+
+def create_failed_response(
+        parse_request: ProfessionParseRequest,
+        error: Optional[Exception] = None) -> ProfessionParseResponse:
+    """This function creates an empty response describing why the request
+    was not parsed
+    :param parse_request: a ProfessionParseRequest instance
+    :param error: an exception raised during parsing or None if the price was
+    not found
+    :return: a ProfessionParseResponse instance without the price
+    """
+    reason, detail = classify_failure(error)
+    parse_response = create_response(parse_request)
+    parse_response.failure_reason = reason.value
+    parse_response.failure_detail = detail
+
+    return parse_response
+
+
+def is_deterministic_failure(parse_result: Any) -> bool:
+    """This function checks if the failed parsing will fail in the same way
+    on retry, e.g. the selector is broken or the page was removed
+    :param parse_result: a ProfessionParseResponse instance or
+    ProfessionParseRequest instance
+    :return: True if there is no sense to retry the request
+    """
+    reason = getattr(parse_result, 'failure_reason', None)
+    if reason == FailureReason.HTTP_STATUS:
+        return parse_result.failure_detail in DETERMINISTIC_HTTP_STATUSES
+
+    return reason in DETERMINISTIC_FAILURES
+
+
+def get_time_left(deadline: Optional[float]) -> Optional[float]:
+    """This function calculates the time left before the deadline
+    :param deadline: a monotonic time or None if there is no deadline
+    :return: seconds left, negative if the deadline is exceeded, or None
+    """
+    if deadline is None:
+        return None
+
+    return deadline - monotonic()
+
+
+def get_wait_timeout(timeout: Optional[float],
+                     deadline: Optional[float]) -> Optional[float]:
+    """This function limits a wait timeout by the deadline
+    :param timeout: seconds to wait or None to wait without a limit
+    :param deadline: a monotonic time or None if there is no deadline
+    :return: seconds to wait or None to wait without a limit
+    """
+    time_left = get_time_left(deadline)
+    if time_left is None:
+        return timeout
+
+    time_left = max(time_left, 0)
+    return time_left if timeout is None else min(timeout, time_left)
+
+
 def load_from_json(filename: str) -> dict:
     """This function reads data from a json file
     :param filename: path to json file
@@ -43,40 +263,60 @@ def load_from_json(filename: str) -> dict:
 
 
 def refactor_parse_responses(
-        data: list[ProfessionParseResponse]) -> list[ProfessionParseResponse]:
+        data: Iterable[ProfessionParseResponse],
+        updated_at: Optional[str] = None
+) -> Iterator[ProfessionParseResponse]:
     """The refactor_data function serves to change provided data structure. It
     can make up to 3 instances from each provided if there are special
-    fields in the ProfessionParseResponse dictionaries
-    :param data: a list of ProfessionParseResponse instances
-    :return: a list of refactored instances
+    fields in the ProfessionParseResponse dictionaries. The instances are
+    yielded one by one, so the caller can consume them as a stream
+    :param data: an iterable of ProfessionParseResponse instances
+    :param updated_at: the timestamp of the run or None to create it once
+    for all the rows
+    :return: an iterator of refactored instances
+    """
+    updated_at = updated_at or create_timestamp()
+    for record in expand_parse_responses(data, updated_at):
+        yield record.to_response()
+
+
+def expand_parse_responses(
+        data: Iterable[ProfessionParseResponse],
+        updated_at: str) -> Iterator[ParseRecord]:
+    """This generator expands every response into records of its price tiers
+    lazily and normalizes each record in the same pass
+    :param data: an iterable of ProfessionParseResponse instances
+    :param updated_at: the timestamp of the run
+    :return: an iterator of ParseRecord instances
     """
-    result = []
     for row in data:
+        record = ParseRecord.from_model(row)
         for price_type in PRICE_TYPES:
 
-            price = getattr(row, price_type, '')
+            price = getattr(record, price_type, '')
             if price is not None:
-                new_row = ProfessionParseResponse.from_orm(row)
+                new_row = copy(record)
                 try:
                     new_row.course_level = LEVELS[price_type]
                     new_row.price = price
                     period = getattr(new_row, PERIODS[price_type], None)
                     new_row.period = period if period else new_row.period
-                    new_row = update_parsed_data(new_row)
+                    new_row = update_parsed_data(new_row, updated_at)
 
                 except Exception as e:
                     logger.error(
                         f'Error in the refactor_parse_responses function: {e}')
-                result.append(new_row)
-    return result
+                yield new_row
 
 
-def update_parsed_data(
-        parse_result: ProfessionParseResponse) -> ProfessionParseResponse:
+def update_parsed_data(parse_result: ParseRecord,
+                       updated_at: Optional[str] = None) -> ParseRecord:
     """This function updates provided parse_data dictionary
-    :param parse_result: a ProfessionParseResponse instance containing parsed
-    data to update
-    :return: updated ProfessionParseResponse instance
+    :param parse_result: a ParseRecord instance containing parsed data to
+    update
+    :param updated_at: the timestamp of the run or None to use the current
+    time
+    :return: updated ParseRecord instance
     """
     price = clean_digits(parse_result.price)
     period = clean_digits(parse_result.period)
@@ -86,7 +326,7 @@ def update_parsed_data(
         parse_result.period = period
         parse_result.total = (
             round(price * period) if price and period else parse_result.total)
-        parse_result.updated_at = str(datetime.now()).split('.')[0]
+        parse_result.updated_at = updated_at or create_timestamp()
 
     except Exception as e:
         logger.error(
@@ -163,46 +403,6 @@ def convert_json_to_parse_tasks(
     return tasks
 
 
-def compare_data(old_data: dict[str, list],
-                 new_data: dict[str, list]) -> dict[str, Any]:
-    """This function serves to compare parsed data with loaded from json file
-    :param old_data: dictionary with previous parse data
-    :param new_data: dictionary with new parse data
-    :return: an updated dictionary
-    """
-    for key in old_data:
-        old_data[key].sort(key=lambda x: x['profession'])
-        new_data[key].sort(key=lambda x: x['profession'])
-
-        professions = []
-        for prof_old, prof_new in zip(old_data[key], new_data[key]):
-
-            old_price, new_price = prof_old.get('price'), prof_new.get('price')
-            old_period, new_period = prof_old.get('period'), prof_new.get(
-                'period')
-
-            try:
-                prof_new['price_change'] = new_price - old_price
-
-            except Exception as e:
-                logger.error(f'Cannot calculate price change, error {e}')
-                prof_new['price_change'] = 0
-
-            try:
-                prof_new['period_change'] = round(new_period - old_period, 2)
-            except Exception as e:
-                logger.error(f'Cannot calculate period change, error {e}')
-                prof_new['period_change'] = 0
-
-            professions.append(prof_new)
-
-        new_data[key] = (
-            professions if len(professions) >= len(new_data[key])
-            else new_data[key])
-
-    return new_data
-
-
 def refactor_parse_tags(data: dict[str, list[dict]]) -> list[dict]:
     """This function serves to refactor initial dictionary with parse data to
     upload in Google Sheets
@@ -0,0 +1,29 @@
+"""This is a file to start a worker parsing requests from the work queue.
+The selenoid hub of the worker is set by the SELENOID_URL and SELENOID_LIMIT
+environment variables, workers of the same hub share its sessions"""
+import os
+import socket
+from time import sleep
+from constants import PROJECT_FOLDERS, QUEUE_POLL_DELAY
+from container import parse_manager, work_queue
+from utils import create_folders
+# ------------------------------------------------------------------------
+
+
+def main() -> None:
+    """Main function leasing and parsing queued requests until stopped"""
+    create_folders(PROJECT_FOLDERS)
+    worker_id = f'{socket.gethostname()}-{os.getpid()}'
+    try:
+        while True:
+            if not parse_manager.process_queue(work_queue, worker_id):
+                sleep(QUEUE_POLL_DELAY)
+
+    finally:
+        work_queue.leave(worker_id)
+        parse_manager.close()
+        work_queue.close()
+
+
+if __name__ == '__main__':
+    main()